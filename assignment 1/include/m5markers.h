@@ -0,0 +1,23 @@
+/*
+ * gem5 phase markers shared by the sweep benchmarks.
+ *
+ * Build with -DGEM5_M5OPS (and link libm5.a) to mark the end of the
+ * initialization phase for cache_config.py --take_checkpoint, and the
+ * kernel (region of interest) as work item 0 for cache_config.py --roi.
+ * Without it the markers compile to nothing.
+ */
+#ifndef M5MARKERS_H
+#define M5MARKERS_H
+
+#ifdef GEM5_M5OPS
+#include <gem5/m5ops.h>
+#define CHECKPOINT_MARK() m5_checkpoint(0, 0)
+#define ROI_BEGIN() m5_work_begin(0, 0)
+#define ROI_END() m5_work_end(0, 0)
+#else
+#define CHECKPOINT_MARK()
+#define ROI_BEGIN()
+#define ROI_END()
+#endif
+
+#endif
@@ -13,6 +13,8 @@
 #include <string.h>
 #include <time.h>
 
+#include "../../include/m5markers.h"
+
 #ifndef MATRIX_SIZE
 #define MATRIX_SIZE 128  /* Default: 128. Override with -DMATRIX_SIZE=64 or -DMATRIX_SIZE=256 */
 #endif
@@ -61,9 +63,12 @@ int main() {
     
     printf("Initializing matrices...\n");
     matrix_init();
+    CHECKPOINT_MARK();
     
     printf("Starting matrix multiplication...\n");
+    ROI_BEGIN();
     matrix_multiply();
+    ROI_END();
     
     printf("Verifying results...\n");
     matrix_verify();
@@ -1,15 +1,157 @@
 import m5
 from m5.objects import *
+from m5.util.convert import toFrequency, toMemorySize
 import argparse
+import atexit
+import csv
+import json
+import math
+import os
 import sys
+import time
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--l1d_size", type=str, default="64kB")
-parser.add_argument("--binary", type=str, required=True)
+parser.add_argument("--binary", type=str, default=None)
 parser.add_argument("--l2_size", type=str, default="256kB")
 parser.add_argument("--l1_assoc", type=int, default=2)
 parser.add_argument("--l2_assoc", type=int, default=8)
+parser.add_argument("--take_checkpoint", type=str, default=None,
+                    help="Fast-forward on an atomic CPU to the benchmark's m5_checkpoint marker, save a checkpoint to this directory and exit")
+parser.add_argument("--restore_checkpoint", type=str, default=None,
+                    help="Restore a checkpoint written by --take_checkpoint before simulating")
+parser.add_argument("--max_insts", type=int, default=None,
+                    help="Stop after this many committed instructions (short exploration runs); stats are still dumped")
+parser.add_argument("--cacti_latency_table", type=str, default=None,
+                    help="CSV from assignment 2's cacti_sweep.py --latency_table; sets each cache's "
+                         "tag/data/response latency from its CACTI access time instead of the fixed defaults")
+parser.add_argument("--tech_node", type=int, default=None,
+                    help="Technology node (nm) to look up in the latency table (needed if it has several)")
+parser.add_argument("--roi", action="store_true",
+                    help="Run on a fast atomic CPU up to the benchmark's ROI_BEGIN() work marker, then switch to the "
+                         "timing CPU with stats reset, and stop at ROI_END(): stats cover only the kernel")
+parser.add_argument("--simpoint_profile", type=int, default=None, metavar="INTERVAL",
+                    help="Profile basic-block vectors every INTERVAL instructions on an atomic CPU (simpoint.bb.gz)")
+parser.add_argument("--simpoints", type=str, default=None,
+                    help="simpoints.json from sweeplib.simpoint: simulate only its intervals on the timing CPU, "
+                         "fast-forwarding atomically through the caches in between; one stats dump per interval")
+parser.add_argument("--record_trace", type=str, default=None, metavar="DIR",
+                    help="Monitor the ports between the CPU and its L1s and save compressed request traces "
+                         "(icache.trc.gz, dcache.trc.gz) plus trace.json to DIR")
+parser.add_argument("--replay_trace", type=str, default=None, metavar="DIR",
+                    help="Drive the caches from the traces in DIR with trace-replay traffic generators instead of "
+                         "the CPU (no --binary needed): miss rates are meaningful, timing and IPC are not")
+parser.add_argument("--replay_slack", type=float, default=0.1,
+                    help="Let replay run this fraction past the recorded run's length before stopping (default 0.1)")
+period = parser.add_mutually_exclusive_group()
+period.add_argument("--dump_period_insts", type=int, default=None, metavar="N",
+                    help="Also dump stats every N committed instructions (cumulative: the last dump is still the "
+                         "whole run); with --roi, from ROI_BEGIN() on")
+period.add_argument("--dump_period_ticks", type=int, default=None, metavar="N",
+                    help="Also dump stats every N ticks, as --dump_period_insts")
+parser.add_argument("--progress_interval", type=int, default=None, metavar="TICKS",
+                    help="Rewrite progress.json (tick, committed instructions, host seconds) in the output "
+                         "directory every TICKS simulated ticks, for sweeplib.monitor")
+parser.add_argument("--stats_profile", choices=["full", "compact", "whitelist", "hdf5"], default="full",
+                    help="full: gem5's stats.txt with descriptions; compact: no descriptions or alignment; "
+                         "whitelist: compact, keeping only the --stats_groups stats; hdf5: every stat in stats.h5 "
+                         "(gem5 built with HDF5) plus the whitelisted stats.txt. All but full need gem5's own "
+                         "--stats-file=text://stats.txt?desc=False&spaces=False before this script, "
+                         "which the sweep drivers pass")
+parser.add_argument("--stats_groups", type=str, default=None,
+                    help="Comma-separated stat name prefixes kept by the whitelist/hdf5 profiles "
+                         "(default: the groups the sweep extractors read); root stats such as simSeconds are always kept")
 args = parser.parse_args()
+if not args.binary and not args.replay_trace:
+    parser.error("--binary is required")
+if (args.record_trace or args.replay_trace) and (args.take_checkpoint or args.restore_checkpoint or args.roi
+                                                 or args.simpoint_profile or args.simpoints):
+    parser.error("--record_trace/--replay_trace run the whole program in plain timing mode; "
+                 "they cannot be combined with checkpoints, --roi or SimPoint options")
+if (args.dump_period_insts or args.dump_period_ticks) and (args.take_checkpoint or args.simpoint_profile
+                                                           or args.simpoints or args.replay_trace):
+    parser.error("periodic dumps need a plain, --roi or --record_trace run")
+if args.stats_groups and args.stats_profile not in ("whitelist", "hdf5"):
+    parser.error("--stats_groups needs --stats_profile whitelist or hdf5")
+
+CPU_CLOCK = '1GHz'
+SAMPLE_BOUNDARY = "simpoint sample boundary"
+DUMP_BOUNDARY = "periodic stats dump"
+LINE_SIZE = 64  # gem5's default cache_line_size, as used for the CACTI table
+# Everything sweeplib.stats_parser.ALIASES resolves to, for either cache naming scheme
+SWEEP_STAT_GROUPS = [
+    f"system.{cache}.{stat}"
+    for cache in ("cpu.dcache", "cpu.icache", "l1d", "l1i", "l2cache", "l2")
+    for stat in ("overall", "WriteReq.accesses", "WritebackDirty.accesses", "writebacks")
+] + ["system.cpu.ipc", "system.cpu.numCycles", "system.switch_cpu.ipc", "system.switch_cpu.numCycles",
+     "system.mem_ctrl.dram.bytesRead", "system.mem_ctrl.dram.bytesWritten",
+     "system.mem_ctrl.bytesReadSys", "system.mem_ctrl.bytesWrittenSys"]
+
+def load_latency_table(path):
+    table = {}
+    with open(path) as f:
+        for row in csv.DictReader(f):
+            key = (int(row["size_bytes"]), int(row["assoc"]), int(row["block_size"]), int(row["tech_nm"]))
+            table[key] = float(row["access_time_ns"])
+    return table
+
+def apply_cacti_latency(cache, name, size, assoc, table, tech_node):
+    """Set a cache's latencies to its CACTI access time, rounded up to whole CPU cycles."""
+    key = (toMemorySize(size), int(assoc), LINE_SIZE, tech_node)
+    if key not in table:
+        print(f"No CACTI entry for {name} {size} {assoc}-way, {LINE_SIZE}B lines, {tech_node}nm in {args.cacti_latency_table}")
+        sys.exit(1)
+    cycles = max(1, math.ceil(table[key] * toFrequency(CPU_CLOCK) * 1e-9 - 1e-9))
+    cache.tag_latency = cycles
+    cache.data_latency = cycles
+    cache.response_latency = cycles
+    print(f"CACTI latency: {name} {size} {assoc}-way @ {tech_node}nm = {table[key]:.3f} ns -> {cycles} cycles")
+
+def trace_monitor(cache, name):
+    """CommMonitor recording every request into ``cache`` to <record_trace>/<name>.trc.gz."""
+    monitor = CommMonitor()
+    monitor.trace = MemTraceProbe(trace_file=os.path.join(os.path.abspath(args.record_trace), f"{name}.trc"))
+    monitor.mem_side_port = cache.cpu_side
+    return monitor
+
+def replay_generator(name, duration):
+    """TrafficGen replaying <replay_trace>/<name>.trc.gz for ``duration`` ticks, then exiting."""
+    config = os.path.join(m5.options.outdir, f"replay_{name}.cfg")
+    trace = os.path.join(os.path.abspath(args.replay_trace), f"{name}.trc.gz")
+    with open(config, "w") as f:
+        f.write(f"STATE 0 {duration} TRACE {trace} 0\n")
+        f.write("STATE 1 0 EXIT\n")
+        f.write("INIT 0\n")
+        f.write("TRANSITION 0 1 1\n")
+        f.write("TRANSITION 1 1 1\n")
+    return TrafficGen(config_file=config)
+
+def setup_stats_output():
+    """Add the outputs --stats_profile asks for on top of gem5's stats.txt.
+
+    gem5 ties stats.txt's text format to the first --stats-file URL, so the
+    drivers pass ``--stats-file=text://stats.txt?desc=False&spaces=False``
+    (``sweeplib.stats_reader.gem5_stats_options``) for every profile but full.
+    """
+    if args.stats_profile == "compact":
+        return
+    if args.stats_profile == "hdf5":
+        m5.stats.addStatVisitor("h5://stats.h5?desc=False&formulas=False")
+    # gem5 cannot select stats per group, so dump everything and filter once at exit
+    atexit.register(filter_stats)
+
+def filter_stats():
+    """Final stats dump, then rewrite stats.txt in place with only the root and --stats_groups stats."""
+    # gem5's own exit dump is skipped when it comes at the same tick
+    m5.stats.dump()
+    prefixes = tuple(args.stats_groups.split(",") if args.stats_groups else SWEEP_STAT_GROUPS)
+    target = os.path.join(m5.options.outdir, "stats.txt")
+    with open(target) as f, open(target + ".tmp", "w") as out:
+        for line in f:
+            name = line.split(None, 1)[0] if line.strip() else ""
+            if not name or name.startswith("-") or "." not in name or name.startswith(prefixes):
+                out.write(line)
+    os.replace(target + ".tmp", target)
 
 # Cache Definitions
 class L1Cache(Cache):
@@ -78,36 +220,93 @@ class L2Cache(Cache):
 system = System()
 
 system.clk_domain = SrcClockDomain()
-system.clk_domain.clock = '1GHz'
+system.clk_domain.clock = CPU_CLOCK
 system.clk_domain.voltage_domain = VoltageDomain()
 
-system.mem_mode = 'timing'
 system.mem_ranges = [AddrRange('512MB')]
 
 # Using RISC-V CPU
-system.cpu = RiscvTimingSimpleCPU()
+# Profiling and checkpointing never need the caches
+fast_forward_only = args.take_checkpoint or args.simpoint_profile
+switching = (args.roi or args.simpoints) and not fast_forward_only
 
-# Interrupt Controller
-system.cpu.createInterruptController()
+if args.replay_trace:
+    # No CPU: the generators take its place in front of the L1s, and the
+    # SubSystem keeps the cache stats under system.cpu.* as in a CPU run
+    with open(os.path.join(args.replay_trace, "trace.json")) as f:
+        recorded = json.load(f)
+    system.mem_mode = 'timing'
+    system.cpu = SubSystem()
+elif fast_forward_only:
+    # Fast-forward only: the initialization phase does not depend on the
+    # cache geometry and caches hold no checkpointed state.
+    system.mem_mode = 'atomic'
+    system.cpu = RiscvAtomicSimpleCPU()
+elif switching:
+    # Setup (or the code between samples) runs atomically through the
+    # caches, so they are warm when the timing CPU takes over
+    system.mem_mode = 'atomic'
+    system.cpu = RiscvAtomicSimpleCPU()
+    system.switch_cpu = RiscvTimingSimpleCPU(switched_out=True, cpu_id=0)
+    system.exit_on_work_items = bool(args.roi)
+else:
+    system.mem_mode = 'timing'
+    system.cpu = RiscvTimingSimpleCPU()
 
-# Initialize Caches
-system.cpu.icache = L1_ICache(args)
-system.cpu.dcache = L1_DCache(args)
-system.l2cache = L2Cache(args)
+# Interrupt Controller
+if not args.replay_trace:
+    system.cpu.createInterruptController()
 
-# Create Buses
-system.l2bus = L2XBar()
 system.membus = SystemXBar()
 
-# Wiring: CPU -> L1 -> L2Bus -> L2 -> MemBus
-system.cpu.icache.connectCPU(system.cpu)
-system.cpu.dcache.connectCPU(system.cpu)
+if fast_forward_only:
+    system.cpu.icache_port = system.membus.cpu_side_ports
+    system.cpu.dcache_port = system.membus.cpu_side_ports
+else:
+    # Initialize Caches
+    system.cpu.icache = L1_ICache(args)
+    system.cpu.dcache = L1_DCache(args)
+    system.l2cache = L2Cache(args)
+
+    # Create Buses
+    system.l2bus = L2XBar()
+
+    # Wiring: CPU -> L1 -> L2Bus -> L2 -> MemBus
+    if args.replay_trace:
+        duration = int(recorded["ticks"] * (1 + args.replay_slack))
+        system.cpu.icache_gen = replay_generator("icache", duration)
+        system.cpu.dcache_gen = replay_generator("dcache", duration)
+        system.cpu.icache_gen.port = system.cpu.icache.cpu_side
+        system.cpu.dcache_gen.port = system.cpu.dcache.cpu_side
+    elif args.record_trace:
+        os.makedirs(args.record_trace, exist_ok=True)
+        system.cpu.icache_mon = trace_monitor(system.cpu.icache, "icache")
+        system.cpu.dcache_mon = trace_monitor(system.cpu.dcache, "dcache")
+        system.cpu.icache_port = system.cpu.icache_mon.cpu_side_port
+        system.cpu.dcache_port = system.cpu.dcache_mon.cpu_side_port
+    else:
+        system.cpu.icache.connectCPU(system.cpu)
+        system.cpu.dcache.connectCPU(system.cpu)
 
-system.cpu.icache.connectBus(system.l2bus)
-system.cpu.dcache.connectBus(system.l2bus)
+    system.cpu.icache.connectBus(system.l2bus)
+    system.cpu.dcache.connectBus(system.l2bus)
 
-system.l2cache.connectCPUSideBus(system.l2bus)
-system.l2cache.connectMemSideBus(system.membus)
+    system.l2cache.connectCPUSideBus(system.l2bus)
+    system.l2cache.connectMemSideBus(system.membus)
+
+    if args.cacti_latency_table:
+        table = load_latency_table(args.cacti_latency_table)
+        tech_node = args.tech_node
+        if tech_node is None:
+            nodes = sorted({key[3] for key in table})
+            if len(nodes) != 1:
+                print(f"{args.cacti_latency_table} covers {nodes} nm; choose one with --tech_node")
+                sys.exit(1)
+            tech_node = nodes[0]
+        # Same sizes/associativities the cache classes above picked (L1Cache sizes the icache like the dcache)
+        apply_cacti_latency(system.cpu.icache, "L1I", args.l1d_size, args.l1_assoc, table, tech_node)
+        apply_cacti_latency(system.cpu.dcache, "L1D", args.l1d_size, args.l1_assoc, table, tech_node)
+        apply_cacti_latency(system.l2cache, "L2", args.l2_size, args.l2_assoc, table, tech_node)
 
 # Connect system port to membus
 system.system_port = system.membus.cpu_side_ports
@@ -120,17 +319,183 @@ system.mem_ctrl.port = system.membus.mem_side_ports
 
 # Workload setup
 # Using SE mode
-system.workload = SEWorkload.init_compatible(args.binary)
-process = Process()
-process.cmd = [args.binary]
-system.cpu.workload = process
-system.cpu.createThreads()
+if not args.replay_trace:
+    system.workload = SEWorkload.init_compatible(args.binary)
+    process = Process()
+    process.cmd = [args.binary]
+    system.cpu.workload = process
+    system.cpu.createThreads()
+
+if switching:
+    system.switch_cpu.workload = process
+    system.switch_cpu.createInterruptController()
+    system.switch_cpu.createThreads()
+
+if args.max_insts and not fast_forward_only and not switching:
+    system.cpu.max_insts_any_thread = args.max_insts
+
+if args.simpoint_profile:
+    system.cpu.addSimPointProbe(args.simpoint_profile)
 
 # Simulation
 root = Root(full_system=False, system=system)
-m5.instantiate()
+m5.instantiate(args.restore_checkpoint)
+if args.stats_profile != "full":
+    setup_stats_output()
+
+if args.take_checkpoint:
+    print(f"Fast-forwarding {args.binary} to its checkpoint marker")
+    exit_event = m5.simulate()
+    if exit_event.getCause() != "checkpoint":
+        print(f"No checkpoint marker reached ({exit_event.getCause()}); build the binary with -DGEM5_M5OPS")
+        sys.exit(1)
+    m5.checkpoint(args.take_checkpoint)
+    print(f"Checkpoint saved to {args.take_checkpoint}")
+    sys.exit(0)
+
+if args.simpoint_profile:
+    exit_event = m5.simulate()
+    while exit_event.getCause() in ("checkpoint", "workbegin", "workend"):
+        exit_event = m5.simulate()
+    print(f"Basic-block profile written to {m5.options.outdir}/simpoint.bb.gz ({exit_event.getCause()})")
+    sys.exit(0)
+
+if args.simpoints:
+    with open(args.simpoints) as f:
+        spec = json.load(f)
+    interval, warmup = spec["interval"], spec.get("warmup", 0)
+    position = 0  # instructions committed so far, on either CPU
+    active = system.cpu
+
+    def run_to(target):
+        """Run the active CPU up to instruction ``target``; False if the program ended first."""
+        global position
+        if target <= position:
+            return True
+        active.scheduleInstStop(0, target - position, SAMPLE_BOUNDARY)
+        event = m5.simulate()
+        while event.getCause() == "checkpoint":
+            event = m5.simulate()
+        if event.getCause() != SAMPLE_BOUNDARY:
+            print(f"Program ended @ instruction ~{position} ({event.getCause()})")
+            return False
+        position = target
+        return True
+
+    def switch_to(cpu):
+        global active
+        if cpu is not active:
+            m5.switchCpus(system, [(active, cpu)])
+            active = cpu
+
+    sampled = 0
+    for point in spec["points"]:
+        start = point["index"] * interval
+        if not run_to(start - warmup):
+            break
+        switch_to(system.switch_cpu)
+        if not run_to(start):
+            break
+        m5.stats.reset()
+        ended = not run_to(start + interval)
+        m5.stats.dump()
+        sampled += 1
+        if ended:
+            break
+        switch_to(system.cpu)
+    print(f"Sampled {sampled} of {len(spec['points'])} intervals of {interval} instructions")
+    # The dump gem5 adds at exit follows the interval dumps; sweeplib.simpoint ignores it
+    sys.exit(0 if sampled == len(spec["points"]) else 1)
+
+if args.replay_trace:
+    print(f"Replaying {args.replay_trace} ({recorded['binary']}, recorded on L1D {recorded['l1d_size']} "
+          f"{recorded['l1_assoc']}-way, L2 {recorded['l2_size']} {recorded['l2_assoc']}-way)")
+    # Each generator's EXIT state ends one simulate() call
+    for _ in range(2):
+        exit_event = m5.simulate()
+    print('Exiting @ tick {} because {}'.format(m5.curTick(), exit_event.getCause()))
+    sys.exit(0)
+
+if args.restore_checkpoint:
+    print(f"Restored checkpoint from {args.restore_checkpoint}")
+next_dump = None  # tick of the next periodic dump (--dump_period_ticks)
+next_progress = m5.curTick() + args.progress_interval if args.progress_interval else None
+host_start = time.time()
+
+def report_progress():
+    """Atomically rewrite progress.json; instructions of every CPU that ran so far."""
+    cpus = [system.cpu, system.switch_cpu] if switching else [system.cpu]
+    path = os.path.join(m5.options.outdir, "progress.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump({"tick": m5.curTick(), "insts": sum(cpu.totalInsts() for cpu in cpus),
+                   "host_seconds": time.time() - host_start, "roi": in_roi}, f)
+    os.replace(path + ".tmp", path)
+
+def start_dumps(cpu):
+    global next_dump
+    if args.dump_period_insts:
+        cpu.scheduleInstStop(0, args.dump_period_insts, DUMP_BOUNDARY)
+    if args.dump_period_ticks:
+        next_dump = m5.curTick() + args.dump_period_ticks
+
+def simulate():
+    stops = [tick for tick in (next_dump, next_progress) if tick is not None]
+    if stops:
+        return m5.simulate(min(stops) - m5.curTick())
+    return m5.simulate()
 
 print(f"Starting simulation with L1D size: {args.l1d_size}")
-exit_event = m5.simulate()
+if not args.roi:
+    start_dumps(system.cpu)
+exit_event = simulate()
+in_roi = False
+dumps = 0
+while True:
+    cause = exit_event.getCause()
+    # Binaries built with -DGEM5_M5OPS still hit the marker in a plain run
+    if cause == "checkpoint":
+        pass
+    elif cause == DUMP_BOUNDARY:
+        m5.stats.dump()
+        dumps += 1
+        (system.switch_cpu if in_roi else system.cpu).scheduleInstStop(0, args.dump_period_insts, DUMP_BOUNDARY)
+    elif cause == "simulate() limit reached" and (next_dump is not None or next_progress is not None):
+        if next_dump is not None and m5.curTick() >= next_dump:
+            m5.stats.dump()
+            dumps += 1
+            next_dump += args.dump_period_ticks
+        if next_progress is not None and m5.curTick() >= next_progress:
+            report_progress()
+            next_progress += args.progress_interval
+    elif args.roi and cause == "workbegin" and not in_roi:
+        print(f"ROI begins @ tick {m5.curTick()}: switching to the timing CPU")
+        m5.switchCpus(system, [(system.cpu, system.switch_cpu)])
+        m5.stats.reset()
+        in_roi = True
+        if args.max_insts:
+            system.switch_cpu.scheduleInstStop(0, args.max_insts, "a thread reached the max instruction count")
+        start_dumps(system.switch_cpu)
+    elif args.roi and cause == "workend" and in_roi:
+        # gem5 dumps stats when this script ends, so that block covers exactly the ROI
+        break
+    else:
+        break
+    exit_event = simulate()
+
+if args.roi and not in_roi:
+    print(f"No ROI marker reached ({cause}); build the binary with -DGEM5_M5OPS")
+    sys.exit(1)
+
+if args.record_trace:
+    # Replay runs its generators for the recorded length (plus slack)
+    with open(os.path.join(args.record_trace, "trace.json"), "w") as f:
+        json.dump({"ticks": m5.curTick(), "binary": args.binary, "l1d_size": args.l1d_size,
+                   "l1_assoc": args.l1_assoc, "l2_size": args.l2_size, "l2_assoc": args.l2_assoc,
+                   "max_insts": args.max_insts}, f, indent=1)
+    print(f"Request traces saved to {args.record_trace}")
+
+if dumps:
+    # gem5's exit dump closes the last interval
+    print(f"{dumps} periodic stats dumps written before the final one")
 
 print('Exiting @ tick {} because {}'.format(m5.curTick(), exit_event.getCause()))
\ No newline at end of file
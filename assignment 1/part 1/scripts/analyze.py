@@ -1,6 +1,7 @@
 import os
-import re
-import csv
+import sys
+import time
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -15,8 +16,18 @@ results_base = os.path.join(project_base, "results")
 plot_output = os.path.join(results_base, 'analysis_all')
 os.makedirs(plot_output, exist_ok=True)
 
+sys.path.insert(0, os.path.abspath(os.path.join(project_base, "..")))
+from sweeplib.archive import open_archive
+from sweeplib.energy import hierarchy_energy, load_cacti_table, resolve_tech_node
+from sweeplib.stats_index import StatsIndex
+from sweeplib.stats_parser import build_table, load_table, lookup, parse_final, save_table
+from sweeplib.timeseries import build_series_table, detect_phases, load_series, phase_summary, series_of
+
 # Resolution target for Overleaf (1200px width)
 TARGET_WIDTH_PX = 1200
+# cache_config.py's defaults; the run plotted over time per matrix size
+PHASE_CONFIG = {'L1_Size': '64kB', 'L2_Size': '256kB', 'L1_Assoc': 2, 'L2_Assoc': 8}
+
 def get_dpi(fig_width_inches):
     return int(TARGET_WIDTH_PX / fig_width_inches)
 
@@ -44,23 +55,15 @@ sweep_configs = [
 def parse_cache_size(size_str):
     return int(size_str.replace('kB', ''))
 
-def extract_metrics_from_stats(stats_file):
-    if not os.path.exists(stats_file):
+def extract_metrics_from_stats(stats_file, stats=None):
+    if stats is None:
+        stats = parse_final(stats_file)
+    if not stats:
         return None
-    with open(stats_file, 'r') as f:
-        content = f.read()
     
     metrics = {}
-    m = re.search(r'simTicks\s+(\d+)', content)
-    metrics['simTicks'] = int(m.group(1)) if m else None
-    m = re.search(r'simSeconds\s+([0-9.e\-+]+)', content)
-    metrics['simSeconds'] = float(m.group(1)) if m else None
-    m = re.search(r'hostSeconds\s+([0-9.e\-+]+)', content)
-    metrics['hostSeconds'] = float(m.group(1)) if m else None
-    m = re.search(r'system\.cpu\.dcache\.overallMissRate::total\s+([0-9.e\-+]+)', content)
-    metrics['L1_MissRate'] = float(m.group(1)) if m else None
-    m = re.search(r'system\.l2cache\.overallMissRate::total\s+([0-9.e\-+]+)', content)
-    metrics['L2_MissRate'] = float(m.group(1)) if m else None
+    for name in ['simTicks', 'simSeconds', 'hostSeconds', 'L1_MissRate', 'L2_MissRate']:
+        metrics[name] = lookup(stats, name)
     
     if metrics['L1_MissRate'] is not None:
         metrics['L1_HitRate'] = 1.0 - metrics['L1_MissRate']
@@ -74,28 +77,99 @@ def parse_config(dirname):
         return {'L1_Size': parts[1], 'L2_Size': parts[3], 'L1_Assoc': int(parts[5]), 'L2_Assoc': int(parts[7])}
     except: return None
 
-def run_extraction():
+def run_extraction(energy=None, timeseries=False):
+    """Rebuild each sweep's CSV; only new or changed stats.txt files are parsed.
+
+    ``energy`` is a (CACTI table, tech node) pair; when given, every row also
+    gets the L1D + L2 energy and EDP columns of ``sweeplib.energy``. With
+    ``timeseries``, runs with periodic dumps (``full_sweep.py --dump_period``)
+    also go to a per-interval ``timeseries_store`` for the phase plots.
+    """
     print("Extracting metrics from simulation results...")
     for cfg in sweep_configs:
-        if not os.path.exists(cfg['dir']): continue
+        # Packed sweeps (sweeplib.archive) may have no run directories left
+        archive = open_archive(cfg['dir'])
+        if not os.path.exists(cfg['dir']) and not archive: continue
+        index = StatsIndex(os.path.join(cfg['dir'], 'stats_index.json'))
         results = []
-        for d in os.listdir(cfg['dir']):
+        runs = []
+        series_runs = []
+        on_disk = set(os.listdir(cfg['dir'])) if os.path.exists(cfg['dir']) else set()
+        for d in sorted(on_disk | set(archive.keys() if archive else [])):
             path = os.path.join(cfg['dir'], d)
-            if not os.path.isdir(path): continue
+            if d in on_disk and not os.path.isdir(path): continue
             parts = parse_config(d)
             if not parts: continue
-            m = extract_metrics_from_stats(os.path.join(path, 'stats.txt'))
+            stats = index.get(os.path.join(path, 'stats.txt'))
+            from_archive = not stats and archive is not None and d in archive
+            if from_archive:
+                stats = archive.final(d)
+            m = extract_metrics_from_stats(None, stats)
             if not m: continue
             row = {**parts, **m, 'TotalCacheSize': parse_cache_size(parts['L1_Size']) + parse_cache_size(parts['L2_Size'])}
-            results.append(row)
+            energy_cols = (hierarchy_energy(stats, parts, *energy) or {}) if energy else {}
+            results.append({**row, **energy_cols})
+            runs.append(({**parts, 'MatrixSize': cfg['matrix_size'], **energy_cols}, stats))
+            if timeseries:
+                series = series_of(archive.blocks(d)) if from_archive else load_series(os.path.join(path, 'stats.txt'))
+                series_runs.append(({**parts, 'MatrixSize': cfg['matrix_size']}, series))
+        parsed = index.parsed
+        archive_changed = archive is not None and os.path.exists(cfg['output']) and \
+            os.path.getmtime(archive.path) > os.path.getmtime(cfg['output'])
+        if archive: archive.close()
+        # Energy columns depend on the CACTI table too, so they are always rewritten
+        if not index.save() and not archive_changed and os.path.exists(cfg['output']) and not energy and not timeseries:
+            print(f"  - {cfg['matrix_size']}x{cfg['matrix_size']}: unchanged")
+            continue
         if results:
             df = pd.DataFrame(results).sort_values(['L1_Size', 'L2_Size', 'L1_Assoc', 'L2_Assoc'])
             df.to_csv(cfg['output'], index=False)
-            print(f"  ✓ {cfg['matrix_size']}x{cfg['matrix_size']}: {len(df)} configs saved to {os.path.basename(cfg['output'])}")
+            # Full per-stat table for anything the enhanced CSV does not carry
+            save_table(build_table(runs), os.path.join(cfg['dir'], 'stats_store.parquet'))
+            series = build_series_table(series_runs)
+            if len(series):
+                save_table(series, os.path.join(cfg['dir'], 'timeseries_store.parquet'))
+                print(f"  ✓ {cfg['matrix_size']}x{cfg['matrix_size']}: {len(series)} intervals saved to the time-series store")
+            print(f"  ✓ {cfg['matrix_size']}x{cfg['matrix_size']}: {len(df)} configs saved to {os.path.basename(cfg['output'])} ({parsed} parsed)")
 
 # ============================================================================
 # Plotting Logic
 # ============================================================================
+def plot_phases():
+    """L1D miss rate, IPC and DRAM bandwidth over time of PHASE_CONFIG, detected phases shaded."""
+    for cfg in sweep_configs:
+        try:
+            series = load_table(os.path.join(cfg['dir'], 'timeseries_store.parquet'))
+        except FileNotFoundError:
+            continue
+        run = series
+        for name, value in PHASE_CONFIG.items():
+            run = run[run[name] == value]
+        if run.empty:
+            continue
+        run = run.sort_values('interval')
+        phases = detect_phases(run)
+        m = cfg['matrix_size']
+        minsts = run['start_inst'] / 1e6
+        mends = (run['start_inst'] + run['simInsts']) / 1e6
+
+        fig, axes = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+        for ax, (col, label, scale) in zip(axes, [('L1_MissRate', 'L1D miss rate', 1), ('IPC', 'IPC', 1),
+                                                  ('MemBandwidth', 'DRAM bandwidth (GB/s)', 1e-9)]):
+            ax.step(minsts, run[col] * scale, where='post', linewidth=2)
+            ax.set_ylabel(label)
+            for phase in range(1, phases.max() + 1, 2):
+                ax.axvspan(minsts[phases == phase].min(), mends[phases == phase].max(), color='#ff7f0e', alpha=0.15)
+        axes[-1].set_xlabel('Instructions (millions)')
+        axes[0].set_title(f"Phase Behavior, {m}x{m} (L1={PHASE_CONFIG['L1_Size']}, L2={PHASE_CONFIG['L2_Size']})", weight='bold')
+        plt.tight_layout()
+        fig.savefig(os.path.join(plot_output, f'phases_{m}x{m}.png'), dpi=get_dpi(10))
+        plt.close()
+
+        summary = phase_summary(run, phases)
+        summary.to_csv(os.path.join(plot_output, f'phases_{m}x{m}.csv'), index=False)
+        print(f"  ✓ {m}x{m}: {len(summary)} phases over {len(run)} intervals")
+
 def run_plotting():
     print("\nGenerating comprehensive plots...")
     combined_data = []
@@ -160,6 +234,7 @@ def run_plotting():
     plt.savefig(os.path.join(plot_output, 'heatmap_time_128x128.png'), dpi=get_dpi(10))
     plt.close()
 
+    plot_phases()
     print(f"  ✓ All plots saved to {plot_output}")
 
     # Summary Statistics
@@ -176,5 +251,27 @@ def run_plotting():
         print(f"Matrix {m}x{m}: L1={best['L1_Size'].values[0]}, L2={best['L2_Size'].values[0]}, L1_Assoc={best['L1_Assoc'].values[0]}, L2_Assoc={best['L2_Assoc'].values[0]} -> {best['simSeconds'].values[0]:.4f}s")
 
 if __name__ == "__main__":
-    run_extraction()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="Keep re-extracting every SECONDS during a sweep; plots are drawn after Ctrl-C")
+    parser.add_argument("--energy_table", type=str, default=None,
+                        help="CACTI table from assignment 2 (cacti_sweep.py --latency_table): adds energy and EDP columns")
+    parser.add_argument("--tech_node", type=int, default=None,
+                        help="Technology node (nm) to price energy at (needed if the table has several)")
+    parser.add_argument("--timeseries", action="store_true",
+                        help="Also store per-interval series of runs with periodic dumps and plot their phases")
+    args = parser.parse_args()
+
+    energy = None
+    if args.energy_table:
+        table = load_cacti_table(args.energy_table)
+        energy = (table, resolve_tech_node(table, args.tech_node))
+
+    run_extraction(energy, args.timeseries)
+    try:
+        while args.watch:
+            time.sleep(args.watch)
+            run_extraction(energy, args.timeseries)
+    except KeyboardInterrupt:
+        pass
     run_plotting()
@@ -1,27 +1,41 @@
-import subprocess
-import re
-import csv
 import multiprocessing
 import os
+import sys
+import argparse
+import time
 
 # get the folder where this script is
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# path to gem5 stuff
-gem5_path = "/home/tishya/shivam/hpc/gem5"
+# shared sweep helpers live in assignment 1/sweeplib
+sys.path.insert(0, os.path.join(script_dir, "../.."))
+from sweeplib.journal import Journal
+from sweeplib.failures import collect_failures, print_failure_summary, run_with_retries
+from sweeplib.monitor import PROGRESS_TICKS, Dashboard
+from sweeplib.result_store import ResultStore, inputs_digest, is_complete, result_key
+from sweeplib.stats_parser import format_stat, lookup, parse_final
+
+# path to gem5 stuff (GEM5_HOME overrides it)
+gem5_path = os.environ.get("GEM5_HOME", "/home/tishya/shivam/hpc/gem5")
 
 gem5_bin = os.path.join(gem5_path, "build/RISCV/gem5.opt")
 config = os.path.join(script_dir, "../configs/cache_config.py")
 bench = os.path.join(script_dir, "../benchmarks/matrix_multiply")
 res_dir = os.path.join(script_dir, "../results")
 out_csv = os.path.join(res_dir, "l1_sweep_results.csv")
+journal_file = os.path.join(res_dir, "l1_sweep_journal.jsonl")
+header = ["L1_Size", "Execution_Time", "Hits", "Misses"]
 
 # different L1 cache sizes to try
 sizes = ["16kB", "32kB", "64kB", "128kB", "256kB"]
 
-def run_one_sim(sz):
+def out_dir_for(sz):
+    return os.path.join(res_dir, "l1_" + sz)
+
+def run_one_sim(job):
+    sz, digest, force, limits, retry = job
     # make output folder for this size
-    out_dir = os.path.join(res_dir, "l1_" + sz)
+    out_dir = out_dir_for(sz)
     if not os.path.exists(out_dir):
         os.makedirs(out_dir)
 
@@ -33,74 +47,117 @@ def run_one_sim(sz):
     cmd.append(config)
     cmd.append("--l1d_size=" + sz)
     cmd.append("--binary=" + bench)
+    # progress.json for the dashboard
+    cmd.append("--progress_interval=" + str(PROGRESS_TICKS))
 
-    print("-> Launching " + sz + " simulation...")
+    store = ResultStore()
+    key = result_key(digest, [sz])
 
     try:
-        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        # check for the stats file
-        stats_path = os.path.join(out_dir, "stats.txt")
-
-        found = os.path.exists(stats_path)
-        if found == False:
-            return [sz, "Error: No Stats", 0, 0]
-
-        # read stats file
-        f = open(stats_path, "r")
-        data=f.read()
-        f.close()
-
-        # find sim time
-        m = re.search(r"simSeconds\s+([0-9\.e\-]+)", data)
-        if m:
-            sim_time=m.group(1)
-        else:
-            sim_time="N/A"
-
-        # find hits
-        m2 = re.search(r"system\.cpu\.dcache\.overallHits::total\s+(\d+)", data)
-        if m2:
-            hits= m2.group(1)
+        # reuse a stored run if nothing it depends on has changed (unless --force)
+        if not force and store.fetch(key, out_dir):
+            print("-> Reusing stored " + sz + " result")
         else:
-            hits="0"
+            print("-> Launching " + sz + " simulation...")
+            # transient failures (OOM kills etc.) are retried, the rest leave failure.json
+            failure = run_with_retries(cmd, out_dir, limits=limits, retries=retry[0], backoff=retry[1])
+            if failure:
+                return [sz, "Error: " + failure["category"] + ", " + str(failure["detail"]), 0, 0]
+            store.put(key, out_dir, meta={"config": "l1_" + sz, "binary": bench})
 
-        # find misses
-        m3 = re.search(r"system\.cpu\.dcache\.overallMisses::total\s+(\d+)", data)
-        if m3:
-            misses=m3.group(1)
-        else:
-            misses = "0"
-
-        row = [sz, sim_time, hits, misses]
-        return row
+        return read_row(sz, out_dir)
 
     except Exception as e:
         err_msg =str(e)
         return [sz, "Error: " + err_msg, 0, 0]
 
+def read_row(sz, out_dir):
+    # one pass over the stats file
+    stats = parse_final(os.path.join(out_dir, "stats.txt"))
+    if not stats:
+        return [sz, "Error: No Stats", 0, 0]
+
+    sim_time = format_stat(lookup(stats, "simSeconds", "N/A"))
+    hits = format_stat(lookup(stats, "L1_Hits", "0"))
+    misses = format_stat(lookup(stats, "L1_Misses", "0"))
+
+    row = [sz, sim_time, hits, misses]
+    return row
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the L1D size for the matrix multiply benchmark")
+    parser.add_argument("--resume", action="store_true", help="keep the journal and only run sizes without a result")
+    parser.add_argument("--force", action="store_true", help="re-run sizes even if the result store has them")
+    parser.add_argument("--max_wall", type=float, default=None, help="kill a simulation after this many minutes")
+    parser.add_argument("--max_rss", type=int, default=None, help="kill a simulation using more than this many MB")
+    parser.add_argument("--dashboard", type=float, default=60, help="seconds between progress reports (0 = off)")
+    parser.add_argument("--retries", type=int, default=2, help="re-runs of a simulation killed by OOM or a signal")
+    parser.add_argument("--retry_backoff", type=float, default=60, help="seconds before the first retry (doubles after)")
+    args = parser.parse_args()
+
     if not os.path.exists(res_dir):
         os.makedirs(res_dir)
 
+    # each finished size goes to the journal right away, so a crash keeps it
+    journal = Journal(journal_file)
+    if not args.resume:
+        journal.reset()
+
+    done = journal.rows()
+    todo = []
+    for sz in sizes:
+        if sz in done and not str(done[sz][1]).startswith("Error"):
+            continue
+        out_dir = out_dir_for(sz)
+        if args.resume and is_complete(out_dir):
+            journal.append(sz, read_row(sz, out_dir))
+            continue
+        todo.append(sz)
+    if args.resume:
+        print("Resuming: " + str(len(sizes) - len(todo)) + " sizes already done")
+
     num_cores=multiprocessing.cpu_count()
-    num_workers=min(num_cores, len(sizes))
+    num_workers=max(1, min(num_cores, len(todo)))
     print("Starting parallel sweep on " + str(num_workers) + " cores...")
 
+    digest = inputs_digest(gem5_bin, config, bench)
+    limits = None
+    if args.max_wall or args.max_rss:
+        limits = (args.max_wall * 60 if args.max_wall else None, args.max_rss)
+    jobs = [(sz, digest, args.force, limits, (args.retries, args.retry_backoff)) for sz in todo]
+
+    # all sizes start at once, so they are all "running" from the start
+    dashboard = Dashboard(lambda job: out_dir_for(job[0]), period=args.dashboard or 60)
+    dashboard.queue({job[0]: ({"l1_size": job[0]}, job) for job in jobs})
+    for job in jobs[:num_workers]:
+        dashboard.started(job[0])
+
+    start = time.time()
     pool =multiprocessing.Pool(num_workers)
-    results= pool.map(run_one_sim, sizes)
+    # results come back in completion order, not submission order
+    results = pool.imap_unordered(run_one_sim, jobs)
+    finished = 0
+    while finished < len(jobs):
+        try:
+            r = results.next(timeout=dashboard.period)
+        except multiprocessing.TimeoutError:
+            if args.dashboard:
+                dashboard.refresh()
+            continue
+        finished += 1
+        dashboard.finished(r[0])
+        if dashboard.queued:
+            dashboard.started(next(iter(dashboard.queued)))
+        journal.append(r[0], r)
+        journal.materialize(out_csv, header)
     pool.close()
     pool.join()
 
     # write results to csv
-    f =open(out_csv, "w", newline="")
-    writer =csv.writer(f)
-    header =["L1_Size", "Execution_Time", "Hits", "Misses"]
-    writer.writerow(header)
-    for r in results:
-        writer.writerow(r)
-    f.close()
+    journal.materialize(out_csv, header)
 
     print("")
     print("Sweep Complete! Data saved to:")
-    print(out_csv)
\ No newline at end of file
+    print(out_csv)
+    # which sizes are still missing, and why
+    print_failure_summary(collect_failures({sz: out_dir_for(sz) for sz in todo}, start), len(todo))
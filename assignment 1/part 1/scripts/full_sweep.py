@@ -1,94 +1,291 @@
-import subprocess
-import re
-import csv
 import multiprocessing
 import os
 import itertools
 import argparse
+import csv
+import random
+import sys
+import time
+from collections import namedtuple
+
+import pandas as pd
 
-gem5_installation = "/home/tishya/shivam/hpc/gem5"
+# GEM5_HOME overrides the cluster path, e.g. on queue workers of other hosts
+gem5_installation = os.environ.get("GEM5_HOME", "/home/tishya/shivam/hpc/gem5")
 project_base = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
+sys.path.insert(0, os.path.abspath(os.path.join(project_base, "..")))
+from sweeplib.build import M5OPS_SUFFIX, build_all, cross_compiler, matrix_multiply_name, variant
+from sweeplib.checkpoint import ensure_checkpoint
+from sweeplib.journal import Journal
+from sweeplib.failures import collect_failures, print_failure_summary, run_with_retries, write_failures
+from sweeplib.monitor import PROGRESS_TICKS, Dashboard
+from sweeplib.replay import ensure_trace, reference_stats
+from sweeplib.result_store import ResultStore, inputs_digest, is_complete, result_key
+from sweeplib.scheduler import CostModel, load_history, run_longest_first
+from sweeplib.halving import SCORES, parse_budgets, successive_halving
+from sweeplib.stats_parser import format_stat, lookup, parse_final
+from sweeplib.stats_reader import gem5_stats_options
+from sweeplib.surrogate import load_config_list
+from sweeplib.validation import compare, compare_stats, print_comparison
+from sweeplib.workqueue import run_queued
+
 gem5_bin = os.path.join(gem5_installation, "build/RISCV/gem5.opt")
 cache_conf = os.path.join(project_base, "configs/cache_config.py")
 
-def build_benchmark(matrix_size, test_binary):
-    src_file = os.path.join(project_base, "benchmarks/matrix_multiply.c")
-    
-    build_cmd = [
-        "/home/tishya/shivam/hpc/gem5/riscv-toolchain/riscv/bin/riscv64-unknown-linux-gnu-gcc",
-        "-O2", "-static", f"-DMATRIX_SIZE={matrix_size}",
-        src_file, "-o", test_binary
-    ]
-    
-    try:
-        subprocess.run(build_cmd, check=True)
-        print(f"Compiled benchmark for {matrix_size}x{matrix_size} matrix: {test_binary}")
-    except subprocess.CalledProcessError:
-        print(f"Failed to compile benchmark for {matrix_size}x{matrix_size} matrix")
-        exit(1)
-
-def execute_config(params):
-    l1_sz, l2_sz, l1_assoc, l2_assoc, test_binary, sweep_output = params
+def build_benchmark(matrix_size, test_binary, m5ops=False):
+    # Reused from the build cache unless the source, toolchain or flags changed; RuntimeError on failure
+    spec = variant(matrix_multiply_name(matrix_size), m5ops=m5ops, home=gem5_installation)
+    spec["output"] = test_binary
+    build_all({os.path.basename(test_binary): spec}, cc=cross_compiler(gem5_installation))
+    print(f"Benchmark for {matrix_size}x{matrix_size} matrix ready: {test_binary}")
+
+class SweepJob(namedtuple("SweepJob", ["l1_size", "l2_size", "l1_assoc", "l2_assoc", "binary", "sweep_output",
+                                       "restore_ckpt", "digest", "force", "max_insts", "latency", "roi", "trace",
+                                       "dump_period", "stats_profile", "limits", "retry"])):
+    """One configuration and everything its run depends on.
+
+    A tuple underneath, so it pickles for the pool; the work queue hands it
+    over as a JSON list, which execute_config turns back into a SweepJob.
+    """
+    __slots__ = ()
+
+    @property
+    def config(self):
+        return (self.l1_size, self.l2_size, self.l1_assoc, self.l2_assoc)
+
+def config_key(job):
+    key_params = [*job.config, bool(job.restore_ckpt)]
+    if job.max_insts:
+        key_params.append(job.max_insts)
+    if job.latency:
+        key_params.append(f"cacti_{job.latency[1]}nm")
+    if job.roi:
+        key_params.append("roi")
+    if job.trace:
+        key_params.append(f"replay_{job.trace[1]}")
+    if job.dump_period:
+        key_params.append(f"dump_{job.dump_period}")
+    if job.stats_profile != "full":
+        key_params.append(f"stats_{job.stats_profile}")
+    return result_key(job.digest, key_params)
+
+def config_features(matrix_size, l1_sz, l2_sz, l1_assoc, l2_assoc):
+    return {"workload": matrix_size, "l1_size": l1_sz, "l2_size": l2_sz, "l1_assoc": str(l1_assoc), "l2_assoc": str(l2_assoc)}
+
+def sweep_history():
+    # hostSeconds/simInsts of every earlier run, across all matrix sizes
+    runs = []
+    results_dir = os.path.join(project_base, "results")
+    for sweep_dir in os.listdir(results_dir) if os.path.exists(results_dir) else []:
+        suffix = sweep_dir[len("full_sweep"):].lstrip("_")
+        if not sweep_dir.startswith("full_sweep") or not (suffix == "" or suffix.isdigit()):
+            continue
+        if not os.path.isdir(os.path.join(results_dir, sweep_dir)):
+            continue
+        matrix_size = int(suffix) if suffix else 128
+        for config_dir in os.listdir(os.path.join(results_dir, sweep_dir)):
+            parts = config_dir.split("_")
+            if len(parts) == 8 and parts[0] == "L1":
+                stats_file = os.path.join(results_dir, sweep_dir, config_dir, "stats.txt")
+                runs.append((config_features(matrix_size, parts[1], parts[3], parts[5], parts[7]), stats_file))
+    return load_history(runs)
+
+def sim_output_of(job):
+    config_id = config_id_of(*job.config)
+    # Budget-limited exploration runs are kept apart from full runs
+    if job.max_insts:
+        return os.path.join(job.sweep_output, "explore", f"insts_{job.max_insts}", config_id)
+    return os.path.join(job.sweep_output, config_id)
+
+def execute_config(job):
+    job = SweepJob(*job)
+    l1_sz, l2_sz, l1_assoc, l2_assoc = job.config
     
-    config_id = f"L1_{l1_sz}_L2_{l2_sz}_A1_{l1_assoc}_A2_{l2_assoc}"
-    sim_output = os.path.join(sweep_output, config_id)
+    config_id = config_id_of(*job.config)
+    sim_output = sim_output_of(job)
     os.makedirs(sim_output, exist_ok=True)
     
     sim_command = [
         gem5_bin,
         "-d", sim_output,
+        *gem5_stats_options(job.stats_profile),
         cache_conf,
         f"--l1d_size={l1_sz}",
         f"--l2_size={l2_sz}", 
         f"--l1_assoc={l1_assoc}",
         f"--l2_assoc={l2_assoc}",
-        f"--binary={test_binary}"
+        f"--binary={job.binary}",
+        f"--progress_interval={PROGRESS_TICKS}"
     ]
+    if job.restore_ckpt:
+        sim_command.append(f"--restore_checkpoint={job.restore_ckpt}")
+    if job.max_insts:
+        sim_command.append(f"--max_insts={job.max_insts}")
+    if job.latency:
+        sim_command += [f"--cacti_latency_table={job.latency[0]}", f"--tech_node={job.latency[1]}"]
+    if job.roi:
+        sim_command.append("--roi")
+    if job.trace:
+        sim_command.append(f"--replay_trace={job.trace[0]}")
+    if job.dump_period:
+        sim_command.append(f"--dump_period_insts={job.dump_period}")
+    if job.stats_profile != "full":
+        sim_command.append(f"--stats_profile={job.stats_profile}")
+
+    store = ResultStore()
+    key = config_key(job)
     
     try:
-        subprocess.run(sim_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if job.force or not store.fetch(key, sim_output):
+            # Transient failures (OOM kills, ...) are retried; the rest leave failure.json
+            failure = run_with_retries(sim_command, sim_output, limits=job.limits, retries=job.retry[0],
+                                       backoff=job.retry[1])
+            if failure:
+                return [l1_sz, l2_sz, l1_assoc, l2_assoc, f"Failed: {failure['category']}", 0, 0]
+            store.put(key, sim_output, meta={"config": config_id, "binary": job.binary,
+                                             "checkpoint": bool(job.restore_ckpt), "max_insts": job.max_insts,
+                                             "tech_node": job.latency[1] if job.latency else None, "roi": job.roi,
+                                             "replay": job.trace[1] if job.trace else None,
+                                             "dump_period": job.dump_period, "stats_profile": job.stats_profile})
         
-        stat_file = os.path.join(sim_output, "stats.txt")
-        if not os.path.exists(stat_file):
-            return [l1_sz, l2_sz, l1_assoc, l2_assoc, "Failed", 0, 0]
-
-        with open(stat_file, "r") as f:
-            stat_content = f.read()
-            time_result = re.search(r"simSeconds\s+([0-9\.e\-]+)", stat_content)
-            exec_time = time_result.group(1) if time_result else "N/A"
-            
-            l1_miss_pattern = re.search(r"system\.cpu\.dcache\.overallMissRate::total\s+([0-9\.e\-]+)", stat_content)
-            l2_miss_pattern = re.search(r"system\.l2cache\.overallMissRate::total\s+([0-9\.e\-]+)", stat_content)
-            
-            l1_rate = l1_miss_pattern.group(1) if l1_miss_pattern else "0"
-            l2_rate = l2_miss_pattern.group(1) if l2_miss_pattern else "0"
-            
-            return [l1_sz, l2_sz, l1_assoc, l2_assoc, exec_time, l1_rate, l2_rate]
+        return read_result(l1_sz, l2_sz, l1_assoc, l2_assoc, sim_output)
 
     except Exception as e:
         return [l1_sz, l2_sz, l1_assoc, l2_assoc, "Error", 0, 0]
 
+def read_result(l1_sz, l2_sz, l1_assoc, l2_assoc, sim_output):
+    stats = parse_final(os.path.join(sim_output, "stats.txt"))
+    if not stats:
+        return [l1_sz, l2_sz, l1_assoc, l2_assoc, "Failed", 0, 0]
+
+    exec_time = format_stat(lookup(stats, "simSeconds", "N/A"))
+    l1_rate = format_stat(lookup(stats, "L1_MissRate", "0"))
+    l2_rate = format_stat(lookup(stats, "L2_MissRate", "0"))
+    return [l1_sz, l2_sz, l1_assoc, l2_assoc, exec_time, l1_rate, l2_rate]
+
+def config_id_of(l1_sz, l2_sz, l1_assoc, l2_assoc):
+    return f"L1_{l1_sz}_L2_{l2_sz}_A1_{l1_assoc}_A2_{l2_assoc}"
+
+def row_succeeded(row):
+    return not str(row[4]).startswith(("Failed", "Error", "Killed")) and row[4] != "N/A"
+
+def report_failures(configs, output_dir, since):
+    # Which points of this sweep are missing, and why
+    failures = collect_failures({config_id_of(*job.config): sim_output_of(job) for job in configs}, since)
+    print_failure_summary(failures, len(configs))
+    if failures:
+        failures_file = os.path.join(output_dir, "failures.csv")
+        write_failures(failures, failures_file)
+        print(f"Failed configurations listed in {failures_file}")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run full sweep for matrix multiplication benchmark.")
     parser.add_argument("--size", type=int, choices=[64, 128, 256], default=128, help="Matrix size (N for NxN matrix). Default: 128.")
+    parser.add_argument("--checkpoint", action="store_true", help="Checkpoint after matrix_init() once and restore it for every configuration")
+    parser.add_argument("--force", action="store_true", help="Re-run configurations even if the result store has them")
+    parser.add_argument("--resume", action="store_true", help="Keep the existing journal and only run configurations without a result")
+    parser.add_argument("--threads", type=int, default=multiprocessing.cpu_count(), help="Number of parallel gem5 jobs. Default: all cores.")
+    parser.add_argument("--explore", type=str, default=None, metavar="BUDGETS",
+                        help="Successive halving instead of the full product: comma-separated instruction budgets, "
+                             "e.g. 1000000,10000000; survivors of the last budget run to completion")
+    parser.add_argument("--explore_keep", type=float, default=0.25, help="Fraction of candidates promoted per round. Default: 0.25")
+    parser.add_argument("--explore_score", choices=sorted(SCORES), default="cpi",
+                        help="Ranking metric for promotion. Default: cpi (simTicks per instruction)")
+    parser.add_argument("--config_list", type=str, default=None,
+                        help="Run only this CSV's MatMul rows for --size (e.g. suggestions from sweeplib.surrogate) "
+                             "instead of the full product")
+    parser.add_argument("--cacti_latency_table", type=str, default=None,
+                        help="CSV from assignment 2's cacti_sweep.py --latency_table; cache latencies are taken from it")
+    parser.add_argument("--tech_node", type=int, default=None, help="Technology node (nm) to read from --cacti_latency_table")
+    parser.add_argument("--roi", action="store_true",
+                        help="Measure only matrix_multiply(): setup runs on an atomic CPU and stats are reset at the kernel")
+    parser.add_argument("--replay", action="store_true",
+                        help="Record the CPU's cache requests once on --replay_reference and replay them into every "
+                             "configuration instead of simulating the CPU (miss rates only; Time is not meaningful)")
+    parser.add_argument("--replay_reference", type=str, default="32kB,256kB,4,8", metavar="L1,L2,A1,A2",
+                        help="Configuration the request trace is recorded on. Default: 32kB,256kB,4,8, the centre "
+                             "of this sweep's grid (run_sweep.py uses the centre of its own, 64kB,512kB,8,8)")
+    parser.add_argument("--replay_check", type=int, default=None, metavar="N",
+                        help="With --replay, also run N random configurations in full and report how far replay diverges")
+    parser.add_argument("--max_wall", type=float, default=None, metavar="MINUTES",
+                        help="Kill any gem5 job running longer than this; its row reads Failed: timeout")
+    parser.add_argument("--max_rss", type=int, default=None, metavar="MB",
+                        help="Kill any gem5 job whose resident memory exceeds this; its row reads Failed: rss_limit")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Re-runs of a job that failed for a transient reason (OOM kill, signal, full disk). Default: 2")
+    parser.add_argument("--retry_backoff", type=float, default=60, metavar="SECONDS",
+                        help="Wait before the first retry, doubled for each further one. Default: 60")
+    parser.add_argument("--dashboard", type=float, default=60, metavar="SECONDS",
+                        help="Print the progress/ETA dashboard this often; 0 turns it off. Default: 60")
+    parser.add_argument("--dump_period", type=int, default=None, metavar="INSTS",
+                        help="Also dump stats every INSTS instructions for phase analysis (analyze.py --timeseries)")
+    parser.add_argument("--stats_profile", choices=["full", "compact", "whitelist", "hdf5"], default="full",
+                        help="What gem5 writes per run (cache_config.py --stats_profile): whitelist keeps only the "
+                             "stats the sweep reads, for a fraction of the size and parse time. Default: full")
+    parser.add_argument("--enqueue", type=str, default=None, metavar="QUEUE",
+                        help="Put the jobs in this queue file and wait for 'python3 -m sweeplib.workqueue worker QUEUE' "
+                             "processes (on any host sharing the tree) to run them, instead of a local pool")
     args = parser.parse_args()
+    if args.cacti_latency_table and args.tech_node is None:
+        parser.error("--cacti_latency_table needs --tech_node")
+    if args.replay and (args.checkpoint or args.roi or args.explore):
+        parser.error("--replay cannot be combined with --checkpoint, --roi or --explore")
+    if args.replay and args.dump_period:
+        parser.error("--dump_period needs CPU runs; it cannot be combined with --replay")
+    if args.replay_check and not args.replay:
+        parser.error("--replay_check needs --replay")
+    latency = (os.path.abspath(args.cacti_latency_table), args.tech_node) if args.cacti_latency_table else None
+    limits = (args.max_wall * 60 if args.max_wall else None, args.max_rss) if args.max_wall or args.max_rss else None
+    retry = (args.retries, args.retry_backoff)
 
     # Dynamic paths based on size
     size_suffix = f"_{args.size}x{args.size}" if args.size != 128 else ""
     binary_name = f"matrix_multiply{size_suffix}"
+    if args.checkpoint or args.roi:
+        # Marker builds live next to the plain binary, never in its place
+        binary_name += M5OPS_SUFFIX
     test_binary = os.path.join(project_base, f"benchmarks/{binary_name}")
     
     output_dir_name = f"full_sweep_{args.size}" if args.size != 128 else "full_sweep"
-    sweep_output = os.path.join(project_base, f"results/{output_dir_name}")
+    if latency:
+        # CACTI-timed sweeps get their own tree next to the fixed-latency one
+        output_dir_name += f"_cacti_{args.tech_node}nm"
+    if args.roi:
+        output_dir_name += "_roi"
+    # Kernel-only stats after a restore are not comparable with whole-program runs
+    if args.checkpoint:
+        output_dir_name += "_ckpt"
+    # Replayed results sit next to the full runs they approximate
+    full_output = os.path.join(project_base, f"results/{output_dir_name}")
+    sweep_output = full_output + "_replay" if args.replay else full_output
     
     results_file_name = f"full_sweep_results_{args.size}.csv" if args.size != 128 else "full_sweep_results.csv"
     results_file = os.path.join(sweep_output, results_file_name)
 
     # Build the benchmark first
-    build_benchmark(args.size, test_binary)
+    try:
+        build_benchmark(args.size, test_binary, m5ops=args.checkpoint or args.roi)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
     
     os.makedirs(sweep_output, exist_ok=True)
+
+    restore_ckpt = None
+    if args.checkpoint:
+        restore_ckpt = ensure_checkpoint(gem5_bin, cache_conf, test_binary, os.path.join(sweep_output, "checkpoints"))
+
+    trace = None
+    if args.replay:
+        reference = dict(zip(("l1d_size", "l2_size", "l1_assoc", "l2_assoc"), args.replay_reference.split(",")))
+        if len(reference) != 4:
+            parser.error("--replay_reference takes L1,L2,A1,A2, e.g. 32kB,256kB,4,8")
+        latency_args = [f"--cacti_latency_table={latency[0]}", f"--tech_node={latency[1]}"] if latency else []
+        trace_dir = ensure_trace(gem5_bin, cache_conf, test_binary, os.path.join(sweep_output, "traces"), reference,
+                                 extra_args=latency_args, force=args.force)
+        reference_id = config_id_of(reference["l1d_size"], reference["l2_size"], reference["l1_assoc"], reference["l2_assoc"])
+        trace = (trace_dir, reference_id)
     
     l1_cache_sizes = ["16kB", "32kB", "64kB"]
     l2_cache_sizes = ["128kB", "256kB", "512kB"]
@@ -96,17 +293,108 @@ if __name__ == "__main__":
     l2_associativities = ["4", "8", "16"]
     
     base_configs = list(itertools.product(l1_cache_sizes, l2_cache_sizes, l1_associativities, l2_associativities))
-    all_configurations = [(*cfg, test_binary, sweep_output) for cfg in base_configs]
-    
-    parallel_workers = min(multiprocessing.cpu_count(), len(all_configurations))
-    print(f"Starting Full Sweep for {args.size}x{args.size} on {parallel_workers} cores ({len(all_configurations)} total configs)...")
-    
-    with multiprocessing.Pool(parallel_workers) as pool:
-        config_results = pool.map(execute_config, all_configurations)
+    if args.config_list:
+        base_configs = [cfg[:4] for cfg in load_config_list(args.config_list, types=["MatMul"], matrix_size=args.size)]
+    digest = inputs_digest(gem5_bin, cache_conf, test_binary, latency_table=args.cacti_latency_table)
+
+    def job_for(cfg):
+        return SweepJob(*cfg, binary=test_binary, sweep_output=sweep_output, restore_ckpt=restore_ckpt, digest=digest,
+                        force=args.force, max_insts=None, latency=latency, roi=args.roi, trace=trace,
+                        dump_period=args.dump_period, stats_profile=args.stats_profile, limits=limits, retry=retry)
+
+    all_configurations = [job_for(cfg) for cfg in base_configs]
+    results_header = ["L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc", "Time", "L1_MissRate", "L2_MissRate"]
+    store = ResultStore()
+
+    def run_jobs(func, jobs, threads, model, **kwargs):
+        # Local longest-first pool, or the shared queue's workers
+        if args.enqueue:
+            return run_queued(args.enqueue, func, jobs, model, **kwargs)
+        return run_longest_first(func, jobs, threads, model, **kwargs)
+
+    def dashboard_for(model, max_insts=None):
+        # Budgeted runs stop at max_insts, whatever full runs committed
+        expected = (lambda features: max_insts) if max_insts else model.expected_insts
+        return Dashboard(sim_output_of, expected, period=args.dashboard) if args.dashboard else None
+
+    sweep_start = time.time()
+    if args.explore:
+        def run_budget(configs, max_insts):
+            budgeted = [job._replace(max_insts=max_insts) for job in configs]
+            jobs = [(config_features(args.size, *job.config), job) for job in budgeted]
+            model = CostModel(sweep_history())
+            run_jobs(execute_config, jobs, max(1, min(args.threads, len(jobs))), model,
+                     skip=lambda features, job: not args.force and store.has(config_key(job)),
+                     dashboard=dashboard_for(model, max_insts))
+            return {job: parse_final(os.path.join(sim_output_of(b), "stats.txt")) for job, b in zip(configs, budgeted)}
+
+        final = successive_halving(all_configurations, run_budget, parse_budgets(args.explore),
+                                   keep=args.explore_keep, score=SCORES[args.explore_score])
+        explore_file = os.path.join(sweep_output, f"explore_results_{args.size}.csv")
+        with open(explore_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(results_header)
+            writer.writerows(read_result(*job.config, sim_output_of(job)) for job in sorted(final))
+        print(f"Exploration complete! {len(final)} configurations ran to completion; data saved to {explore_file}")
+        report_failures(final, sweep_output, sweep_start)
+        sys.exit(0)
+
+    # Every finished configuration is journaled (fsync'd) as it completes
+    journal = Journal(os.path.join(sweep_output, "sweep_journal.jsonl"))
+    if not args.resume:
+        journal.reset()
+
+    pending = []
+    journaled = journal.rows()
+    for job in all_configurations:
+        config_id = config_id_of(*job.config)
+        if config_id in journaled and row_succeeded(journaled[config_id]):
+            continue
+        sim_output = os.path.join(sweep_output, config_id)
+        if args.resume and is_complete(sim_output):
+            # Finished before the crash but never journaled
+            journal.append(config_id, read_result(*job.config, sim_output))
+            continue
+        pending.append(job)
+    if args.resume:
+        print(f"Resuming: {len(all_configurations) - len(pending)} configurations already done, {len(pending)} pending")
     
-    with open(results_file, "w", newline="") as f:
-        file_writer = csv.writer(f)
-        file_writer.writerow(["L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc", "Time", "L1_MissRate", "L2_MissRate"])
-        file_writer.writerows(config_results)
-        
-    print(f"Full Sweep Complete! Data saved to {results_file}")
\ No newline at end of file
+    parallel_workers = max(1, min(args.threads, len(pending)))
+    print(f"Starting Full Sweep for {args.size}x{args.size} on {parallel_workers} cores ({len(pending)} of {len(all_configurations)} configs to run)...")
+
+    def record(features, job, row):
+        journal.append(config_id_of(*job.config), row)
+        journal.materialize(results_file, results_header)
+
+    # Longest predicted configurations first, dispatched one at a time
+    jobs = [(config_features(args.size, *job.config), job) for job in pending]
+    model = CostModel(sweep_history())
+    run_jobs(execute_config, jobs, parallel_workers, model, on_result=record,
+             skip=lambda features, job: not args.force and store.has(config_key(job)), dashboard=dashboard_for(model))
+
+    journal.materialize(results_file, results_header)
+    print(f"Full Sweep Complete! Data saved to {results_file}")
+    report_failures(pending, sweep_output, sweep_start)
+
+    if args.replay_check:
+        # Full CPU runs of a random sample, into (and reused from) the ordinary sweep tree
+        checked = random.Random(0).sample(base_configs, min(args.replay_check, len(base_configs)))
+        print(f"Checking replay against {len(checked)} full runs...")
+        full_configs = [job_for(cfg)._replace(sweep_output=full_output, trace=None) for cfg in checked]
+        jobs = [(config_features(args.size, *job.config), job) for job in full_configs]
+        model = CostModel(sweep_history())
+        run_jobs(execute_config, jobs, max(1, min(args.threads, len(jobs))), model,
+                 skip=lambda features, job: not args.force and store.has(config_key(job)),
+                 dashboard=dashboard_for(model))
+        divergence = compare(full_output, sweep_output, [config_id_of(*cfg) for cfg in checked])
+
+        # The recorded run itself: replay's error on the configuration it came from
+        ref_cfg = job_for((reference["l1d_size"], reference["l2_size"], reference["l1_assoc"], reference["l2_assoc"]))
+        execute_config(ref_cfg)
+        ref_rows = compare_stats(parse_final(reference_stats(trace_dir)),
+                                 parse_final(os.path.join(sim_output_of(ref_cfg), "stats.txt")), f"{reference_id} (recorded)")
+        divergence = pd.concat([pd.DataFrame(ref_rows), divergence], ignore_index=True)
+        print_comparison(divergence)
+        divergence_file = os.path.join(sweep_output, "replay_divergence.csv")
+        divergence.to_csv(divergence_file, index=False)
+        print(f"Divergence report saved to {divergence_file}")
@@ -2,7 +2,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
-import numpy as np
+import sys
+import argparse
 
 # Paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,6 +12,21 @@ results_base = os.path.join(project_base, "results")
 plot_output = os.path.join(results_base, 'analysis_all')
 os.makedirs(plot_output, exist_ok=True)
 
+sys.path.insert(0, os.path.abspath(os.path.join(project_base, "..")))
+from sweeplib.pareto import pareto_front
+
+parser = argparse.ArgumentParser(description="Pareto-optimal cache configurations per matrix size")
+parser.add_argument("--objectives", default="TotalCacheSize,simTicks",
+                    help="Comma-separated columns to minimise (any enhanced_results column, e.g. TotalEnergy or EDP "
+                         "after analyze.py --energy_table). Default: TotalCacheSize,simTicks")
+parser.add_argument("--eps", type=float, default=None,
+                    help="Relative epsilon dominance: treat points within this fraction (e.g. 0.02) as equivalent")
+args = parser.parse_args()
+objectives = [o for o in args.objectives.split(",") if o]
+if len(objectives) < 2:
+    # The plot puts the first two objectives on its axes
+    parser.error("--objectives needs at least two columns, e.g. TotalCacheSize,simTicks")
+
 # Load enhanced data
 data_files = {
     64: os.path.join(results_base, 'full_sweep_64/enhanced_results_64.csv'),
@@ -18,21 +34,6 @@ data_files = {
     256: os.path.join(results_base, 'full_sweep_256/enhanced_results_256.csv')
 }
 
-def is_pareto_efficient(costs):
-    """
-    Find the pareto-efficient points
-    :param costs: An (n_points, n_costs) array
-    :return: A (n_points, ) boolean array indicating whether each point is Pareto efficient
-    """
-    is_efficient = np.ones(costs.shape[0], dtype=bool)
-    for i, c in enumerate(costs):
-        if is_efficient[i]:
-            # Keep any point with a lower cost
-            is_efficient[is_efficient] = np.any(costs[is_efficient] < c, axis=1)
-            # And keep self
-            is_efficient[i] = True
-    return is_efficient
-
 combined_data = []
 for matrix_dim, file_path in data_files.items():
     if os.path.exists(file_path):
@@ -43,6 +44,10 @@ for matrix_dim, file_path in data_files.items():
         print(f"Warning: File not found: {file_path}")
 
 full_dataset = pd.concat(combined_data, ignore_index=True)
+missing = [o for o in objectives if o not in full_dataset.columns]
+if missing:
+    # Energy columns only exist after `analyze.py --energy_table ...`
+    sys.exit(f"Objectives not in the enhanced results: {missing}")
 
 # Filter out 128kB L1 cache configurations as requested in previous steps
 full_dataset = full_dataset[full_dataset['L1_Size'] != '128kB']
@@ -57,28 +62,31 @@ colors = {64: '#1f77b4', 128: '#ff7f0e', 256: '#2ca02c'}
 for size in [64, 128, 256]:
     subset = full_dataset[full_dataset['MatrixSize'] == size].copy()
     
-    # We want to minimize both simTicks and TotalCacheSize
-    # Extract numeric columns for Pareto calculation
-    costs = subset[['TotalCacheSize', 'simTicks']].values
-    
-    efficient_mask = is_pareto_efficient(costs)
-    pareto_points = subset[efficient_mask].sort_values('TotalCacheSize')
+    # Minimize every objective (default: TotalCacheSize and simTicks)
+    pareto_points = pareto_front(subset, objectives, eps=args.eps, relative=True).sort_values(objectives[0])
     
     # Store for summary
     pareto_points['MatrixSize'] = size
     pareto_results.append(pareto_points)
     
-    # Scatter plot of all points
-    plt.scatter(subset['TotalCacheSize'], subset['simTicks'], 
+    # Scatter plot of all points (first two objectives)
+    plt.scatter(subset[objectives[0]], subset[objectives[1]], 
                color=colors[size], alpha=0.2, label=f'{size}x{size} (All)', s=20)
     
     # Pareto front line
-    plt.plot(pareto_points['TotalCacheSize'], pareto_points['simTicks'], 
+    plt.plot(pareto_points[objectives[0]], pareto_points[objectives[1]], 
             'o-', color=colors[size], linewidth=3, markersize=8, label=f'{size}x{size} Pareto Front')
 
+axis_labels = {
+    'TotalCacheSize': 'Total Cache Size (L1D + L2) [kB]',
+    'simTicks': 'Execution Time (simTicks) [log scale]',
+    'TotalEnergy': 'L1D + L2 Energy [J]',
+    'EDP': 'Energy-Delay Product [J·s]',
+    'ED2P': 'Energy-Delay² Product [J·s²]',
+}
 plt.yscale('log')
-plt.xlabel('Total Cache Size (L1D + L2) [kB]', fontsize=14, fontweight='bold')
-plt.ylabel('Execution Time (simTicks) [log scale]', fontsize=14, fontweight='bold')
+plt.xlabel(axis_labels.get(objectives[0], objectives[0]), fontsize=14, fontweight='bold')
+plt.ylabel(axis_labels.get(objectives[1], objectives[1]), fontsize=14, fontweight='bold')
 plt.title('Design Space Exploration: Pareto-Optimal Cache Configurations', fontsize=18, fontweight='bold', pad=20)
 plt.legend(loc='upper right', frameon=True, fontsize=12)
 plt.grid(True, which="both", ls="-", alpha=0.3)
@@ -96,5 +104,5 @@ print(f"Pareto summary saved to: {pareto_csv_path}")
 
 # Print summary table for report
 print("\n--- Pareto Optimal Configurations ---")
-cols_to_print = ['MatrixSize', 'L1_Size', 'L2_Size', 'L1_Assoc', 'L2_Assoc', 'TotalCacheSize', 'simTicks']
+cols_to_print = ['MatrixSize', 'L1_Size', 'L2_Size', 'L1_Assoc', 'L2_Assoc'] + list(dict.fromkeys(['TotalCacheSize', 'simTicks'] + objectives))
 print(all_pareto[cols_to_print].to_string(index=False))
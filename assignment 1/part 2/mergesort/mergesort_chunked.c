@@ -1,6 +1,8 @@
 #include <stdio.h>
 #include <stdlib.h>
 
+#include "../../include/m5markers.h"
+
 /*
     We have ~2.6M integers.
     Instead of sorting everything at once,
@@ -89,6 +91,16 @@ int main(void)
 
         
         merge_sort(chunks[c], temp, 0, CHUNK_SIZE - 1);
+
+        /*
+            Marker builds mark the point after the first chunk's load and
+            sort, so the loop runs in the same order as the default build
+            and the checkpoint and ROI cover the remaining chunks.
+        */
+        if (c == 0) {
+            CHECKPOINT_MARK();
+            ROI_BEGIN();
+        }
     }
 
     fclose(fp);
@@ -129,6 +141,7 @@ int main(void)
         sorted_output[i] = smallest;
         index_in_chunk[chosen_chunk]++;
     }
+    ROI_END();
 
     
     for (int c = 0; c < NUM_CHUNKS; c++)
@@ -1,6 +1,8 @@
 #include <stdio.h>
 #include <stdlib.h>
 
+#include "../../include/m5markers.h"
+
 /*
     This version reads the entire dataset at once
     and performs a standard recursive merge sort.
@@ -85,9 +87,12 @@ int main(void)
     }
 
     fclose(fp);
+    CHECKPOINT_MARK();
 
     // Perform merge sort on full dataset
+    ROI_BEGIN();
     merge_sort(numbers, temp, 0, TOTAL_NUMBERS - 1);
+    ROI_END();
 
     free(numbers);
     free(temp);
@@ -2,11 +2,17 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
 
 # --- Configuration ---
 script_dir = os.path.dirname(os.path.abspath(__file__))
 data_file = os.path.join(script_dir, '../results/results.csv')
 visualization_dir = os.path.join(script_dir, '../results/plots')
+series_file = os.path.join(script_dir, '../results/timeseries_store.parquet')
+
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, "../..")))
+from sweeplib.stats_parser import load_table
+from sweeplib.timeseries import detect_phases, phase_summary
 
 baseline_l1_size = '64kB'
 baseline_l1_assoc = 8
@@ -113,6 +119,37 @@ plt.tight_layout()
 plt.savefig(os.path.join(visualization_dir, 'plot_simple_vs_chunked_comparison.png'), dpi=300, bbox_inches='tight')
 plt.close()
 
+# 9. plot_phases_<type>.png (baseline run over time; needs run_sweep.py --dump_period and extract_results.py --timeseries)
+try:
+    series = load_table(series_file)
+except FileNotFoundError:
+    series = None
+phase_tables = {}
+if series is not None:
+    baseline_series = series[
+        (series['L1_Size'] == baseline_l1_size) & (series['L1_Assoc'] == baseline_l1_assoc) &
+        (series['L2_Size'] == baseline_l2_size) & (series['L2_Assoc'] == baseline_l2_assoc)
+    ]
+    for algo, run in baseline_series.groupby('Type'):
+        run = run.sort_values('interval')
+        phases = detect_phases(run)
+        phase_tables[algo] = phase_summary(run, phases)
+        minsts = run['start_inst'] / 1e6
+        mends = (run['start_inst'] + run['simInsts']) / 1e6
+        fig, axes = plt.subplots(3, 1, figsize=(14, 10), sharex=True)
+        fig.suptitle(f'{algo}: Phase Behavior at Baseline', fontsize=16, fontweight='bold')
+        for ax, (col, label, scale) in zip(axes, [('L1_MissRate', 'L1D Miss Rate', 1), ('IPC', 'IPC', 1),
+                                                  ('MemBandwidth', 'DRAM Bandwidth (GB/s)', 1e-9)]):
+            ax.step(minsts, run[col] * scale, where='post', linewidth=2)
+            ax.set_ylabel(label, fontweight='bold')
+            # Shade every other detected phase
+            for phase in range(1, phases.max() + 1, 2):
+                ax.axvspan(minsts[phases == phase].min(), mends[phases == phase].max(), color='#ff7f0e', alpha=0.15)
+        axes[-1].set_xlabel('Instructions (millions)', fontweight='bold')
+        plt.tight_layout()
+        plt.savefig(os.path.join(visualization_dir, f'plot_phases_{algo.lower()}.png'), dpi=300, bbox_inches='tight')
+        plt.close()
+
 # --- Summary ---
 print("\n" + "="*60)
 print("BASELINE PERFORMANCE SUMMARY")
@@ -127,4 +164,8 @@ for algo in ['Simple', 'Chunked']:
     top = dataset[dataset['Type'] == algo].sort_values('IPC', ascending=False).head(3)
     print(top[['L1_Size', 'L2_Size', 'L1_Assoc', 'L2_Assoc', 'IPC']].to_string(index=False))
 
-print(f"\n✅ Success! 8 plots generated in {visualization_dir}")
+for algo, table in phase_tables.items():
+    print(f"\n--- {algo.upper()} PHASES (baseline) ---")
+    print(table[['phase', 'intervals', 'inst_share', 'L1_MissRate', 'L2_MissRate', 'IPC', 'max_dev_pct']].to_string(index=False))
+
+print(f"\n✅ Success! {8 + len(phase_tables)} plots generated in {visualization_dir}")
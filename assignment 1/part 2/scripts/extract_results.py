@@ -1,53 +1,75 @@
 import os
-import re
+import sys
 import csv
+import time
+import argparse
 
-def extract_stats(stats_file):
+# Shared stats parser lives in assignment 1/sweeplib
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from sweeplib.archive import open_archive
+from sweeplib.energy import ENERGY_COLUMNS, hierarchy_energy, load_cacti_table, resolve_tech_node
+from sweeplib.stats_index import StatsIndex
+from sweeplib.stats_parser import build_table, format_stat, lookup, parse_final, save_table
+from sweeplib.timeseries import build_series_table, load_series, series_of
+
+results_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../results"))
+
+headers = ["L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc", "Type", "Time", "Cycles", "L1_MissRate", "L2_MissRate", "IPC"]
+
+def extract_stats(stats_file, index=None):
     if not os.path.exists(stats_file) or os.path.getsize(stats_file) < 1024:
         return None
     try:
-        with open(stats_file, "r") as f:
-            stat_text = f.read()
-            time_pattern = re.search(r"simSeconds\s+([0-9\.e\-]+)", stat_text)
-            exec_time = time_pattern.group(1) if time_pattern else "N/A"
-            
-            ticks_pattern = re.search(r"simTicks\s+([0-9]+)", stat_text)
-            sim_ticks = ticks_pattern.group(1) if ticks_pattern else "0"
-            
-            # Extract IPC
-            ipc_pattern = re.search(r"system\.cpu\.ipc\s+([0-9\.e\-]+)", stat_text)
-            ipc_val = ipc_pattern.group(1) if ipc_pattern else "0"
-
-            # Extract miss rates (handling both naming conventions)
-            l1_miss_pattern = re.search(r"system\.(?:cpu\.dcache|l1d)\.overallMissRate::total\s+([0-9\.e\-]+)", stat_text)
-            l2_miss_pattern = re.search(r"system\.(?:l2cache|l2)\.overallMissRate::total\s+([0-9\.e\-]+)", stat_text)
-            
-            l1_miss_val = l1_miss_pattern.group(1) if l1_miss_pattern else "0"
-            l2_miss_val = l2_miss_pattern.group(1) if l2_miss_pattern else "0"
-            
-            return [exec_time, sim_ticks, l1_miss_val, l2_miss_val, ipc_val]
+        stats = index.get(stats_file) if index else parse_final(stats_file)
     except Exception:
         return None
+    if not stats:
+        return None
+    return stats
+
+def result_row(stats):
+    exec_time = lookup(stats, 'simSeconds', "N/A")
+    sim_ticks = lookup(stats, 'simTicks', 0)
+    ipc_val = lookup(stats, 'IPC', 0)
+    # Miss rates (both naming conventions handled by lookup)
+    l1_miss_val = lookup(stats, 'L1_MissRate', 0)
+    l2_miss_val = lookup(stats, 'L2_MissRate', 0)
+    return [format_stat(v) for v in (exec_time, sim_ticks, l1_miss_val, l2_miss_val, ipc_val)]
+
+def process(index=None, results_dir=results_dir, energy=None, timeseries=False):
+    """Rebuild results.csv and the stats store; ``energy`` is a (CACTI table, tech node) pair
+    that adds the ``sweeplib.energy`` columns to both. With ``timeseries``, runs with periodic
+    dumps also go to a per-interval store (``sweeplib.timeseries``)."""
+    base_dir = os.path.join(results_dir, "stats")
+    output_csv = os.path.join(results_dir, "results.csv")
+    store_file = os.path.join(results_dir, "stats_store.parquet")
+    series_file = os.path.join(results_dir, "timeseries_store.parquet")
+    if index is None:
+        # Parsed stats of earlier runs, so re-runs only parse new or changed files
+        index = StatsIndex(os.path.join(results_dir, "stats_index.json"))
 
-def process():
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../results/stats"))
-    output_csv = os.path.abspath(os.path.join(os.path.dirname(__file__), "../results/results.csv"))
-    
-    headers = ["L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc", "Type", "Time", "Cycles", "L1_MissRate", "L2_MissRate", "IPC"]
     all_results = []
+    all_runs = []
+    all_series = []
 
     print(f"Scanning: {base_dir}")
-    if not os.path.exists(base_dir):
+    # Runs packed by sweeplib.archive (or archived from a --scratch sweep) have no directory
+    archive = open_archive(base_dir)
+    if not os.path.exists(base_dir) and not archive:
         print("Error: Statistics directory not found.")
         return
 
-    for config_dir in sorted(os.listdir(base_dir)):
+    on_disk = set(os.listdir(base_dir)) if os.path.exists(base_dir) else set()
+    for config_dir in sorted(on_disk | set(archive.keys() if archive else [])):
         config_path = os.path.join(base_dir, config_dir)
-        if not os.path.isdir(config_path):
-            continue
-            
         stats_file = os.path.join(config_path, "stats.txt")
-        stats = extract_stats(stats_file)
+        if config_dir in on_disk and not os.path.isdir(config_path):
+            continue
+        stats = extract_stats(stats_file, index)
+        # A directory without a result (e.g. a failed re-run) falls back to the archived copy
+        from_archive = not stats and archive is not None and config_dir in archive
+        if from_archive:
+            stats = archive.final(config_dir)
         
         if stats:
             # Parse config from dirname: Algorithm_L1_X_L2_Y_A1_Z_A2_W
@@ -58,17 +80,80 @@ def process():
                 l2_size = parts[4]
                 l1_assoc = parts[6]
                 l2_assoc = parts[8]
-                all_results.append([l1_size, l2_size, l1_assoc, l2_assoc, algo] + stats)
+                row = [l1_size, l2_size, l1_assoc, l2_assoc, algo] + result_row(stats)
+                config = {"L1_Size": l1_size, "L2_Size": l2_size, "L1_Assoc": int(l1_assoc), "L2_Assoc": int(l2_assoc), "Type": algo}
+                if timeseries:
+                    # Needs every dump block, which the index does not keep
+                    series = series_of(archive.blocks(config_dir)) if from_archive else load_series(stats_file)
+                    all_series.append((dict(config), series))
+                if energy:
+                    energy_cols = hierarchy_energy(stats, config, *energy) or {}
+                    # Significant digits, not gem5's fixed 6 decimals: short runs use microjoules
+                    row += [f"{energy_cols[c]:.6g}" if c in energy_cols else "N/A" for c in ENERGY_COLUMNS]
+                    config.update(energy_cols)
+                all_results.append(row)
+                all_runs.append((config, stats))
             except IndexError:
                 print(f"Skipping malformed directory: {config_dir}")
 
+    parsed = index.parsed
+    # Runs added to the archive do not show up in the index
+    archive_changed = archive is not None and os.path.exists(output_csv) and \
+        os.path.getmtime(archive.path) > os.path.getmtime(output_csv)
+    if archive:
+        archive.close()
+    # Energy columns depend on the CACTI table too, so they are always rewritten
+    if not index.save() and not archive_changed and os.path.exists(output_csv) and not energy and not timeseries:
+        print("No new or changed results.")
+        return False
+
     with open(output_csv, "w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow(headers)
+        writer.writerow(headers + (ENERGY_COLUMNS if energy else []))
         writer.writerows(all_results)
+
+    # Every statistic of every run, one column per stat
+    if all_runs:
+        store_file = save_table(build_table(all_runs), store_file)
+    series = build_series_table(all_series)
+    if len(series):
+        series_file = save_table(series, series_file)
     
-    print(f"\nProcessing Complete: {len(all_results)} configurations extracted.")
+    print(f"\nProcessing Complete: {len(all_results)} configurations extracted ({parsed} parsed, rest from index).")
     print(f"Saved to: {output_csv}")
+    print(f"Columnar store: {store_file}")
+    if timeseries and len(series):
+        runs = sum(1 for _, s in all_series if len(s))
+        print(f"Time series: {len(series)} intervals of {runs} runs saved to {series_file}")
+    elif timeseries:
+        print("Time series: no run has periodic dumps (run_sweep.py --dump_period)")
+    return True
 
 if __name__ == "__main__":
-    process()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="Re-extract every SECONDS while a sweep is running (Ctrl-C to stop)")
+    parser.add_argument("--results_dir", default=results_dir,
+                        help="Results tree holding stats/ (e.g. results/cacti_22nm for a CACTI-latency sweep)")
+    parser.add_argument("--energy_table", default=None,
+                        help="CACTI table from assignment 2 (cacti_sweep.py --latency_table): adds energy and EDP columns")
+    parser.add_argument("--tech_node", type=int, default=None,
+                        help="Technology node (nm) to price energy at (needed if the table has several)")
+    parser.add_argument("--timeseries", action="store_true",
+                        help="Also save per-interval series of runs with periodic dumps (run_sweep.py --dump_period)")
+    args = parser.parse_args()
+
+    energy = None
+    if args.energy_table:
+        table = load_cacti_table(args.energy_table)
+        energy = (table, resolve_tech_node(table, args.tech_node))
+
+    results_dir = os.path.abspath(args.results_dir)
+    index = StatsIndex(os.path.join(results_dir, "stats_index.json"))
+    process(index, results_dir, energy, args.timeseries)
+    try:
+        while args.watch:
+            time.sleep(args.watch)
+            process(index, results_dir, energy, args.timeseries)
+    except KeyboardInterrupt:
+        pass
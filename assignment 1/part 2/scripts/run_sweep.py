@@ -1,14 +1,40 @@
-import subprocess
 import os
 import itertools
 import multiprocessing
 import argparse
+import csv
+import random
+import shutil
+import sys
+import time
+from collections import namedtuple
+
+import pandas as pd
 
 # --- Configuration ---
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(script_dir, ".."))
-# Note: gem5_bin path is specific to the cluster environment
-gem5_bin = "/home/tishya/shivam/hpc/gem5/build/RISCV/gem5.opt"
+
+sys.path.insert(0, os.path.abspath(os.path.join(project_root, "..")))
+from sweeplib.archive import append_run, archive_path_for, open_archive
+from sweeplib.build import M5OPS_SUFFIX
+from sweeplib.checkpoint import ensure_checkpoint
+from sweeplib.result_store import ResultStore, clear_outputs, file_digest, inputs_digest, is_complete, result_key
+from sweeplib.scheduler import CostModel, load_history, run_longest_first
+from sweeplib.halving import SCORES, parse_budgets, successive_halving
+from sweeplib.failures import FAILURE_FILE, collect_failures, print_failure_summary, run_with_retries, write_failures
+from sweeplib.monitor import KILLED_FILE, PROGRESS_TICKS, Dashboard
+from sweeplib.replay import ensure_trace, reference_stats
+from sweeplib.simpoint import ensure_simpoints, write_estimate
+from sweeplib.validation import compare, compare_stats, print_comparison
+from sweeplib.workqueue import run_queued
+from sweeplib.stats_parser import parse_final
+from sweeplib.stats_reader import gem5_stats_options
+from sweeplib.surrogate import load_config_list
+from extract_results import headers, result_row
+# Note: the default gem5 path is specific to the cluster environment; GEM5_HOME overrides it
+# (e.g. for queue workers on other hosts)
+gem5_bin = os.path.join(os.environ.get("GEM5_HOME", "/home/tishya/shivam/hpc/gem5"), "build/RISCV/gem5.opt")
 cache_conf = os.path.join(project_root, "configs/cache_config.py")
 
 # Binaries
@@ -17,6 +43,10 @@ chunked_binary = os.path.join(project_root, "mergesort/mergesort_c")
 
 # Output
 output_base_dir = os.path.join(project_root, "results/stats")
+checkpoint_root = os.path.join(project_root, "results/checkpoints")
+simpoint_root = os.path.join(project_root, "results/simpoints")
+work_dir = os.path.join(project_root, "mergesort")
+input_file = os.path.join(work_dir, "random_numbers.bin")
 
 # Sweep Parameters
 l1_cache_sizes = ["32kB", "64kB", "128kB"]
@@ -27,53 +57,409 @@ algorithm_types = ["Simple", "Chunked"]
 
 all_configs = list(itertools.product(l1_cache_sizes, l2_cache_sizes, l1_associativities, l2_associativities, algorithm_types))
 
-def run_simulation(params, force=False):
-    l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type = params
+# One simulation and everything it depends on. A tuple underneath, so it pickles for the pool;
+# the work queue hands it over as a JSON list, which run_simulation turns back into a SweepJob.
+SweepJob = namedtuple("SweepJob", ["config", "force", "checkpoints", "digests", "adopt", "max_insts", "latency", "roi",
+                                   "simpoints", "traces", "dump_period", "stats_profile", "limits", "retry", "scratch"])
+
+def binary_for(algo_type, m5ops=False):
     binary = simple_binary if algo_type == "Simple" else chunked_binary
+    return binary + M5OPS_SUFFIX if m5ops else binary
+
+def job_key(job):
+    l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type = job.config
+    key_params = [l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type, bool(job.checkpoints)]
+    if job.max_insts:
+        key_params.append(job.max_insts)
+    if job.latency:
+        # The table's contents are already part of the digest
+        key_params.append(f"cacti_{job.latency[1]}nm")
+    if job.roi:
+        key_params.append("roi")
+    if job.simpoints:
+        key_params.append(f"sampled_{file_digest(job.simpoints[algo_type])}")
+    if job.traces:
+        key_params.append(f"replay_{job.traces[algo_type][1]}")
+    if job.dump_period:
+        key_params.append(f"dump_{job.dump_period}")
+    if job.stats_profile != "full":
+        key_params.append(f"stats_{job.stats_profile}")
+    return result_key(job.digests[algo_type], key_params)
+
+def config_name_of(params):
+    l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type = params
+    return f"{algo_type}_L1_{l1_sz}_L2_{l2_sz}_A1_{l1_assoc}_A2_{l2_assoc}"
+
+def results_dir_for(latency=None, roi=False, sampled=False, replay=False, checkpointed=False):
+    # Runs with CACTI-derived latencies get their own results tree
+    results_dir = os.path.join(project_root, "results")
+    if latency:
+        results_dir = os.path.join(results_dir, f"cacti_{latency[1]}nm")
+    # ROI-only stats are not comparable with whole-program ones
+    if roi:
+        results_dir = os.path.join(results_dir, "roi")
+    # Nor are runs restored from a checkpoint, which skip the input load
+    if checkpointed:
+        results_dir = os.path.join(results_dir, "checkpointed")
+    # So are sampled estimates, which are validated against results/stats
+    if sampled:
+        results_dir = os.path.join(results_dir, "sampled")
+    # And trace replays, whose timing is not a CPU's
+    if replay:
+        results_dir = os.path.join(results_dir, "replay")
+    return results_dir
+
+def sim_dir_for(params, max_insts=None, latency=None, roi=False, sampled=False, replay=False, checkpointed=False):
+    results_dir = results_dir_for(latency, roi, sampled, replay, checkpointed)
+    # Budget-limited exploration runs never mix with full runs in results/stats
+    if max_insts:
+        return os.path.join(results_dir, "explore", f"insts_{max_insts}", config_name_of(params))
+    return os.path.join(results_dir, "stats", config_name_of(params))
+
+def sim_dir_of(job):
+    return sim_dir_for(job.config, job.max_insts, job.latency, job.roi, bool(job.simpoints), bool(job.traces),
+                       bool(job.checkpoints))
+
+def run_dir_for(sim_dir, scratch=None):
+    # Where gem5 writes: the run's own directory, or its mirror under a --scratch root
+    return os.path.join(scratch, os.path.relpath(sim_dir, project_root)) if scratch else sim_dir
+
+def archived_key(sim_dir):
+    # Result store key of the run archived for sim_dir, if any
+    archive = open_archive(os.path.dirname(sim_dir))
+    if not archive:
+        return None
+    with archive:
+        return archive.file(os.path.basename(sim_dir), "result_key")
+
+def settle_scratch(run_dir, sim_dir, key):
+    # Archive a finished scratch run, or keep just what explains a failure; the scratch copy goes either way
+    if is_complete(run_dir):
+        append_run(archive_path_for(os.path.dirname(sim_dir)), os.path.basename(sim_dir), run_dir, {"result_key": key})
+        # An older directory would shadow the archived run in extract_results.py
+        shutil.rmtree(sim_dir, ignore_errors=True)
+    else:
+        os.makedirs(sim_dir, exist_ok=True)
+        for name in (FAILURE_FILE, KILLED_FILE, "sim_out.txt", "sim_err.txt"):
+            if os.path.exists(os.path.join(run_dir, name)):
+                shutil.copy2(os.path.join(run_dir, name), os.path.join(sim_dir, name))
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+def job_features(params):
+    l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type = params
+    return {"workload": algo_type, "l1_size": l1_sz, "l2_size": l2_sz, "l1_assoc": str(l1_assoc), "l2_assoc": str(l2_assoc)}
+
+def sweep_history():
+    # Earlier runs in results/stats provide hostSeconds/simInsts for the cost model
+    runs = []
+    if os.path.exists(output_base_dir):
+        for config_dir in os.listdir(output_base_dir):
+            parts = config_dir.split("_")
+            if len(parts) == 9:
+                params = (parts[2], parts[4], parts[6], parts[8], parts[0])
+                runs.append((job_features(params), os.path.join(output_base_dir, config_dir, "stats.txt")))
+    return load_history(runs)
+
+def run_simulation(job):
+    job = SweepJob(*job)
+    l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type = job.config
+    binary = binary_for(algo_type, m5ops=job.roi or bool(job.checkpoints))
     
-    config_name = f"{algo_type}_L1_{l1_sz}_L2_{l2_sz}_A1_{l1_assoc}_A2_{l2_assoc}"
-    sim_dir = os.path.join(output_base_dir, config_name)
-    os.makedirs(sim_dir, exist_ok=True)
+    config_name = config_name_of(job.config)
+    sim_dir = sim_dir_of(job)
+    run_dir = run_dir_for(sim_dir, job.scratch)
     
-    stats_file = os.path.join(sim_dir, "stats.txt")
-    if not force and os.path.exists(stats_file) and os.path.getsize(stats_file) > 1024:
+    store = ResultStore()
+    key = job_key(job)
+    if job.scratch and not job.force and store.has(key) and archived_key(sim_dir) == key:
+        return
+    os.makedirs(run_dir, exist_ok=True)
+    if not job.force and store.fetch(key, run_dir):
+        if job.scratch:
+            settle_scratch(run_dir, sim_dir, key)
+        return
+    if job.adopt and not job.checkpoints and not job.max_insts and not job.simpoints and not job.traces \
+            and not job.dump_period and is_complete(sim_dir):
+        # Pre-store run: trust it as matching the current inputs
+        store.put(key, sim_dir, meta={"config": config_name, "binary": binary, "adopted": True})
         return
         
     cmd = [
         gem5_bin,
-        "-d", sim_dir,
+        "-d", run_dir,
+        *gem5_stats_options(job.stats_profile),
         cache_conf,
         f"--l1d_size={l1_sz}",
         f"--l2_size={l2_sz}",
         f"--l1_assoc={l1_assoc}",
         f"--l2_assoc={l2_assoc}",
-        f"--binary={binary}"
+        f"--binary={binary}",
+        f"--progress_interval={PROGRESS_TICKS}"
     ]
+    if job.checkpoints:
+        cmd.append(f"--restore_checkpoint={job.checkpoints[algo_type]}")
+    if job.max_insts:
+        cmd.append(f"--max_insts={job.max_insts}")
+    if job.latency:
+        cmd += [f"--cacti_latency_table={job.latency[0]}", f"--tech_node={job.latency[1]}"]
+    if job.roi:
+        cmd.append("--roi")
+    if job.simpoints:
+        cmd.append(f"--simpoints={job.simpoints[algo_type]}")
+    if job.traces:
+        cmd.append(f"--replay_trace={job.traces[algo_type][0]}")
+    if job.dump_period:
+        cmd.append(f"--dump_period_insts={job.dump_period}")
+    if job.stats_profile != "full":
+        cmd.append(f"--stats_profile={job.stats_profile}")
     
     try:
-        # Set working directory to mergesort for relative path consistency if needed
-        work_dir = os.path.join(project_root, "mergesort")
-        with open(os.path.join(sim_dir, "sim_out.txt"), "w") as out, \
-             open(os.path.join(sim_dir, "sim_err.txt"), "w") as err:
-            subprocess.run(cmd, stdout=out, stderr=err, cwd=work_dir)
+        # Run from mergesort/ so random_numbers.bin resolves (and matches the checkpoint)
+        failure = run_with_retries(cmd, run_dir, cwd=work_dir, limits=job.limits, retries=job.retry[0],
+                                   backoff=job.retry[1])
+        if failure:
+            # failure.json stays in sim_dir and the partial stats.txt is gone; nothing reaches the store
+            print(f"Failed {config_name}: {failure['category']} ({failure['detail']})")
+            return
+        if job.simpoints:
+            # Interval dumps -> whole-program estimate (raw dumps kept in stats_intervals.txt)
+            try:
+                write_estimate(os.path.join(run_dir, "stats.txt"), job.simpoints[algo_type])
+            except (OSError, ValueError) as e:
+                print(f"Sampled run {config_name} unusable: {e}")
+                clear_outputs(run_dir)
+                return
+        store.put(key, run_dir, meta={"config": config_name, "binary": binary, "checkpoint": bool(job.checkpoints),
+                                      "max_insts": job.max_insts, "tech_node": job.latency[1] if job.latency else None,
+                                      "roi": job.roi, "sampled": bool(job.simpoints),
+                                      "replay": job.traces[algo_type][1] if job.traces else None,
+                                      "dump_period": job.dump_period, "stats_profile": job.stats_profile})
     except Exception as e:
         print(f"Error running {config_name}: {e}")
+    finally:
+        if job.scratch and os.path.isdir(run_dir):
+            settle_scratch(run_dir, sim_dir, key)
+
+def write_explore_results(final, output_csv):
+    # Same layout as results.csv, so the plotting/Pareto scripts read it unchanged
+    with open(output_csv, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for params, stats in sorted(final.items()):
+            if stats:
+                l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type = params
+                writer.writerow([l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type] + result_row(stats))
 
-def wrapper(args):
-    return run_simulation(*args)
+def take_checkpoint(algo_type):
+    return algo_type, ensure_checkpoint(gem5_bin, cache_conf, binary_for(algo_type, m5ops=True), checkpoint_root,
+                                        cwd=work_dir)
+
+def profile_simpoints(job):
+    algo_type, interval, warmup, max_k, per_cluster = job
+    return algo_type, ensure_simpoints(gem5_bin, cache_conf, binary_for(algo_type), simpoint_root, interval, warmup,
+                                       max_k, per_cluster, cwd=work_dir)
+
+def record_trace(job):
+    algo_type, reference, latency, force = job
+    latency_args = [f"--cacti_latency_table={latency[0]}", f"--tech_node={latency[1]}"] if latency else []
+    trace_dir = ensure_trace(gem5_bin, cache_conf, binary_for(algo_type), os.path.join(results_dir_for(latency), "traces"),
+                             reference, extra_args=latency_args, cwd=work_dir, force=force)
+    return algo_type, trace_dir
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run full cache sweep for MergeSort")
-    parser.add_argument("--force", action="store_true", help="Force re-running simulations")
+    parser.add_argument("--force", action="store_true", help="Force re-running simulations even if the result store has them")
     parser.add_argument("--threads", type=int, default=48, help="Number of parallel threads")
+    parser.add_argument("--adopt", action="store_true",
+                        help="Add completed runs already in results/stats to the result store instead of re-running them "
+                             "(ignored with --checkpoint)")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Checkpoint each binary after loading random_numbers.bin and restore it for every configuration "
+                             "(binaries must be built with -DGEM5_M5OPS); results go to a checkpointed/ subtree")
+    parser.add_argument("--explore", type=str, default=None, metavar="BUDGETS",
+                        help="Successive halving instead of the full product: comma-separated instruction budgets, "
+                             "e.g. 2000000,20000000; survivors of the last budget run to completion")
+    parser.add_argument("--explore_keep", type=float, default=0.25,
+                        help="Fraction of each algorithm's candidates promoted per round. Default: 0.25")
+    parser.add_argument("--explore_score", choices=sorted(SCORES), default="cpi",
+                        help="Ranking metric for promotion. Default: cpi (simTicks per instruction)")
+    parser.add_argument("--config_list", type=str, default=None,
+                        help="Run only the Simple/Chunked rows of this CSV (e.g. suggestions from sweeplib.surrogate) "
+                             "instead of the full product")
+    parser.add_argument("--cacti_latency_table", type=str, default=None,
+                        help="CACTI table from assignment 2 (cacti_sweep.py --latency_table): cache latencies follow "
+                             "size/assoc; results go to results/cacti_<tech>nm/")
+    parser.add_argument("--tech_node", type=int, default=None, help="Technology node (nm) to use from the latency table")
+    parser.add_argument("--roi", action="store_true",
+                        help="Measure only the sort kernel (binaries must be built with -DGEM5_M5OPS); "
+                             "results go to a roi/ subtree")
+    parser.add_argument("--sampled", action="store_true",
+                        help="SimPoint sampling: profile each binary once, simulate only representative intervals "
+                             "and write whole-program estimates with 95%% bounds to a sampled/ subtree")
+    parser.add_argument("--sample_interval", type=int, default=10_000_000, help="Instructions per interval. Default: 10M")
+    parser.add_argument("--sample_warmup", type=int, default=1_000_000,
+                        help="Detailed warm-up instructions before each interval (caches are also warmed "
+                             "functionally in between). Default: 1M")
+    parser.add_argument("--sample_clusters", type=int, default=30, help="Most clusters (phases) to consider. Default: 30")
+    parser.add_argument("--per_cluster", type=int, default=2,
+                        help="Intervals simulated per cluster; 2 or more are needed for error bounds. Default: 2")
+    parser.add_argument("--validate", type=int, default=None, metavar="N",
+                        help="Run N random configurations both in full and sampled and compare them")
+    parser.add_argument("--replay", action="store_true",
+                        help="Record each binary's cache requests once on --replay_reference and replay them into every "
+                             "configuration instead of simulating the CPU; miss rates only, results go to a replay/ subtree")
+    parser.add_argument("--replay_reference", type=str, default="64kB,512kB,8,8", metavar="L1,L2,A1,A2",
+                        help="Configuration the request traces are recorded on. Default: 64kB,512kB,8,8, the centre "
+                             "of this sweep's grid (full_sweep.py uses the centre of its own, 32kB,256kB,4,8)")
+    parser.add_argument("--replay_check", type=int, default=None, metavar="N",
+                        help="Run N random configurations both in full and replayed and report how far replay diverges")
+    parser.add_argument("--max_wall", type=float, default=None, metavar="MINUTES",
+                        help="Kill (and report) any gem5 job running longer than this")
+    parser.add_argument("--max_rss", type=int, default=None, metavar="MB",
+                        help="Kill (and report) any gem5 job whose resident memory exceeds this")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Re-runs of a job that failed for a transient reason (OOM kill, signal, full disk). Default: 2")
+    parser.add_argument("--retry_backoff", type=float, default=60, metavar="SECONDS",
+                        help="Wait before the first retry, doubled for each further one. Default: 60")
+    parser.add_argument("--dashboard", type=float, default=60, metavar="SECONDS",
+                        help="Print the progress/ETA dashboard this often; 0 turns it off. Default: 60")
+    parser.add_argument("--dump_period", type=int, default=None, metavar="INSTS",
+                        help="Also dump stats every INSTS instructions for phase analysis (extract_results.py --timeseries)")
+    parser.add_argument("--stats_profile", choices=["full", "compact", "whitelist", "hdf5"], default="full",
+                        help="What gem5 writes per run (cache_config.py --stats_profile): whitelist keeps only the "
+                             "stats the sweep reads, for a fraction of the size and parse time. Default: full")
+    parser.add_argument("--scratch", type=str, default=None, metavar="DIR",
+                        help="Run gem5 in DIR (e.g. a tmpfs such as /dev/shm/sweep) and add each finished run to "
+                             "results/stats.runs.zip instead of leaving a directory in results/stats")
+    parser.add_argument("--enqueue", type=str, default=None, metavar="QUEUE",
+                        help="Put the jobs in this queue file and wait for 'python3 -m sweeplib.workqueue worker QUEUE' "
+                             "processes (on any host sharing the tree) to run them, instead of --threads local workers")
     args = parser.parse_args()
+    if args.cacti_latency_table and args.tech_node is None:
+        parser.error("--cacti_latency_table needs --tech_node")
+    latency = (os.path.abspath(args.cacti_latency_table), args.tech_node) if args.cacti_latency_table else None
+    if (args.sampled or args.validate) and (args.explore or args.roi or args.checkpoint):
+        parser.error("--sampled/--validate cannot be combined with --explore, --roi or --checkpoint")
+    if (args.replay or args.replay_check) and (args.explore or args.roi or args.checkpoint or args.sampled or args.validate):
+        parser.error("--replay/--replay_check cannot be combined with --explore, --roi, --checkpoint or sampling")
+    if args.scratch and (args.explore or args.validate or args.replay_check):
+        parser.error("--scratch archives runs as they finish; --explore, --validate and --replay_check read them back")
+    if args.dump_period and (args.sampled or args.validate or args.replay or args.replay_check):
+        parser.error("--dump_period needs full CPU runs; it cannot be combined with sampling or replay")
     
     os.makedirs(output_base_dir, exist_ok=True)
+
+    if args.config_list:
+        all_configs = load_config_list(args.config_list, types=algorithm_types)
     
     print(f"Starting sweep of {len(all_configs)} configurations using {args.threads} threads...")
     
-    pool_args = [(config, args.force) for config in all_configs]
-    with multiprocessing.Pool(args.threads) as pool:
-        pool.map(wrapper, pool_args)
-        
-    print("Sweep complete. Results stored in results/stats/")
+    checkpoints = None
+    if args.checkpoint:
+        with multiprocessing.Pool(len(algorithm_types)) as pool:
+            checkpoints = dict(pool.map(take_checkpoint, algorithm_types))
+        print(f"Checkpoints ready: {', '.join(sorted(checkpoints))}")
+
+    simpoints = None
+    if args.sampled or args.validate:
+        jobs = [(algo, args.sample_interval, args.sample_warmup, args.sample_clusters, args.per_cluster)
+                for algo in algorithm_types]
+        with multiprocessing.Pool(len(algorithm_types)) as pool:
+            simpoints = dict(pool.map(profile_simpoints, jobs))
+
+    traces = None
+    if args.replay or args.replay_check:
+        reference_config = args.replay_reference.split(",")
+        if len(reference_config) != 4:
+            parser.error("--replay_reference takes L1,L2,A1,A2, e.g. 64kB,512kB,8,8")
+        reference = dict(zip(("l1d_size", "l2_size", "l1_assoc", "l2_assoc"), reference_config))
+        with multiprocessing.Pool(len(algorithm_types)) as pool:
+            recorded = dict(pool.map(record_trace, [(algo, reference, latency, args.force)
+                                                     for algo in algorithm_types]))
+        traces = {algo: (trace_dir, config_name_of((*reference_config, algo))) for algo, trace_dir in recorded.items()}
+        print(f"Request traces ready: {', '.join(sorted(traces))}")
+
+    digests = {algo: inputs_digest(gem5_bin, cache_conf, binary_for(algo, m5ops=args.checkpoint or args.roi), input_file,
+                                   args.cacti_latency_table)
+               for algo in algorithm_types}
+    store = ResultStore()
+
+    limits = (args.max_wall * 60 if args.max_wall else None, args.max_rss) if args.max_wall or args.max_rss else None
+    retry = (args.retries, args.retry_backoff)
+    scratch = os.path.abspath(args.scratch) if args.scratch else None
+    sweep_start = time.time()
+    failures = {}
+
+    def already_stored(features, job):
+        return not args.force and store.has(job_key(job))
+
+    def run_configs(configs, max_insts=None, sampling=None, replay=None):
+        # Longest predicted jobs first, one at a time, so no worker idles behind a slow chunk
+        jobs = [(job_features(config), SweepJob(config, args.force, checkpoints, digests, args.adopt, max_insts, latency,
+                                                args.roi, sampling, replay, args.dump_period, args.stats_profile, limits,
+                                                retry, scratch))
+                for config in configs]
+        model = CostModel(sweep_history())
+        dashboard = None
+        if args.dashboard:
+            dashboard = Dashboard(lambda job: run_dir_for(sim_dir_of(job), job.scratch),
+                                  model.expected_insts if not max_insts else (lambda features: max_insts),
+                                  period=args.dashboard)
+        if args.enqueue:
+            run_queued(args.enqueue, run_simulation, jobs, model, skip=already_stored, dashboard=dashboard)
+        else:
+            run_longest_first(run_simulation, jobs, args.threads, model, skip=already_stored, dashboard=dashboard)
+        sim_dirs = {job.config: sim_dir_of(job) for _, job in jobs}
+        failures.update(collect_failures({os.path.relpath(d, project_root): d for d in sim_dirs.values()}, sweep_start))
+        return {config: parse_final(os.path.join(sim_dirs[config], "stats.txt")) for config in configs}
+
+    if args.validate:
+        configs = random.Random(0).sample(all_configs, min(args.validate, len(all_configs)))
+        print(f"Validating sampling on {len(configs)} configurations (full runs first)...")
+        run_configs(configs)
+        run_configs(configs, sampling=simpoints)
+        validation = compare(os.path.join(results_dir_for(latency), "stats"),
+                             os.path.join(results_dir_for(latency, sampled=True), "stats"),
+                             [config_name_of(config) for config in configs])
+        print_comparison(validation)
+        validation_csv = os.path.join(results_dir_for(latency, sampled=True), "validation.csv")
+        validation.to_csv(validation_csv, index=False)
+        print(f"Comparison saved to {validation_csv}")
+    elif args.replay_check:
+        configs = random.Random(0).sample(all_configs, min(args.replay_check, len(all_configs)))
+        print(f"Checking replay on {len(configs)} configurations (full runs first)...")
+        run_configs(configs)
+        run_configs(configs, replay=traces)
+        divergence = compare(os.path.join(results_dir_for(latency), "stats"),
+                             os.path.join(results_dir_for(latency, replay=True), "stats"),
+                             [config_name_of(config) for config in configs])
+        # Each trace replayed into the configuration it was recorded on
+        references = [(*reference_config, algo) for algo in algorithm_types]
+        replayed = run_configs(references, replay=traces)
+        rows = []
+        for config in references:
+            recorded_stats = parse_final(reference_stats(traces[config[4]][0]))
+            if recorded_stats and replayed[config]:
+                rows += compare_stats(recorded_stats, replayed[config], f"{config_name_of(config)} (recorded)")
+        divergence = pd.concat([pd.DataFrame(rows), divergence], ignore_index=True)
+        print_comparison(divergence)
+        divergence_csv = os.path.join(results_dir_for(latency, replay=True), "replay_divergence.csv")
+        divergence.to_csv(divergence_csv, index=False)
+        print(f"Divergence report saved to {divergence_csv}")
+    elif args.explore:
+        final = successive_halving(all_configs, run_configs, parse_budgets(args.explore), keep=args.explore_keep,
+                                   score=SCORES[args.explore_score], group=lambda config: config[4])
+        explore_csv = os.path.join(results_dir_for(latency, args.roi, checkpointed=args.checkpoint), "explore_results.csv")
+        write_explore_results(final, explore_csv)
+        print(f"Exploration complete. {len(final)} configurations ran to completion; see {explore_csv}")
+    else:
+        run_configs(all_configs, sampling=simpoints, replay=traces)
+        print(f"Sweep complete. Results stored in "
+              f"{os.path.relpath(os.path.join(results_dir_for(latency, args.roi, args.sampled, args.replay, args.checkpoint), 'stats'), project_root)}/")
+
+    # Which points are missing after this sweep, and why
+    print_failure_summary(failures)
+    if failures:
+        failures_csv = os.path.join(results_dir_for(latency, args.roi, checkpointed=args.checkpoint), "failures.csv")
+        write_failures(failures, failures_csv)
+        print(f"Failed runs listed in {failures_csv}")
@@ -0,0 +1,237 @@
+import os
+import multiprocessing
+import argparse
+import csv
+import sys
+import time
+
+# --- Configuration ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+base_dir = os.path.abspath(os.path.join(script_dir, ".."))
+
+sys.path.insert(0, base_dir)
+from sweeplib.build import build_all, cross_compiler, gem5_home, variant
+from sweeplib.checkpoint import ensure_checkpoint
+from sweeplib.failures import collect_failures, print_failure_summary, run_with_retries, write_failures
+from sweeplib.monitor import PROGRESS_TICKS, Dashboard
+from sweeplib.result_store import ResultStore, inputs_digest, result_key
+from sweeplib.scheduler import CostModel, load_history, run_longest_first
+from sweeplib.stats_parser import build_table, format_stat, lookup, parse_final, save_table
+from sweeplib.stats_reader import gem5_stats_options
+from sweeplib.study import binary_name, config_id, expand, features, key_params, load_spec, workload
+from sweeplib.workqueue import run_queued
+
+# GEM5_HOME overrides the cluster path, e.g. on queue workers of other hosts
+gem5_bin = os.path.join(gem5_home(), "build/RISCV/gem5.opt")
+# Identical in both parts; keys match the per-part drivers' either way
+cache_conf = os.path.join(base_dir, "part 1/configs/cache_config.py")
+mergesort_dir = os.path.join(base_dir, "part 2/mergesort")
+input_file = os.path.join(mergesort_dir, "random_numbers.bin")
+studies_dir = os.path.join(base_dir, "results")
+
+headers = ["Type", "MatrixSize", "L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc", "Time", "Cycles",
+           "L1_MissRate", "L2_MissRate", "IPC"]
+
+
+def run_dir_of(study_dir, point):
+    return os.path.join(study_dir, "runs", workload(point), config_id(point))
+
+
+def study_history(study_dir):
+    # hostSeconds/simInsts of this study's earlier runs plus the per-part sweep trees, keyed like study jobs
+    runs = []
+    def add(workload_name, config_dir, stats_file):
+        parts = config_dir.split("_")[-8:]
+        if len(parts) == 8 and parts[0] == "L1":
+            runs.append(({"workload": workload_name, "l1_size": parts[1], "l2_size": parts[3],
+                          "l1_assoc": parts[5], "l2_assoc": parts[7]}, stats_file))
+
+    runs_root = os.path.join(study_dir, "runs")
+    for workload_name in os.listdir(runs_root) if os.path.isdir(runs_root) else []:
+        for config_dir in os.listdir(os.path.join(runs_root, workload_name)):
+            add(workload_name, config_dir, os.path.join(runs_root, workload_name, config_dir, "stats.txt"))
+    part1_results = os.path.join(base_dir, "part 1/results")
+    for sweep_dir in os.listdir(part1_results) if os.path.isdir(part1_results) else []:
+        suffix = sweep_dir[len("full_sweep"):].lstrip("_")
+        if sweep_dir.startswith("full_sweep") and (suffix == "" or suffix.isdigit()):
+            for config_dir in os.listdir(os.path.join(part1_results, sweep_dir)):
+                add(f"MatMul_{suffix or 128}", config_dir, os.path.join(part1_results, sweep_dir, config_dir, "stats.txt"))
+    part2_stats = os.path.join(base_dir, "part 2/results/stats")
+    for config_dir in os.listdir(part2_stats) if os.path.isdir(part2_stats) else []:
+        add(config_dir.split("_")[0], config_dir, os.path.join(part2_stats, config_dir, "stats.txt"))
+    return load_history(runs)
+
+
+def take_checkpoint(job):
+    binary, ckpt_root, cwd = job
+    return binary, ensure_checkpoint(gem5_bin, cache_conf, binary, ckpt_root, cwd=cwd)
+
+
+def run_job(job):
+    """Simulate one study point, unless the result store already has it."""
+    run_dir = job["run_dir"]
+    os.makedirs(run_dir, exist_ok=True)
+    store = ResultStore()
+    if not job["force"] and store.fetch(job["key"], run_dir):
+        return
+    options = job["options"]
+    cmd = [
+        gem5_bin,
+        "-d", run_dir,
+        *gem5_stats_options(options["stats_profile"]),
+        cache_conf,
+        f"--l1d_size={job['l1_size']}",
+        f"--l2_size={job['l2_size']}",
+        f"--l1_assoc={job['l1_assoc']}",
+        f"--l2_assoc={job['l2_assoc']}",
+        f"--binary={job['binary']}",
+        f"--progress_interval={PROGRESS_TICKS}"
+    ]
+    if job["checkpoint"]:
+        cmd.append(f"--restore_checkpoint={job['checkpoint']}")
+    if options["max_insts"]:
+        cmd.append(f"--max_insts={options['max_insts']}")
+    if options["cacti_latency_table"]:
+        cmd += [f"--cacti_latency_table={options['cacti_latency_table']}", f"--tech_node={options['tech_node']}"]
+    if options["roi"]:
+        cmd.append("--roi")
+    if options["dump_period"]:
+        cmd.append(f"--dump_period_insts={options['dump_period']}")
+    if options["stats_profile"] != "full":
+        cmd.append(f"--stats_profile={options['stats_profile']}")
+
+    # mergesort reads random_numbers.bin from its working directory
+    failure = run_with_retries(cmd, run_dir, cwd=job["cwd"], limits=job["limits"], retries=job["retry"][0],
+                               backoff=job["retry"][1])
+    if failure:
+        print(f"Failed {job['label']}: {failure['category']} ({failure['detail']})")
+        return
+    store.put(job["key"], run_dir, meta={"config": job["label"], "binary": job["binary"], **options})
+
+
+def result_row(point, stats):
+    values = (lookup(stats, "simSeconds", "N/A"), lookup(stats, "simTicks", 0), lookup(stats, "L1_MissRate", 0),
+              lookup(stats, "L2_MissRate", 0), lookup(stats, "IPC", 0))
+    return [point["type"], point["size"] or "", point["l1_size"], point["l2_size"], point["l1_assoc"],
+            point["l2_assoc"], *(format_stat(v) for v in values)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every benchmark, size and cache configuration of a study spec "
+                                                 "in one pool (see sweeplib/study.py for the format)")
+    parser.add_argument("spec", help="Study spec (JSON)")
+    parser.add_argument("--threads", type=int, default=multiprocessing.cpu_count(),
+                        help="Number of parallel gem5 jobs. Default: all cores.")
+    parser.add_argument("--force", action="store_true", help="Re-run points even if the result store has them")
+    parser.add_argument("--dry_run", action="store_true", help="Print the expanded job set and exit")
+    parser.add_argument("--max_wall", type=float, default=None, metavar="MINUTES",
+                        help="Kill any gem5 job running longer than this")
+    parser.add_argument("--max_rss", type=int, default=None, metavar="MB",
+                        help="Kill any gem5 job whose resident memory exceeds this")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Re-runs of a job that failed for a transient reason (OOM kill, signal, full disk). Default: 2")
+    parser.add_argument("--retry_backoff", type=float, default=60, metavar="SECONDS",
+                        help="Wait before the first retry, doubled for each further one. Default: 60")
+    parser.add_argument("--dashboard", type=float, default=60, metavar="SECONDS",
+                        help="Print the progress/ETA dashboard this often; 0 turns it off. Default: 60")
+    parser.add_argument("--enqueue", type=str, default=None, metavar="QUEUE",
+                        help="Put the jobs in this queue file and wait for 'python3 -m sweeplib.workqueue worker QUEUE' "
+                             "processes to run them, instead of --threads local workers")
+    args = parser.parse_args()
+
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        parser.error(f"{args.spec}: {e}")
+    options = spec["options"]
+    if options["cacti_latency_table"]:
+        options["cacti_latency_table"] = os.path.abspath(options["cacti_latency_table"])
+    points = expand(spec)
+    study_dir = os.path.join(studies_dir, spec["name"])
+
+    counts = {}
+    for point in points:
+        counts[workload(point)] = counts.get(workload(point), 0) + 1
+    print(f"Study {spec['name']}: {len(points)} jobs ({', '.join(f'{w}: {n}' for w, n in counts.items())}) "
+          f"on {args.threads} threads")
+    if args.dry_run:
+        sys.exit(0)
+    os.makedirs(study_dir, exist_ok=True)
+
+    # Every binary the study needs, compiled concurrently (or reused from the build cache)
+    m5ops = bool(options["checkpoint"] or options["roi"])
+    specs = {name: variant(name, m5ops=m5ops) for name in sorted({binary_name(point) for point in points})}
+    try:
+        binaries = build_all(specs, cc=cross_compiler())
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+
+    def cwd_of(name):
+        return mergesort_dir if name.startswith("mergesort") else None
+
+    digests = {name: inputs_digest(gem5_bin, cache_conf, path, input_file if cwd_of(name) else None,
+                                   options["cacti_latency_table"])
+               for name, path in binaries.items()}
+
+    checkpoints = {}
+    if options["checkpoint"]:
+        ckpt_root = os.path.join(study_dir, "checkpoints")
+        with multiprocessing.Pool(len(binaries)) as pool:
+            taken = dict(pool.map(take_checkpoint, [(path, ckpt_root, cwd_of(name)) for name, path in binaries.items()]))
+        checkpoints = {name: taken[path] for name, path in binaries.items()}
+        print(f"Checkpoints ready: {', '.join(sorted(checkpoints))}")
+
+    limits = (args.max_wall * 60 if args.max_wall else None, args.max_rss) if args.max_wall or args.max_rss else None
+    retry = (args.retries, args.retry_backoff)
+    jobs = []
+    for point in points:
+        name = binary_name(point)
+        job = {**point, "label": f"{workload(point)}/{config_id(point)}", "binary": binaries[name],
+               "cwd": cwd_of(name), "run_dir": run_dir_of(study_dir, point), "checkpoint": checkpoints.get(name),
+               "key": result_key(digests[name], key_params(point, options)), "options": options,
+               "force": args.force, "limits": limits, "retry": retry}
+        jobs.append((features(point), job))
+
+    store = ResultStore()
+    model = CostModel(study_history(study_dir))
+    dashboard = None
+    if args.dashboard:
+        expected = (lambda f: options["max_insts"]) if options["max_insts"] else model.expected_insts
+        dashboard = Dashboard(lambda job: job["run_dir"], expected, period=args.dashboard)
+
+    def already_stored(features, job):
+        return not args.force and store.has(job["key"])
+
+    sweep_start = time.time()
+    # One job set for every workload: cores stay busy until the last job of the whole study
+    if args.enqueue:
+        run_queued(args.enqueue, run_job, jobs, model, skip=already_stored, dashboard=dashboard)
+    else:
+        run_longest_first(run_job, jobs, max(1, min(args.threads, len(jobs))), model, skip=already_stored,
+                          dashboard=dashboard)
+
+    # One table for the whole study, benchmark and size as ordinary columns
+    rows, runs = [], []
+    for point in points:
+        stats = parse_final(os.path.join(run_dir_of(study_dir, point), "stats.txt"))
+        if stats:
+            rows.append(result_row(point, stats))
+            runs.append(({"Type": point["type"], "MatrixSize": point["size"], "L1_Size": point["l1_size"],
+                          "L2_Size": point["l2_size"], "L1_Assoc": point["l1_assoc"], "L2_Assoc": point["l2_assoc"]},
+                         stats))
+    results_csv = os.path.join(study_dir, "results.csv")
+    with open(results_csv, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    print(f"Study complete: {len(rows)} of {len(points)} points in {results_csv}")
+    if runs:
+        print(f"Full stats saved to {save_table(build_table(runs), os.path.join(study_dir, 'stats_store.parquet'))}")
+
+    failures = collect_failures({job["label"]: job["run_dir"] for _, job in jobs}, sweep_start)
+    print_failure_summary(failures, len(jobs))
+    if failures:
+        failures_csv = os.path.join(study_dir, "failures.csv")
+        write_failures(failures, failures_csv)
+        print(f"Failed runs listed in {failures_csv}")
@@ -0,0 +1,5 @@
+"""Shared helpers for the part 1 / part 2 gem5 cache sweeps.
+
+The sweep scripts live in directories with spaces in their names, so they
+add ``assignment 1/`` to ``sys.path`` and import this package directly.
+"""
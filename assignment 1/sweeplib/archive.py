@@ -0,0 +1,408 @@
+"""Compact archive of a sweep's gem5 output directories.
+
+Each sweep point leaves a directory with a ~1,050-line ``stats.txt``,
+``config.ini``, ``config.json`` and the stdout/stderr logs: hundreds of
+near-identical directories that are slow to scan on a networked file
+system. ``pack`` turns a sweep directory into one zip file next to it
+(``<sweep dir>.runs.zip``) holding
+
+* ``names.json``: the dictionary of stat names shared by every run (and
+  which of them are integers);
+* ``runs/<key>.npz``: per run, a float64 ``values`` matrix with one row per
+  dump block and one column per name, and a boolean ``present`` matrix of
+  the same shape marking which stats the block has (so a stat gem5 itself
+  reported as ``nan`` survives);
+* ``files/<key>/<name>``: the run's other output files, deflated.
+
+``<key>`` is the run directory's path relative to the sweep directory
+(``Chunked_L1_64kB_L2_512kB_A1_8_A2_16``, ``L1_32kB_L2_256kB_A1_4_A2_8``).
+``Archive`` reads it back: ``final``/``blocks`` give the same dicts as
+``stats_parser.parse_final``/``parse_stats`` by key (random access through
+the zip directory), ``table`` loads every run's final block in one
+sequential pass, and ``extract`` rebuilds a run directory with an equivalent
+``stats.txt``. Stat descriptions and comments are not kept.
+
+``append_run`` adds a single finished run under a file lock, so sweep
+workers can write into a scratch directory (e.g. tmpfs) and archive each
+run on completion instead of leaving a directory behind
+(``run_sweep.py --scratch``). It appends the run's members to the zip in
+place, with a new ``names.json`` only when the run brings stats not seen
+before, so its cost does not grow with the archive. A key archived again
+replaces its earlier copy: the latest member of a name wins, and ``pack``
+drops the superseded ones. Before appending, the zip's central directory is
+saved to ``<archive>.tail``; a writer killed half-way leaves it behind and
+the next writer or reader puts it back, so the archive reads as before the
+append. ``pack`` writes a new archive next to the old one and swaps it in.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.archive pack "part 2/results/stats" --remove
+    python3 -m sweeplib.archive list "part 2/results/stats.runs.zip"
+    python3 -m sweeplib.archive extract "part 2/results/stats.runs.zip" Simple_L1_32kB_L2_256kB_A1_4_A2_4 /tmp/run
+"""
+import argparse
+import fcntl
+import io
+import json
+import os
+import shutil
+import warnings
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .result_store import RESULT_FILES, is_complete
+from .stats_parser import BEGIN_MARK, END_MARK, parse_stats
+
+ARCHIVE_SUFFIX = ".runs.zip"
+NAMES_MEMBER = "names.json"
+TAIL_SUFFIX = ".tail"
+
+
+def archive_path_for(sweep_dir):
+    return os.path.normpath(sweep_dir) + ARCHIVE_SUFFIX
+
+
+def open_archive(sweep_dir):
+    """The archive next to ``sweep_dir``, or None if it has not been packed."""
+    path = archive_path_for(sweep_dir)
+    return Archive(path) if os.path.exists(path) else None
+
+
+def _run_dirs(sweep_dir):
+    """``{key: run dir}`` of the finished runs directly under ``sweep_dir``."""
+    if not os.path.isdir(sweep_dir):
+        return {}
+    return {name: os.path.join(sweep_dir, name) for name in sorted(os.listdir(sweep_dir))
+            if is_complete(os.path.join(sweep_dir, name))}
+
+
+def _matrix(blocks, names, index):
+    """Dump blocks as (values, present) matrices (blocks x names); ``names``/``index`` grow with unseen stats."""
+    for block in blocks:
+        for name in block:
+            if name not in index:
+                index[name] = len(names)
+                names.append(name)
+    values = np.full((len(blocks), len(names)), np.nan)
+    present = np.zeros((len(blocks), len(names)), dtype=bool)
+    for row, block in enumerate(blocks):
+        for name, value in block.items():
+            values[row, index[name]] = value
+            present[row, index[name]] = True
+    return values, present
+
+
+def _npz(values, present):
+    buf = io.BytesIO()
+    np.savez(buf, values=values, present=present)
+    return buf.getvalue()
+
+
+class _Writer:
+    """Adds runs to an open zip, keeping the name dictionary prefix-stable."""
+
+    def __init__(self, zf, names=(), int_names=(), appending=False):
+        self.zf = zf
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.int_names = set(int_names)
+        self.seen = set(self.names)
+        # The names.json already in the zip, if any; close() only writes a new one on a change
+        self.written = (len(self.names), set(self.int_names)) if appending else None
+
+    def add(self, key, run_dir):
+        blocks = parse_stats(os.path.join(run_dir, "stats.txt"))
+        for block in blocks:
+            for name, value in block.items():
+                if name not in self.seen:
+                    self.seen.add(name)
+                    if isinstance(value, int):
+                        self.int_names.add(name)
+                elif not isinstance(value, int):
+                    self.int_names.discard(name)
+        self.zf.writestr(f"runs/{key}.npz", _npz(*_matrix(blocks, self.names, self.index)))
+        for name in RESULT_FILES:
+            path = os.path.join(run_dir, name)
+            if name != "stats.txt" and os.path.exists(path):
+                self.zf.write(path, f"files/{key}/{name}")
+
+    def close(self):
+        if self.written != (len(self.names), self.int_names):
+            self.zf.writestr(NAMES_MEMBER, json.dumps({"names": self.names, "int_names": sorted(self.int_names)}))
+
+
+def _copy_members(source, zf, keys):
+    for info in source.zf.infolist():
+        key = source._key_of(info.filename)
+        if key in keys and source.zf.getinfo(info.filename) is info:
+            zf.writestr(info, source.zf.read(info))
+
+
+def _rewrite(archive_path, run_dirs, extra=None):
+    """Write the archive anew with ``{key: run dir}`` replacing or joining its runs, then swap it in.
+
+    Call with the lock held. The new archive is built in ``<archive>.tmp``
+    and only replaces the old one once every added run reads back from it.
+    """
+    tmp_path = archive_path + ".tmp"
+    previous = Archive(archive_path, lock=False) if os.path.exists(archive_path) else None
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        writer = _Writer(zf, *(previous.names_and_ints() if previous else ((), ())))
+        if previous:
+            _copy_members(previous, zf, set(previous.keys()) - set(run_dirs))
+            previous.close()
+        for key, run_dir in run_dirs.items():
+            writer.add(key, run_dir)
+            for name, text in (extra or {}).items():
+                zf.writestr(f"files/{key}/{name}", text)
+        writer.close()
+    with Archive(tmp_path, lock=False) as check:
+        missing = [key for key in run_dirs if not check.blocks(key)]
+    if missing:
+        os.remove(tmp_path)
+        raise RuntimeError(f"{len(missing)} runs did not read back from {tmp_path}, e.g. {missing[0]}")
+    os.replace(tmp_path, archive_path)
+
+
+def _save_tail(archive_path):
+    """Keep a copy of the zip's central directory (and where it starts) in ``<archive>.tail``."""
+    with zipfile.ZipFile(archive_path) as zf:
+        start = zf.start_dir
+    with open(archive_path, "rb") as f:
+        f.seek(start)
+        tail = f.read()
+    tmp_path = archive_path + TAIL_SUFFIX + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"%d\n" % start + tail)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, archive_path + TAIL_SUFFIX)
+
+
+def _recover(archive_path):
+    """Undo an append that did not finish: put back the central directory ``_save_tail`` kept.
+
+    Call with the lock held.
+    """
+    tail_path = archive_path + TAIL_SUFFIX
+    if not os.path.exists(tail_path):
+        return
+    with open(tail_path, "rb") as f:
+        start = int(f.readline())
+        tail = f.read()
+    with open(archive_path, "r+b") as f:
+        f.seek(start)
+        f.write(tail)
+        f.truncate()
+    os.remove(tail_path)
+
+
+def pack(sweep_dir, archive_path=None, remove=False):
+    """Archive every finished run directory under ``sweep_dir``; returns the keys packed.
+
+    Runs already in the archive whose directories are gone are kept. With
+    ``remove``, packed directories are deleted once the archive is written
+    and every run in it reads back.
+    """
+    archive_path = archive_path or archive_path_for(sweep_dir)
+    run_dirs = _run_dirs(sweep_dir)
+    with _locked(archive_path):
+        _recover(archive_path)
+        _rewrite(archive_path, run_dirs)
+    if remove:
+        for run_dir in run_dirs.values():
+            shutil.rmtree(run_dir)
+    return list(run_dirs)
+
+
+def append_run(archive_path, key, run_dir, extra=None):
+    """Add one finished run to an archive (created if needed); safe across processes.
+
+    ``extra`` maps file names to text archived with the run's files (e.g. its
+    result store key, to recognise the same result later). The run is
+    appended in place; an append that fails, or is killed, is rolled back.
+    """
+    with _locked(archive_path):
+        _recover(archive_path)
+        if not os.path.exists(archive_path):
+            _rewrite(archive_path, {key: run_dir}, extra)
+            return
+        _save_tail(archive_path)
+        with warnings.catch_warnings():
+            # A key archived again: its new members shadow the old ones
+            warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+            with zipfile.ZipFile(archive_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+                meta = json.loads(zf.read(NAMES_MEMBER))
+                writer = _Writer(zf, meta["names"], meta["int_names"], appending=True)
+                writer.add(key, run_dir)
+                for name, text in (extra or {}).items():
+                    zf.writestr(f"files/{key}/{name}", text)
+                writer.close()
+        with Archive(archive_path, lock=False) as check:
+            appended = bool(check.blocks(key))
+        if not appended:
+            _recover(archive_path)
+            raise RuntimeError(f"{key} did not read back from {archive_path}; the append was undone")
+        os.remove(archive_path + TAIL_SUFFIX)
+
+
+class _locked:
+    """``flock`` on ``<archive>.lock``: exclusive while the archive is written, shared while it is opened."""
+
+    def __init__(self, archive_path, shared=False):
+        self.path = archive_path + ".lock"
+        self.mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.f = open(self.path, "w")
+        fcntl.flock(self.f, self.mode)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.f, fcntl.LOCK_UN)
+        self.f.close()
+
+
+class Archive:
+    def __init__(self, path, lock=True):
+        self.path = path
+        if lock:
+            # Appends rewrite the central directory, so read it while no writer is active
+            with _locked(path, shared=not os.path.exists(path + TAIL_SUFFIX)) as held:
+                if held.mode == fcntl.LOCK_EX:
+                    _recover(path)
+                self.zf = zipfile.ZipFile(path)
+        else:
+            self.zf = zipfile.ZipFile(path)
+        meta = json.loads(self.zf.read(NAMES_MEMBER))
+        self.names = meta["names"]
+        self.int_names = set(meta["int_names"])
+        self._runs = {self._key_of(name): name for name in self.zf.namelist() if name.startswith("runs/")}
+
+    @staticmethod
+    def _key_of(member):
+        if member.startswith("runs/"):
+            return os.path.splitext(member[len("runs/"):])[0]
+        if member.startswith("files/"):
+            return os.path.dirname(member[len("files/"):])
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zf.close()
+
+    def names_and_ints(self):
+        return self.names, self.int_names
+
+    def keys(self):
+        return list(self._runs)
+
+    def __contains__(self, key):
+        return key in self._runs
+
+    def _matrix(self, key):
+        """(values, present) matrices of a run."""
+        data = np.load(io.BytesIO(self.zf.read(self._runs[key])))
+        if isinstance(data, np.ndarray):
+            # Archives written before the presence mask: NaN marked a missing stat
+            return data, ~np.isnan(data)
+        return data["values"], data["present"]
+
+    def _block(self, row, present):
+        return {name: (int(value) if name in self.int_names else float(value))
+                for name, value, has in zip(self.names, row, present) if has}
+
+    def blocks(self, key):
+        """Every dump block of a run, like ``parse_stats`` (empty if the key is unknown)."""
+        if key not in self._runs:
+            return []
+        values, present = self._matrix(key)
+        return [self._block(row, mask) for row, mask in zip(values, present)]
+
+    def final(self, key):
+        """Last dump block of a run, like ``parse_final``."""
+        if key not in self._runs:
+            return None
+        values, present = self._matrix(key)
+        return self._block(values[-1], present[-1]) if len(values) else None
+
+    def file(self, key, name):
+        """Text of one of the run's archived files (``config.ini``, ``sim_out.txt``, ...), or None."""
+        try:
+            return self.zf.read(f"files/{key}/{name}").decode()
+        except KeyError:
+            return None
+
+    def table(self, keys=None):
+        """Final blocks of ``keys`` (all runs by default) as a DataFrame indexed by key, in one pass."""
+        wanted = set(self._runs) if keys is None else set(keys)
+        members = sorted((info.header_offset, key) for key, name in self._runs.items()
+                         for info in [self.zf.getinfo(name)] if key in wanted)
+        rows = {}
+        for _, key in members:
+            final = self.final(key)
+            if final:
+                rows[key] = final
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    def extract(self, key, dest_dir):
+        """Rebuild a run directory: an equivalent ``stats.txt`` plus the archived files."""
+        os.makedirs(dest_dir, exist_ok=True)
+        with open(os.path.join(dest_dir, "stats.txt"), "w") as f:
+            for block in self.blocks(key):
+                f.write(f"\n{BEGIN_MARK} ----------\n")
+                for name, value in block.items():
+                    f.write(f"{name:<60} {value if isinstance(value, int) else f'{value:.6f}'}\n")
+                f.write(f"\n{END_MARK}   ----------\n")
+        for name in RESULT_FILES:
+            text = self.file(key, name)
+            if text is not None:
+                with open(os.path.join(dest_dir, name), "w") as f:
+                    f.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack sweep run directories into one archive, or read one back")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack_cmd = sub.add_parser("pack", help="Archive the finished runs of a sweep directory")
+    pack_cmd.add_argument("sweep_dir", help="e.g. 'part 2/results/stats' or 'part 1/results/full_sweep'")
+    pack_cmd.add_argument("--remove", action="store_true", help="Delete the run directories once archived")
+    list_cmd = sub.add_parser("list", help="Runs in an archive")
+    list_cmd.add_argument("archive")
+    extract_cmd = sub.add_parser("extract", help="Rebuild one run directory")
+    extract_cmd.add_argument("archive")
+    extract_cmd.add_argument("key")
+    extract_cmd.add_argument("dest_dir")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        before = sum(len(files) + len(dirs) for _, dirs, files in os.walk(args.sweep_dir))
+        keys = pack(args.sweep_dir, remove=args.remove)
+        path = archive_path_for(args.sweep_dir)
+        print(f"Packed {len(keys)} runs into {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+        if args.remove:
+            after = sum(len(files) + len(dirs) for _, dirs, files in os.walk(args.sweep_dir))
+            print(f"Removed their directories: {before - after} files and directories fewer")
+    elif args.command == "list":
+        with Archive(args.archive) as archive:
+            keys = archive.keys()
+            print(f"{len(keys)} runs, {len(archive.names)} stat names")
+            for key in sorted(keys):
+                print(f"  {key}")
+    else:
+        with Archive(args.archive) as archive:
+            if args.key not in archive:
+                parser.error(f"{args.key} is not in {args.archive}")
+            archive.extract(args.key, args.dest_dir)
+        print(f"Extracted {args.key} to {args.dest_dir}")
+
+
+if __name__ == "__main__":
+    main()
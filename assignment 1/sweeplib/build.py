@@ -0,0 +1,217 @@
+"""Content-hashed, parallel build cache for the sweep benchmarks.
+
+``full_sweep.py`` used to recompile ``matrix_multiply.c`` before every
+sweep, one ``MATRIX_SIZE`` at a time. Here a binary is keyed by a hash of
+everything that changes it: the source, the compiler (its ``--version`` and
+the executable's own digest), the flags, the defines, and any extra inputs
+such as ``libm5.a`` and ``m5ops.h`` for ``-DGEM5_M5OPS`` builds. A build that
+is already in the cache is reused. ``build_all`` compiles the missing
+variants concurrently and then installs each binary where the drivers
+expect it, copying only when the contents differ. Checkpoints, traces and
+SimPoint profiles record the digest of the binary they came from, so an
+installed build is never matched with another build's artifacts.
+
+Layout: ``<root>/<key[:2]>/<key>/`` holds the binary plus a ``build.json``
+with the command line. Headers the source includes from its own directory
+are not scanned; pass them as ``deps``.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.build                       # every known variant
+    python3 -m sweeplib.build matrix_multiply_256x256 mergesort_c --m5ops
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from multiprocessing.pool import ThreadPool
+
+from .result_store import file_digest
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_ROOT = os.path.join(BASE_DIR, "build_cache")
+DEFAULT_GEM5 = "/home/tishya/shivam/hpc/gem5"
+# CHECKPOINT_MARK()/ROI_BEGIN()/ROI_END(), included by every benchmark source
+MARKERS_HEADER = os.path.join(BASE_DIR, "include", "m5markers.h")
+MATRIX_SIZES = (64, 128, 256)
+M5OPS_SUFFIX = "_m5ops"
+
+_compiler_memo = {}
+
+
+def gem5_home():
+    """The gem5 installation (``GEM5_HOME`` overrides the cluster path)."""
+    return os.environ.get("GEM5_HOME", DEFAULT_GEM5)
+
+
+def cross_compiler(home=None):
+    return os.path.join(home or gem5_home(), "riscv-toolchain/riscv/bin/riscv64-unknown-linux-gnu-gcc")
+
+
+def matrix_multiply_name(size):
+    """Binary name ``full_sweep.py`` uses for a matrix size (128 is the unsuffixed default)."""
+    return "matrix_multiply" if size == 128 else f"matrix_multiply_{size}x{size}"
+
+
+def variant(name, m5ops=False, home=None):
+    """Build spec of a known benchmark binary: ``{source, flags, defines, libs, deps, output}``.
+
+    Known names are ``matrix_multiply*`` (see ``matrix_multiply_name``),
+    ``mergesort_s`` and ``mergesort_c``. With ``m5ops`` the binary gets
+    ``CHECKPOINT_MARK()``/``ROI_BEGIN()``/``ROI_END()`` (``-DGEM5_M5OPS``, libm5)
+    and is installed as ``<name>_m5ops``, so a marker build never replaces
+    the plain binary a concurrent sweep is running.
+    """
+    home = home or gem5_home()
+    sizes = {matrix_multiply_name(size): size for size in MATRIX_SIZES}
+    if name in sizes:
+        spec = {"source": os.path.join(BASE_DIR, "part 1/benchmarks/matrix_multiply.c"),
+                "flags": ["-O2", "-static"], "defines": {"MATRIX_SIZE": sizes[name]},
+                "output": os.path.join(BASE_DIR, "part 1/benchmarks", name)}
+    elif name in ("mergesort_s", "mergesort_c"):
+        source = "mergesort_simple.c" if name == "mergesort_s" else "mergesort_chunked.c"
+        spec = {"source": os.path.join(BASE_DIR, "part 2/mergesort", source),
+                "flags": ["-O2", "-static", "-march=rv64imafdc", "-mabi=lp64d"], "defines": {},
+                "output": os.path.join(BASE_DIR, "part 2/mergesort", name)}
+    else:
+        raise ValueError(f"Unknown benchmark variant {name!r}")
+    spec["libs"], spec["deps"] = [], [MARKERS_HEADER]
+    if m5ops:
+        spec["defines"]["GEM5_M5OPS"] = None
+        spec["flags"] = spec["flags"] + ["-I" + os.path.join(home, "include")]
+        lib_dir = os.path.join(home, "util/m5/build/riscv/out")
+        spec["libs"] = ["-L" + lib_dir, "-lm5"]
+        spec["deps"] += [os.path.join(home, "include/gem5/m5ops.h"), os.path.join(lib_dir, "libm5.a")]
+        spec["output"] += M5OPS_SUFFIX
+    return spec
+
+
+def known_variants():
+    return [matrix_multiply_name(size) for size in MATRIX_SIZES] + ["mergesort_s", "mergesort_c"]
+
+
+def compiler_id(cc):
+    """``--version`` banner plus digest of the compiler executable, memoised per process."""
+    if cc not in _compiler_memo:
+        try:
+            banner = subprocess.run([cc, "--version"], capture_output=True, text=True, check=True).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RuntimeError(f"Cannot run compiler {cc}: {e}") from e
+        _compiler_memo[cc] = f"{banner.splitlines()[0] if banner else ''} {file_digest(cc)}"
+    return _compiler_memo[cc]
+
+
+def _define_flags(defines):
+    return [f"-D{k}" if v is None else f"-D{k}={v}" for k, v in sorted(defines.items())]
+
+
+def build_key(cc, spec):
+    """Hash of everything that can change the binary of ``spec``."""
+    payload = json.dumps({
+        "source": file_digest(spec["source"]), "compiler": compiler_id(cc), "flags": spec["flags"],
+        "defines": _define_flags(spec["defines"]), "libs": spec["libs"],
+        "deps": [file_digest(path) for path in spec["deps"]],
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_path(spec, cc=None, root=DEFAULT_ROOT):
+    """Where the binary of ``spec`` is (or would be) cached."""
+    if not os.path.exists(spec["source"]):
+        raise RuntimeError(f"Source {spec['source']} not found")
+    key = build_key(cc or cross_compiler(), spec)
+    return os.path.join(root, key[:2], key, os.path.basename(spec["output"]))
+
+
+def build(spec, cc=None, root=DEFAULT_ROOT, force=False):
+    """Path of the cached binary for ``spec``, compiling it on a miss.
+
+    Raises RuntimeError with the compiler's output if the build fails.
+    """
+    cc = cc or cross_compiler()
+    binary = cache_path(spec, cc, root)
+    final = os.path.dirname(binary)
+    if os.path.exists(binary) and not force:
+        return binary
+
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(final))
+    cmd = [cc, *spec["flags"], *_define_flags(spec["defines"]), spec["source"],
+           "-o", os.path.join(staging, os.path.basename(binary)), *spec["libs"]]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise RuntimeError(f"Failed to compile {os.path.basename(binary)}:\n{result.stderr.strip()}")
+    with open(os.path.join(staging, "build.json"), "w") as f:
+        json.dump({"command": cmd, "compiler": compiler_id(cc)}, f, indent=2)
+    if force and os.path.exists(final):
+        shutil.rmtree(final)
+    try:
+        os.rename(staging, final)
+    except OSError:
+        # Another sweep built the same key first
+        shutil.rmtree(staging, ignore_errors=True)
+    return binary
+
+
+def install(binary, dest):
+    """Copy ``binary`` to ``dest`` unless it already has the same contents; True if it changed."""
+    if os.path.exists(dest) and file_digest(dest) == file_digest(binary):
+        return False
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp = f"{dest}.tmp{os.getpid()}"
+    # A fresh mtime: the cached file's own age says nothing about when it was installed
+    shutil.copyfile(binary, tmp)
+    shutil.copymode(binary, tmp)
+    os.replace(tmp, dest)
+    return True
+
+
+def build_all(specs, threads=None, cc=None, root=DEFAULT_ROOT, force=False):
+    """Build and install ``{name: spec}`` concurrently; returns ``{name: installed path}``.
+
+    Every variant is attempted. If any failed, RuntimeError lists all
+    the failures.
+    """
+    def one(item):
+        name, spec = item
+        try:
+            hit = not force and os.path.exists(cache_path(spec, cc, root))
+            changed = install(build(spec, cc, root, force), spec["output"])
+            state = ("cached" if hit else "compiled") + (", installed" if changed else "")
+            return name, spec["output"], f"{name}: {state}", None
+        except RuntimeError as e:
+            return name, None, None, str(e)
+
+    with ThreadPool(threads or max(1, min(len(specs), os.cpu_count() or 1))) as pool:
+        results = pool.map(one, list(specs.items()))
+    errors = [error for _, _, _, error in results if error]
+    for _, _, message, _ in results:
+        if message:
+            print(f"  {message}")
+    if errors:
+        raise RuntimeError("\n".join(errors))
+    return {name: path for name, path, _, _ in results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build benchmark binaries through the content-hashed build cache")
+    parser.add_argument("variants", nargs="*", help=f"Variants to build (default: all of {', '.join(known_variants())})")
+    parser.add_argument("--m5ops", action="store_true", help="Build with -DGEM5_M5OPS (checkpoint and ROI markers)")
+    parser.add_argument("--threads", type=int, default=None, help="Concurrent compiles (default: one per variant)")
+    parser.add_argument("--force", action="store_true", help="Recompile even when the cache has the binary")
+    args = parser.parse_args()
+
+    names = args.variants or known_variants()
+    try:
+        specs = {name: variant(name, args.m5ops) for name in names}
+        built = build_all(specs, args.threads, force=args.force)
+    except (ValueError, RuntimeError) as e:
+        parser.exit(1, f"{e}\n")
+    print(f"{len(built)} binaries up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Take-once, restore-many checkpoints of the benchmarks' initialization phase.
+
+``cache_config.py --take_checkpoint`` fast-forwards a binary built with
+``-DGEM5_M5OPS`` on an atomic CPU up to its ``CHECKPOINT_MARK()`` and saves
+an ``m5.cpt``. Each sweep point then passes ``--restore_checkpoint`` and only
+simulates the kernel in its own cache hierarchy.
+"""
+import os
+import shutil
+import subprocess
+
+from .result_store import built_from, stamp_binary
+
+
+def checkpoint_dir(ckpt_root, binary):
+    return os.path.join(ckpt_root, os.path.basename(binary), "cpt")
+
+
+def is_current(cpt_dir, binary):
+    """A checkpoint is reusable while the binary is the build it was taken from."""
+    return os.path.exists(os.path.join(cpt_dir, "m5.cpt")) and built_from(os.path.dirname(cpt_dir), binary)
+
+
+def ensure_checkpoint(gem5_bin, cache_conf, binary, ckpt_root, cwd=None, force=False):
+    """Return the checkpoint directory for ``binary``, taking it if needed."""
+    cpt_dir = checkpoint_dir(ckpt_root, binary)
+    if not force and is_current(cpt_dir, binary):
+        return cpt_dir
+
+    run_dir = os.path.dirname(cpt_dir)
+    os.makedirs(run_dir, exist_ok=True)
+    # A failed take must not leave the previous build's checkpoint to be stamped as this one's
+    shutil.rmtree(cpt_dir, ignore_errors=True)
+    cmd = [
+        gem5_bin,
+        "-d", run_dir,
+        cache_conf,
+        f"--binary={binary}",
+        f"--take_checkpoint={cpt_dir}"
+    ]
+    print(f"-> Taking checkpoint for {os.path.basename(binary)}...")
+    with open(os.path.join(run_dir, "sim_out.txt"), "w") as out, \
+         open(os.path.join(run_dir, "sim_err.txt"), "w") as err:
+        subprocess.run(cmd, stdout=out, stderr=err, cwd=cwd)
+
+    if not os.path.exists(os.path.join(cpt_dir, "m5.cpt")):
+        raise RuntimeError(f"Checkpoint for {binary} was not written; see {run_dir}/sim_err.txt")
+    stamp_binary(run_dir, binary)
+    return cpt_dir
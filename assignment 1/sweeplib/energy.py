@@ -0,0 +1,121 @@
+"""Energy of the L1I + L1D + L2 hierarchy per sweep point, from gem5 stats and CACTI.
+
+gem5 counts the events, CACTI prices them. The CACTI side is the table
+written by assignment 2's ``cacti_sweep.py --latency_table`` (one row per
+size, associativity, block size and technology node, with read/write energy
+per access in nJ and total leakage in mW). Per level:
+
+* L1D reads (loads, atomics) and the lines it writes back to L2 cost a
+  read; stores and the lines filled on a miss cost a write.
+* L1I fetches cost a read and the lines filled on a miss a write. The
+  icache is built with the L1D's size and associativity, so it is priced
+  with the same CACTI entry.
+* L2 demand accesses (the L1 misses) and its own writebacks cost a read;
+  dirty lines arriving from L1 and the lines filled on a miss cost a write.
+
+Leakage energy is the sum of the three caches' leakage power times
+simSeconds. All energies are in joules; ``EDP`` is J*s and ``ED2P`` is
+J*s^2, with simSeconds as the delay.
+"""
+import csv
+
+from .stats_parser import lookup
+
+BLOCK_SIZE = 64
+
+ENERGY_COLUMNS = ["L1I_DynamicEnergy", "L1_DynamicEnergy", "L2_DynamicEnergy", "DynamicEnergy", "LeakageEnergy",
+                  "TotalEnergy", "EDP", "ED2P"]
+
+_SIZE_UNITS = {"B": 1, "kB": 1024, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def size_bytes(size):
+    """``"32kB"`` -> 32768 (gem5's binary units); integers pass through."""
+    if isinstance(size, int):
+        return size
+    text = str(size).strip()
+    for unit in sorted(_SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit) and text[:-len(unit)].strip().isdigit():
+            return int(text[:-len(unit)]) * _SIZE_UNITS[unit]
+    return int(text)
+
+
+def _float(text):
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
+def load_cacti_table(path):
+    """``{(size_bytes, assoc, block_size, tech_nm): {column: float or None}}``."""
+    table = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            key = (int(row["size_bytes"]), int(row["assoc"]), int(row["block_size"]), int(row["tech_nm"]))
+            table[key] = {name: _float(value) for name, value in row.items() if name not in
+                          ("size_bytes", "assoc", "block_size", "tech_nm")}
+    return table
+
+
+def resolve_tech_node(table, tech_node=None):
+    """``tech_node`` if the table has it; with None, the table's only node."""
+    nodes = sorted({key[3] for key in table})
+    if tech_node is None:
+        if len(nodes) != 1:
+            raise ValueError(f"CACTI table covers {nodes} nm; choose a technology node")
+        return nodes[0]
+    if tech_node not in nodes:
+        raise ValueError(f"CACTI table has no {tech_node} nm entries (covers {nodes} nm)")
+    return tech_node
+
+
+def level_costs(table, size, assoc, tech_node, block_size=BLOCK_SIZE):
+    """(read nJ, write nJ, leakage mW) of one cache, or None if CACTI has no result for it."""
+    entry = table.get((size_bytes(size), int(assoc), block_size, tech_node))
+    if entry is None:
+        return None
+    costs = (entry.get("read_energy_nj"), entry.get("write_energy_nj"), entry.get("leakage_mw"))
+    return None if None in costs else costs
+
+
+def hierarchy_energy(stats, config, table, tech_node, block_size=BLOCK_SIZE):
+    """Energy columns (see ``ENERGY_COLUMNS``) of one run, or None.
+
+    ``config`` carries ``L1_Size``, ``L1_Assoc``, ``L2_Size`` and
+    ``L2_Assoc`` as the sweeps name them. None means a counter is missing
+    from ``stats`` or the table has no entry for one of the caches.
+    """
+    l1 = level_costs(table, config["L1_Size"], config["L1_Assoc"], tech_node, block_size)
+    l2 = level_costs(table, config["L2_Size"], config["L2_Assoc"], tech_node, block_size)
+    seconds = lookup(stats, "simSeconds")
+    counts = {name: lookup(stats, name) for name in
+              ("L1I_Accesses", "L1I_Misses", "L1_Accesses", "L1_WriteReqs", "L1_Misses", "L1_Writebacks",
+               "L2_Accesses", "L2_WritebacksIn", "L2_Misses", "L2_Writebacks")}
+    if l1 is None or l2 is None or seconds is None or counts["L1_Accesses"] is None or counts["L1I_Accesses"] is None:
+        return None
+    # A level that saw no traffic of a kind has no counter for it
+    counts = {name: value or 0 for name, value in counts.items()}
+
+    l1_reads = counts["L1_Accesses"] - counts["L1_WriteReqs"] + counts["L1_Writebacks"]
+    l1_writes = counts["L1_WriteReqs"] + counts["L1_Misses"]
+    l2_reads = counts["L2_Accesses"] + counts["L2_Writebacks"]
+    l2_writes = counts["L2_WritebacksIn"] + counts["L2_Misses"]
+
+    l1i_dynamic = (counts["L1I_Accesses"] * l1[0] + counts["L1I_Misses"] * l1[1]) * 1e-9
+    l1_dynamic = (l1_reads * l1[0] + l1_writes * l1[1]) * 1e-9
+    l2_dynamic = (l2_reads * l2[0] + l2_writes * l2[1]) * 1e-9
+    leakage = (2 * l1[2] + l2[2]) * 1e-3 * seconds
+    dynamic = l1i_dynamic + l1_dynamic + l2_dynamic
+    total = dynamic + leakage
+    return {
+        "L1I_DynamicEnergy": l1i_dynamic,
+        "L1_DynamicEnergy": l1_dynamic,
+        "L2_DynamicEnergy": l2_dynamic,
+        "DynamicEnergy": dynamic,
+        "LeakageEnergy": leakage,
+        "TotalEnergy": total,
+        "EDP": total * seconds,
+        "ED2P": total * seconds ** 2,
+    }
@@ -0,0 +1,245 @@
+"""Failure classification and retries for gem5 sweep jobs.
+
+A failed run used to surface as a bare ``Failed``/``Error`` row (or, in
+part 2, as a small ``stats.txt`` that extraction skipped), so after an OOM
+wave on a shared machine the only way to find the missing points was to
+sweep again. ``run_with_retries`` runs a job through
+``monitor.run_monitored`` and decides from the exit code, ``killed.json``
+and the tail of ``sim_err.txt``/``sim_out.txt`` what went wrong:
+
+* ``geometry``: gem5 rejected the cache parameters (sets not a power of 2,
+  no CACTI entry for the size/associativity, ...);
+* ``missing_binary`` / ``missing_input``: the benchmark or gem5 itself, or
+  the benchmark's ``random_numbers.bin``, could not be opened;
+* ``oom``: killed by the kernel (SIGKILL that was not ours) or ran out of
+  memory inside gem5;
+* ``timeout`` / ``rss_limit``: killed by ``--max_wall`` / ``--max_rss``;
+* ``panic`` / ``fatal`` / ``crash``: gem5 ``panic:``/assertion, ``fatal:``,
+  or a segfault-style signal;
+* ``signal`` / ``io``: terminated from outside, or out of disk space;
+* ``no_stats``: exited cleanly without a complete ``stats.txt``;
+* ``error``: any other non-zero exit.
+
+``TRANSIENT`` ones (``oom``, ``signal``, ``io``) depend on the machine, not
+the configuration, and are retried with exponential backoff; the rest would
+fail the same way again. A run that still fails leaves ``failure.json`` in
+its directory and has its partial ``stats.txt`` removed, so nothing
+downstream mistakes it for a result. ``collect_failures`` reads those files
+back for the end-of-sweep summary, and the CLI finds every missing point
+of a results tree without re-running anything.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.failures "part 2/results" --csv failures.csv
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import signal
+import time
+
+from .monitor import read_killed, run_monitored
+from .result_store import clear_outputs, is_complete
+
+FAILURE_FILE = "failure.json"
+TRANSIENT = {"oom", "signal", "io"}
+
+# gem5's fatal()/panic() lines, with or without the "src/file.cc:NN: " prefix of newer versions
+_FATAL = r"^(?:\S+:\d+: )?fatal: "
+_PANIC = r"^(?:\S+:\d+: )?panic: "
+
+# Checked in order against the tails of sim_err.txt and sim_out.txt; the first match wins.
+# missing_binary is built per run from the benchmark's path (see _patterns).
+PATTERNS = [
+    # The benchmarks' own message; they then exit normally
+    ("missing_input", re.compile(r"^Error: Could not open input file", re.MULTILINE)),
+    ("missing_binary", None),
+    ("geometry", re.compile(_FATAL + r".*(?:# of sets must be|power of 2|[Aa]ssociativity must|"
+                            r"[Cc]ache size must)|^No CACTI entry for ", re.MULTILINE)),
+    ("oom", re.compile(r"std::bad_alloc|Cannot allocate memory|MemoryError|[Oo]ut of memory")),
+    ("io", re.compile(r"No space left on device|Disk quota exceeded")),
+    ("panic", re.compile(_PANIC + r"|Assertion .* failed", re.MULTILINE)),
+    ("fatal", re.compile(_FATAL, re.MULTILINE)),
+]
+CRASH_SIGNALS = {signal.SIGSEGV, signal.SIGBUS, signal.SIGILL, signal.SIGFPE}
+
+
+def _tail(path, size=16384):
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, os.path.getsize(path) - size))
+            return f.read().decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def _matching_line(text, match):
+    start = text.rfind("\n", 0, match.start()) + 1
+    end = text.find("\n", match.end())
+    return text[start:end if end >= 0 else None].strip()[:200]
+
+
+def _patterns(binary=None):
+    """``PATTERNS`` with missing_binary matching gem5 itself not starting, or a fatal() naming ``binary``."""
+    missing = r"^Cannot start "
+    if binary:
+        missing += r"|" + _FATAL + r".*" + re.escape(binary)
+    return [(category, re.compile(missing, re.MULTILINE) if pattern is None else pattern)
+            for category, pattern in PATTERNS]
+
+
+def _binary_of(cmd):
+    """The benchmark a gem5 command line runs (its ``--binary=`` argument), or None."""
+    return next((arg.split("=", 1)[1] for arg in cmd if str(arg).startswith("--binary=")), None)
+
+
+def classify(run_dir, returncode, killed=None, binary=None):
+    """``(category, detail)`` of a finished run; ``("ok", None)`` if it produced complete stats.
+
+    ``binary`` is the benchmark's path: only a gem5 ``fatal:`` naming it
+    counts as ``missing_binary``.
+    """
+    if killed:
+        return ("rss_limit" if killed.get("limit") == "rss" else "timeout"), killed["reason"]
+    texts = [_tail(os.path.join(run_dir, name)) for name in ("sim_err.txt", "sim_out.txt")]
+    done = returncode == 0 and is_complete(run_dir)
+    for category, pattern in _patterns(binary):
+        # A benchmark that cannot open its input exits normally, so gem5 still writes full stats
+        if done and category != "missing_input":
+            break
+        for text in texts:
+            match = pattern.search(text)
+            if match:
+                return category, _matching_line(text, match)
+    if done:
+        return "ok", None
+
+    if returncode in (-signal.SIGKILL, 128 + signal.SIGKILL):
+        return "oom", "killed by SIGKILL (kernel OOM killer?)"
+    if returncode is not None and returncode < 0:
+        if -returncode == signal.SIGABRT:
+            return "panic", "aborted (SIGABRT)"
+        name = signal.Signals(-returncode).name if -returncode in signal.valid_signals() else f"signal {-returncode}"
+        return ("crash" if -returncode in CRASH_SIGNALS else "signal"), f"killed by {name}"
+    if returncode == 0:
+        return "no_stats", "exited cleanly without a complete stats.txt"
+    last = [line.strip() for line in texts[0].splitlines() if line.strip()]
+    return "error", (last[-1][:200] if last else f"exit code {returncode}")
+
+
+def read_failure(run_dir):
+    """The ``failure.json`` of a run, or None."""
+    try:
+        with open(os.path.join(run_dir, FAILURE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def run_with_retries(cmd, run_dir, cwd=None, limits=None, retries=2, backoff=60.0):
+    """Run ``cmd`` into ``run_dir`` until it succeeds or fails for a non-transient reason.
+
+    Each attempt starts without a ``stats.txt`` and writes
+    ``sim_out.txt``/``sim_err.txt``. The n-th retry waits about
+    ``backoff * 2**(n-1)`` seconds (with jitter, so jobs killed together do
+    not come back together). Returns None on success, otherwise the failure
+    record also written to ``failure.json``.
+    """
+    failure_file = os.path.join(run_dir, FAILURE_FILE)
+    attempts = []
+    while True:
+        clear_outputs(run_dir)
+        with open(os.path.join(run_dir, "sim_out.txt"), "w") as out, \
+             open(os.path.join(run_dir, "sim_err.txt"), "w") as err:
+            try:
+                code, _ = run_monitored(cmd, run_dir, stdout=out, stderr=err, cwd=cwd, limits=limits)
+            except FileNotFoundError as e:
+                code = None
+                print(f"Cannot start {cmd[0]}: {e}", file=err)
+        category, detail = classify(run_dir, code, read_killed(run_dir), _binary_of(cmd))
+        if category == "ok":
+            if os.path.exists(failure_file):
+                os.remove(failure_file)
+            return None
+        attempts.append({"category": category, "detail": detail, "returncode": code, "time": time.time()})
+        if category not in TRANSIENT or len(attempts) > retries:
+            break
+        time.sleep(backoff * 2 ** (len(attempts) - 1) * random.uniform(1.0, 1.5))
+
+    # Partial stats of a failed run must never be read as a result
+    clear_outputs(run_dir)
+    failure = {"category": category, "detail": detail, "transient": category in TRANSIENT,
+               "attempts": len(attempts), "history": attempts}
+    with open(failure_file, "w") as f:
+        json.dump(failure, f, indent=2)
+    return failure
+
+
+def collect_failures(run_dirs, since=None):
+    """``{label: failure}`` of the runs in ``{label: run_dir}`` that failed and have no result.
+
+    ``since`` (a ``time.time()``) ignores failures recorded before it, e.g.
+    by an earlier sweep whose points this one did not touch.
+    """
+    failures = {}
+    for label, run_dir in run_dirs.items():
+        failure = read_failure(run_dir)
+        if not failure or is_complete(run_dir):
+            continue
+        if since and failure["history"][-1]["time"] < since:
+            continue
+        failures[label] = failure
+    return failures
+
+
+def print_failure_summary(failures, total=None):
+    """Failed runs grouped by category, transient categories flagged."""
+    if not failures:
+        print("No failed runs." if total is None else f"No failed runs ({total} attempted).")
+        return
+    by_category = {}
+    for label, failure in sorted(failures.items()):
+        by_category.setdefault(failure["category"], []).append((label, failure))
+    print(f"{len(failures)} runs failed" + (f" of {total}" if total is not None else "") + ":")
+    for category, runs in sorted(by_category.items(), key=lambda item: -len(item[1])):
+        note = ", transient: re-run to retry" if category in TRANSIENT else ""
+        print(f"  {category} ({len(runs)}{note})")
+        for label, failure in runs:
+            print(f"    {label}: {failure['detail']} [{failure['attempts']} attempts]")
+
+
+def write_failures(failures, path):
+    """One CSV row per failed run: what is missing and why."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["run", "category", "transient", "attempts", "detail"])
+        for label, failure in sorted(failures.items()):
+            writer.writerow([label, failure["category"], failure["transient"], failure["attempts"], failure["detail"]])
+
+
+def find_failures(root):
+    """Every run under ``root`` with a ``failure.json`` and no complete stats, keyed by its relative path."""
+    run_dirs = {}
+    for dirpath, _, filenames in os.walk(root):
+        if FAILURE_FILE in filenames:
+            run_dirs[os.path.relpath(dirpath, root)] = dirpath
+    return collect_failures(run_dirs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the failed (missing) runs of a results tree")
+    parser.add_argument("root", help="Results tree to search, e.g. 'part 2/results' or 'part 1/results/full_sweep'")
+    parser.add_argument("--csv", default=None, help="Also write the list to this CSV")
+    args = parser.parse_args()
+
+    failures = find_failures(args.root)
+    print_failure_summary(failures)
+    if args.csv:
+        write_failures(failures, args.csv)
+        print(f"Saved to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
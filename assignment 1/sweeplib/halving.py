@@ -0,0 +1,86 @@
+"""Successive-halving exploration of the cache design space.
+
+Instead of simulating every point of the Cartesian product to completion,
+all candidates first run for a short instruction budget (``--max_insts`` in
+``cache_config.py``), are ranked on a cheap score, and only the best
+fraction of each group (algorithm or matrix size) is promoted to the next,
+longer budget. The last round runs the few survivors to completion.
+
+Short runs see the start of the kernel only, so rankings are noisy when the
+budget is far below the working-set warm-up; keep the first budget at least
+a few million instructions and ``keep`` generous (a quarter or a third).
+"""
+import math
+
+from .stats_parser import lookup
+
+
+def cycles_per_inst(stats):
+    """simTicks per committed instruction (lower is better)."""
+    insts = lookup(stats, "simInsts")
+    ticks = lookup(stats, "simTicks")
+    return ticks / insts if insts and ticks is not None else None
+
+
+def l1_miss_rate(stats):
+    return lookup(stats, "L1_MissRate")
+
+
+def l2_miss_rate(stats):
+    return lookup(stats, "L2_MissRate")
+
+
+SCORES = {
+    "cpi": cycles_per_inst,
+    "l1_miss": l1_miss_rate,
+    "l2_miss": l2_miss_rate,
+}
+
+
+def parse_budgets(text):
+    """``"2000000,20000000"`` -> ``[2000000, 20000000]`` (increasing)."""
+    budgets = sorted(int(float(b)) for b in text.split(",") if b.strip())
+    if not budgets or budgets[0] <= 0:
+        raise ValueError(f"Invalid instruction budgets: {text!r}")
+    return budgets
+
+
+def promote(results, keep, min_keep, score, group=None):
+    """Best ``keep`` fraction (at least ``min_keep``) of each group.
+
+    ``results`` maps candidate -> stats dict (None for a failed run; failed
+    candidates are never promoted).
+    """
+    groups = {}
+    for candidate, stats in results.items():
+        value = score(stats) if stats else None
+        if value is not None:
+            groups.setdefault(group(candidate) if group else None, []).append((value, candidate))
+
+    promoted = []
+    for scored in groups.values():
+        scored.sort(key=lambda item: item[0])
+        count = min(len(scored), max(min_keep, math.ceil(len(scored) * keep)))
+        promoted.extend(candidate for _, candidate in scored[:count])
+    return promoted
+
+
+def successive_halving(candidates, evaluate, budgets, keep=0.25, min_keep=3,
+                       score=cycles_per_inst, group=None):
+    """Run the halving rounds and return ``{candidate: stats}`` of the full runs.
+
+    ``evaluate(candidates, budget)`` simulates every candidate for ``budget``
+    instructions (``None`` = to completion) and returns ``{candidate: stats}``.
+    """
+    survivors = list(candidates)
+    for round_no, budget in enumerate(budgets, 1):
+        results = evaluate(survivors, budget)
+        promoted = promote(results, keep, min_keep, score, group)
+        print(f"Round {round_no}: {len(survivors)} candidates at {budget:,} instructions -> "
+              f"{len(promoted)} promoted")
+        if not promoted:
+            return {}
+        survivors = promoted
+
+    print(f"Final round: running {len(survivors)} candidates to completion")
+    return evaluate(survivors, None)
@@ -0,0 +1,64 @@
+"""Append-only, fsync'd result journal for long sweeps.
+
+Each finished job is written as one JSON line and fsync'd before the next,
+so a crash, OOM kill or Ctrl-C loses at most the row being written. The
+final CSV is materialized from the journal, and can be rebuilt at any time
+while the sweep is still running.
+"""
+import csv
+import json
+import os
+
+
+class Journal:
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, key, row):
+        """Durably record ``row`` (a list of CSV fields) for job ``key``."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        line = json.dumps({"key": key, "row": row}) + "\n"
+        with open(self.path, "a+") as f:
+            # Start a fresh line after a write torn by a crash
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                if f.read(1) != "\n":
+                    line = "\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def entries(self):
+        """Journal records in write order; torn lines are skipped."""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def rows(self):
+        """Latest row per key, in first-seen order."""
+        latest = {}
+        for record in self.entries():
+            latest[record["key"]] = record["row"]
+        return latest
+
+    def reset(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def materialize(self, output_csv, header):
+        """Write the journal's rows to ``output_csv``; returns the row count."""
+        rows = list(self.rows().values())
+        tmp_path = output_csv + ".tmp"
+        with open(tmp_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        os.replace(tmp_path, output_csv)
+        return len(rows)
@@ -0,0 +1,185 @@
+"""Live progress, ETA and runaway-job limits for gem5 sweep jobs.
+
+gem5 runs started with ``cache_config.py --progress_interval TICKS``
+rewrite ``progress.json`` in their output directory every TICKS simulated
+ticks, with the current tick, the instructions committed so far and gem5's
+host seconds. Two pieces build on it:
+
+* ``run_monitored`` replaces ``subprocess.run`` in the sweep workers. It
+  polls the gem5 process and kills it when it exceeds a wall-clock limit or
+  a resident-memory limit (``VmRSS`` from ``/proc/<pid>/status``), leaving
+  ``killed.json`` in the run directory so the driver reports the run
+  instead of storing it.
+* ``Dashboard`` runs in the driver. ``run_longest_first`` tells it which
+  jobs are in flight; every ``period`` seconds it reads their
+  ``progress.json`` and prints per-job and total inst/s, how far each job is
+  against the instruction count expected from earlier runs, and an ETA for
+  the sweep. Jobs whose progress file stopped changing are flagged.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .scheduler import format_duration
+
+PROGRESS_FILE = "progress.json"
+KILLED_FILE = "killed.json"
+# Simulated ticks between progress reports: 10 ms at 1 ps/tick, a few host seconds on the timing CPU
+PROGRESS_TICKS = 10_000_000_000
+
+
+def read_progress(run_dir):
+    """Latest ``progress.json`` of a run (plus its age in seconds), or None."""
+    path = os.path.join(run_dir, PROGRESS_FILE)
+    try:
+        with open(path) as f:
+            progress = json.load(f)
+        progress["age"] = time.time() - os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None
+    return progress
+
+
+def read_killed(run_dir):
+    """Why a run was killed, or None if it was not."""
+    try:
+        with open(os.path.join(run_dir, KILLED_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def rss_mb(pid):
+    """Resident set size of ``pid`` in MB (None where /proc is unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def run_monitored(cmd, run_dir, stdout=None, stderr=None, cwd=None, limits=None, poll=2.0):
+    """Run ``cmd`` like ``subprocess.run``, killing it past ``limits``.
+
+    ``limits`` is a ``(wall seconds, RSS MB)`` pair; either may be None.
+    Returns ``(return code, reason)``: ``reason`` is None for a run that was
+    left to finish, otherwise it says which limit was hit (also written to
+    ``killed.json`` with the last progress report).
+    """
+    for name in (PROGRESS_FILE, KILLED_FILE):
+        if os.path.exists(os.path.join(run_dir, name)):
+            os.remove(os.path.join(run_dir, name))
+    wall_limit, rss_limit = limits or (None, None)
+    start = time.time()
+    proc = subprocess.Popen(cmd, stdout=stdout, stderr=stderr, cwd=cwd)
+    while True:
+        try:
+            return proc.wait(timeout=poll), None
+        except subprocess.TimeoutExpired:
+            pass
+        elapsed = time.time() - start
+        rss = rss_mb(proc.pid)
+        if wall_limit and elapsed > wall_limit:
+            limit, reason = "wall", f"wall-clock limit of {format_duration(wall_limit)} exceeded"
+        elif rss_limit and rss and rss > rss_limit:
+            limit, reason = "rss", f"RSS {rss:.0f} MB over the {rss_limit} MB limit"
+        else:
+            continue
+        proc.kill()
+        proc.wait()
+        with open(os.path.join(run_dir, KILLED_FILE), "w") as f:
+            json.dump({"reason": reason, "limit": limit, "wall_seconds": elapsed, "rss_mb": rss,
+                       "progress": read_progress(run_dir)}, f, indent=2)
+        return proc.returncode, reason
+
+
+def _label(features):
+    return " ".join(str(v) for v in features.values())
+
+
+class Dashboard:
+    """Periodic progress table of the jobs in flight.
+
+    ``run_dir(args)`` is where a job's gem5 output goes and
+    ``expected_insts(features)`` the instruction count it should reach
+    (None if unknown, e.g. ``CostModel.expected_insts``).
+    """
+
+    def __init__(self, run_dir, expected_insts=None, period=60.0, stall=None, stream=sys.stdout):
+        self.run_dir = run_dir
+        self.expected_insts = expected_insts or (lambda features: None)
+        self.period = period
+        self.stall = stall or 5 * period
+        self.stream = stream
+        self.queued = {}
+        self.running = {}
+        self.done = 0
+        self.killed = []
+        self.last = time.time()
+
+    def queue(self, jobs):
+        """``{key: (features, args)}`` of jobs that will run."""
+        self.queued.update(jobs)
+
+    def started(self, key):
+        self.running[key] = self.queued.pop(key)
+
+    def finished(self, key):
+        features, args = self.running.pop(key, None) or self.queued.pop(key)
+        self.done += 1
+        killed = read_killed(self.run_dir(args))
+        if killed:
+            self.killed.append((features, killed["reason"]))
+            print(f"Killed {_label(features)}: {killed['reason']}", file=self.stream)
+
+    def tick(self):
+        """Refresh if a period has passed since the last table."""
+        if time.time() - self.last >= self.period:
+            self.refresh()
+
+    def refresh(self):
+        self.last = time.time()
+        rows, total_rate, remaining, unknown = [], 0.0, 0.0, 0
+        for features, args in self.running.values():
+            progress = read_progress(self.run_dir(args))
+            expected = self.expected_insts(features)
+            if not progress:
+                rows.append(f"  {_label(features):<40} starting")
+                unknown += expected is None
+                remaining += expected or 0
+                continue
+            rate = progress["insts"] / progress["host_seconds"] if progress["host_seconds"] > 0 else 0.0
+            total_rate += rate
+            line = f"  {_label(features):<40} {progress['insts'] / 1e6:10.1f}M inst {rate / 1e3:8.1f}k inst/s"
+            if expected:
+                left = max(expected - progress["insts"], 0)
+                remaining += left
+                line += f"  {min(99.0, 100.0 * progress['insts'] / expected):5.1f}%"
+                line += f"  ETA {format_duration(left / rate)}" if rate > 0 else ""
+            else:
+                unknown += 1
+            if progress["age"] > self.stall:
+                line += f"  no progress for {format_duration(progress['age'])}"
+            rows.append(line)
+        for features, _ in self.queued.values():
+            expected = self.expected_insts(features)
+            unknown += expected is None
+            remaining += expected or 0
+
+        eta = format_duration(remaining / total_rate) if total_rate > 0 else "?"
+        header = (f"[{time.strftime('%H:%M:%S')}] {len(self.running)} running, {len(self.queued)} queued, "
+                  f"{self.done} done, {len(self.killed)} killed | {total_rate / 1e6:.2f}M inst/s total | ETA {eta}")
+        if unknown:
+            header += f" (+{unknown} jobs with no history)"
+        print("\n".join([header] + sorted(rows)), file=self.stream, flush=True)
+
+    def close(self):
+        if self.killed:
+            print(f"{len(self.killed)} jobs killed:", file=self.stream)
+            for features, reason in self.killed:
+                print(f"  {_label(features)}: {reason}", file=self.stream)
@@ -0,0 +1,155 @@
+"""Pareto fronts for sweep results, in O(n log n) for two objectives.
+
+All objectives are minimised (negate, or list in ``maximize``, for the
+others). Exact duplicates count once: the first occurrence is kept.
+
+* 2 objectives: sort by the first, sweep keeping points that beat the best
+  second objective seen so far.
+* 3+ objectives: Kung's divide and conquer. Points are sorted
+  lexicographically, so nothing in the second half can dominate the first;
+  each half's front is computed recursively and the second half's front is
+  filtered against the first's with a recursive median split that ends in
+  a sort-and-sweep on two columns (O(n log^2 n) for three objectives).
+* Epsilon dominance: costs are snapped to boxes of width ``eps`` (or of
+  ratio ``1 + eps`` with ``relative=True``), the front is taken over boxes
+  and one representative, nearest the box's lower corner, is kept per box.
+  This thins dense fronts from surrogate or trace-driven grids to a size
+  worth simulating or plotting.
+"""
+import numpy as np
+
+_BRUTE_FORCE_SIZE = 256
+_MERGE_CHUNK = 1 << 20
+
+
+def _dominated_by(front, candidates):
+    """Mask of ``candidates`` weakly dominated by some row of ``front`` (brute force)."""
+    mask = np.zeros(len(candidates), dtype=bool)
+    if len(front) == 0:
+        return mask
+    step = max(1, _MERGE_CHUNK // (len(front) * candidates.shape[1]))
+    for start in range(0, len(candidates), step):
+        chunk = candidates[start:start + step]
+        mask[start:start + step] = np.all(front[None, :, :] <= chunk[:, None, :], axis=2).any(axis=1)
+    return mask
+
+
+def _filter(front, candidates):
+    """Mask of ``candidates`` weakly dominated by some row of ``front``.
+
+    Two columns are answered with one sort and a prefix minimum. More columns
+    are split at the median of the last one: a candidate above the split is
+    beaten on that column by every front row below it, so only the remaining
+    columns need checking there (Kung/Bentley's recursive filter).
+    """
+    if len(front) == 0 or len(candidates) == 0:
+        return np.zeros(len(candidates), dtype=bool)
+    if front.shape[1] == 1:
+        return candidates[:, 0] >= front[:, 0].min()
+    if front.shape[1] == 2:
+        order = np.argsort(front[:, 0], kind="stable")
+        best = np.minimum.accumulate(front[order, 1])
+        count = np.searchsorted(front[order, 0], candidates[:, 0], side="right")
+        return (count > 0) & (best[np.maximum(count - 1, 0)] <= candidates[:, 1])
+    if len(front) * len(candidates) <= _BRUTE_FORCE_SIZE ** 2:
+        return _dominated_by(front, candidates)
+
+    last_front, last_cand = front[:, -1], candidates[:, -1]
+    pivot = np.median(np.concatenate((last_front, last_cand)))
+    front_lo, cand_lo = last_front <= pivot, last_cand <= pivot
+    if front_lo.all() and cand_lo.all():
+        front_lo, cand_lo = last_front < pivot, last_cand < pivot
+        if not front_lo.any() and not cand_lo.any():
+            # Last column is constant, so it decides nothing
+            return _filter(front[:, :-1], candidates[:, :-1])
+
+    mask = np.zeros(len(candidates), dtype=bool)
+    mask[cand_lo] = _filter(front[front_lo], candidates[cand_lo])
+    cand_hi = ~cand_lo
+    mask[cand_hi] = (_filter(front[~front_lo], candidates[cand_hi])
+                     | _filter(front[front_lo][:, :-1], candidates[cand_hi][:, :-1]))
+    return mask
+
+
+def _front_2d(costs):
+    order = np.lexsort((costs[:, 1], costs[:, 0]))
+    y = costs[order, 1]
+    best_before = np.minimum.accumulate(np.concatenate(([np.inf], y[:-1])))
+    return order[y < best_before]
+
+
+def _kung(costs, idx):
+    """Indices (into ``costs``) of the front of ``idx``, which is lexicographically sorted."""
+    if len(idx) <= _BRUTE_FORCE_SIZE:
+        # Rows are distinct, so weak dominance by another row is strict
+        block = costs[idx]
+        dominates = np.all(block[None, :, :] <= block[:, None, :], axis=2)
+        np.fill_diagonal(dominates, False)
+        return idx[~dominates.any(axis=1)]
+    half = len(idx) // 2
+    top = _kung(costs, idx[:half])
+    bottom = _kung(costs, idx[half:])
+    # Sorted on the first column, so only the others decide dominance of bottom by top
+    return np.concatenate((top, bottom[~_filter(costs[top, 1:], costs[bottom, 1:])]))
+
+
+def pareto_mask(costs):
+    """Boolean mask of the non-dominated rows of an ``(n, k)`` cost array."""
+    costs = np.asarray(costs, dtype=float)
+    if costs.ndim != 2:
+        raise ValueError("costs must be an (n_points, n_objectives) array")
+    mask = np.zeros(len(costs), dtype=bool)
+    if len(costs) == 0:
+        return mask
+
+    # Exact duplicates: only the first occurrence can be on the front
+    unique, first = np.unique(costs, axis=0, return_index=True)
+    if unique.shape[1] == 1:
+        front = [np.argmin(unique[:, 0])]
+    elif unique.shape[1] == 2:
+        front = _front_2d(unique)
+    else:
+        # np.unique already returns rows in lexicographic order
+        front = _kung(unique, np.arange(len(unique)))
+    mask[first[front]] = True
+    return mask
+
+
+def epsilon_pareto_mask(costs, eps, relative=False):
+    """Mask of one representative per non-dominated epsilon box.
+
+    ``eps`` is a scalar or one value per objective. With ``relative=True``
+    boxes are multiplicative (costs must be positive), so ``eps=0.05`` keeps
+    points that differ by more than 5% in some objective.
+    """
+    costs = np.asarray(costs, dtype=float)
+    eps = np.broadcast_to(np.asarray(eps, dtype=float), (costs.shape[1],))
+    if np.any(eps <= 0):
+        raise ValueError("eps must be positive")
+    if relative:
+        if np.any(costs <= 0):
+            raise ValueError("relative epsilon dominance needs positive costs")
+        scaled = np.log(costs) / np.log1p(eps)
+    else:
+        scaled = costs / eps
+    boxes = np.floor(scaled)
+
+    # Representative per box: the point closest to the box's lower corner
+    distance = np.linalg.norm(scaled - boxes, axis=1)
+    order = np.lexsort((distance,) + tuple(boxes[:, k] for k in reversed(range(boxes.shape[1]))))
+    _, first_in_box = np.unique(boxes[order], axis=0, return_index=True)
+    representatives = order[first_in_box]
+
+    mask = np.zeros(len(costs), dtype=bool)
+    mask[representatives[pareto_mask(boxes[representatives])]] = True
+    return mask
+
+
+def pareto_front(df, objectives, maximize=(), eps=None, relative=False):
+    """Rows of ``df`` on the (epsilon-)Pareto front of ``objectives``."""
+    costs = df[list(objectives)].to_numpy(dtype=float).copy()
+    for k, column in enumerate(objectives):
+        if column in maximize:
+            costs[:, k] = -costs[:, k]
+    mask = pareto_mask(costs) if eps is None else epsilon_pareto_mask(costs, eps, relative)
+    return df[mask]
@@ -0,0 +1,72 @@
+"""Record-once, replay-many request traces for cache-only sweeps.
+
+Caches see the same request stream from the CPU whatever their geometry,
+as long as timing feedback is ignored. ``cache_config.py --record_trace``
+runs one reference configuration in full with a CommMonitor between the
+CPU and each L1, saving the requests as compressed gem5 packet traces.
+Every sweep point then runs ``cache_config.py --replay_trace``, where two
+TrafficGens replay the traces into its L1I/L1D in place of the CPU.
+
+Replay is open loop: requests are issued at their recorded ticks, so a
+slower hierarchy does not stall the "program" and simSeconds/IPC say
+nothing about the configuration. Miss rates and traffic are what replay
+is for; ``sweeplib.validation`` measures how far they drift from full runs.
+"""
+import json
+import os
+import subprocess
+
+from .result_store import built_from, stamp_binary
+
+REFERENCE_KEYS = ("l1d_size", "l1_assoc", "l2_size", "l2_assoc")
+
+
+def trace_dir(trace_root, binary):
+    return os.path.join(trace_root, os.path.basename(binary), "trace")
+
+
+def is_current(tdir, binary, reference):
+    """Traces are reusable while the binary is the build they were recorded from, on ``reference``."""
+    meta = os.path.join(tdir, "trace.json")
+    if not os.path.exists(meta) or not built_from(os.path.dirname(tdir), binary):
+        return False
+    with open(meta) as f:
+        recorded = json.load(f)
+    return all(str(recorded.get(k)) == str(reference[k]) for k in REFERENCE_KEYS)
+
+
+def ensure_trace(gem5_bin, cache_conf, binary, trace_root, reference, extra_args=(), cwd=None, force=False):
+    """Return the trace directory for ``binary``, recording it on ``reference`` if needed.
+
+    ``reference`` maps ``l1d_size``, ``l1_assoc``, ``l2_size`` and
+    ``l2_assoc`` to the configuration recorded in full. Its run directory
+    (the trace directory's parent) keeps that run's stats.txt, the full-CPU
+    baseline for the replay of the same configuration. ``extra_args`` go to
+    cache_config.py unchanged (e.g. the CACTI latency flags).
+    """
+    tdir = trace_dir(trace_root, binary)
+    if not force and is_current(tdir, binary, reference):
+        return tdir
+
+    run_dir = os.path.dirname(tdir)
+    os.makedirs(run_dir, exist_ok=True)
+    if os.path.exists(os.path.join(tdir, "trace.json")):
+        os.remove(os.path.join(tdir, "trace.json"))
+    cmd = [gem5_bin, "-d", run_dir, cache_conf, f"--binary={binary}"]
+    cmd += [f"--{k}={reference[k]}" for k in REFERENCE_KEYS]
+    cmd += list(extra_args)
+    cmd.append(f"--record_trace={tdir}")
+    print(f"-> Recording request trace of {os.path.basename(binary)}...")
+    with open(os.path.join(run_dir, "sim_out.txt"), "w") as out, \
+         open(os.path.join(run_dir, "sim_err.txt"), "w") as err:
+        subprocess.run(cmd, stdout=out, stderr=err, cwd=cwd)
+
+    if not os.path.exists(os.path.join(tdir, "trace.json")):
+        raise RuntimeError(f"Request trace for {binary} was not written; see {run_dir}/sim_err.txt")
+    stamp_binary(run_dir, binary)
+    return tdir
+
+
+def reference_stats(tdir):
+    """stats.txt of the full run a trace was recorded from."""
+    return os.path.join(os.path.dirname(tdir), "stats.txt")
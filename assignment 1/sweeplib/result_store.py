@@ -0,0 +1,132 @@
+"""Content-addressed store of finished gem5 runs shared by all sweep drivers.
+
+A result is keyed by a hash of everything that can change it: the gem5
+binary, ``cache_config.py``, the benchmark binary, its input file and the
+full parameter tuple. A driver asks the store first and only simulates on a
+miss, so editing one sweep axis reruns only the new points, and rebuilding a
+binary or touching the config invalidates exactly the runs that used it.
+
+Layout: ``<root>/<key[:2]>/<key>/`` holds the run's output files plus a
+``meta.json`` describing the inputs.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "result_store"))
+
+RESULT_FILES = ("stats.txt", "stats_intervals.txt", "stats.h5", "config.ini", "config.json", "sim_out.txt", "sim_err.txt")
+
+BINARY_STAMP = "binary.sha256"
+
+_digest_memo = {}
+
+
+def file_digest(path):
+    """SHA-256 of a file, memoised on (path, size, mtime) within the process."""
+    if path is None or not os.path.exists(path):
+        return "absent"
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if memo_key not in _digest_memo:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _digest_memo[memo_key] = h.hexdigest()
+    return _digest_memo[memo_key]
+
+
+def stamp_binary(run_dir, binary):
+    """Record which build of ``binary`` a derived artifact (checkpoint, trace, profile) came from."""
+    with open(os.path.join(run_dir, BINARY_STAMP), "w") as f:
+        f.write(file_digest(binary) + "\n")
+
+
+def built_from(run_dir, binary):
+    """True if ``stamp_binary`` recorded the current contents of ``binary`` in ``run_dir``.
+
+    Contents, not mtimes: a binary re-installed from the build cache keeps
+    the cached file's age, so an mtime check cannot tell builds apart.
+    """
+    try:
+        with open(os.path.join(run_dir, BINARY_STAMP)) as f:
+            return f.read().strip() == file_digest(binary)
+    except OSError:
+        return False
+
+
+def inputs_digest(gem5_bin, cache_conf, binary, input_file=None, latency_table=None):
+    """Digest of the files a run depends on; compute once per sweep, not per job."""
+    h = hashlib.sha256()
+    for label, path in (("gem5", gem5_bin), ("config", cache_conf), ("binary", binary), ("input", input_file)):
+        h.update(f"{label}={file_digest(path)}\n".encode())
+    # Only runs that use a CACTI latency table depend on it
+    if latency_table:
+        h.update(f"latency_table={file_digest(latency_table)}\n".encode())
+    return h.hexdigest()
+
+
+def result_key(digest, params):
+    """Key for one run: the inputs digest plus the full parameter tuple."""
+    payload = json.dumps({"inputs": digest, "params": [str(p) for p in params]})
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_complete(run_dir):
+    stats_file = os.path.join(run_dir, "stats.txt")
+    if not os.path.exists(stats_file) or os.path.getsize(stats_file) == 0:
+        return False
+    with open(stats_file, "rb") as f:
+        f.seek(max(0, os.path.getsize(stats_file) - 4096))
+        return b"End Simulation Statistics" in f.read()
+
+
+def clear_outputs(run_dir):
+    """Drop a previous run's stats so a failed re-run cannot be mistaken for a result."""
+    for name in ("stats.txt", "stats.h5"):
+        if os.path.exists(os.path.join(run_dir, name)):
+            os.remove(os.path.join(run_dir, name))
+
+
+class ResultStore:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def has(self, key):
+        return is_complete(self.path(key))
+
+    def fetch(self, key, dest_dir):
+        """Copy a stored result into ``dest_dir``; False on a miss."""
+        src = self.path(key)
+        if not is_complete(src):
+            return False
+        os.makedirs(dest_dir, exist_ok=True)
+        for name in RESULT_FILES:
+            if os.path.exists(os.path.join(src, name)):
+                shutil.copy2(os.path.join(src, name), os.path.join(dest_dir, name))
+        return True
+
+    def put(self, key, run_dir, meta=None):
+        """Store a finished run; incomplete runs are never stored."""
+        if not is_complete(run_dir):
+            return False
+        final = self.path(key)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(final))
+        for name in RESULT_FILES:
+            if os.path.exists(os.path.join(run_dir, name)):
+                shutil.copy2(os.path.join(run_dir, name), os.path.join(staging, name))
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta or {}, f, indent=2)
+        try:
+            os.rename(staging, final)
+        except OSError:
+            # Another worker stored the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+        return True
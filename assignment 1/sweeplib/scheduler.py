@@ -0,0 +1,217 @@
+"""Longest-job-first dispatch of gem5 sweep jobs.
+
+``Pool.map`` chunks the job list up front, so one slow chunk (Simple
+mergesort, large/high-associativity L2) can leave most workers idle at the
+end. Here each job's host time is predicted from earlier ``stats.txt`` files
+(``hostSeconds`` and ``simInsts``), jobs are handed out one at a time longest
+first, and predictions are corrected from measured times as results arrive.
+Each worker reports which job it picked up; a job whose worker process
+disappears (OOM killer, a signal) is reported as lost instead of leaving
+the sweep waiting for a result that will never come.
+
+Jobs are ``(features, args)`` pairs: ``features`` is a dict with a
+``workload`` entry (algorithm or matrix size) plus the cache parameters,
+``args`` is what the worker function receives.
+"""
+import heapq
+import multiprocessing
+import os
+import queue
+import statistics
+import time
+
+from .stats_parser import lookup, parse_final
+
+# Seconds between checks that the workers running jobs are still alive
+LIVENESS_PERIOD = 5.0
+
+
+def read_cost_stats(stats_file):
+    """(hostSeconds, simInsts) of a finished run, or None."""
+    stats = parse_final(stats_file)
+    if not stats or lookup(stats, 'hostSeconds') is None:
+        return None
+    return float(lookup(stats, 'hostSeconds')), lookup(stats, 'simInsts')
+
+
+def load_history(runs):
+    """Build history records from ``(features, stats_file)`` pairs."""
+    history = []
+    for features, stats_file in runs:
+        cost = read_cost_stats(stats_file)
+        if cost:
+            history.append((dict(features), cost[0], cost[1]))
+    return history
+
+
+class CostModel:
+    """Predicts host seconds per job from historical runs.
+
+    Order of preference: the mean of identical past runs; otherwise the
+    host-seconds-per-instruction rate of the most similar runs of the same
+    workload times that workload's instruction count; otherwise the median
+    of all history. Measured times feed a per-workload correction factor.
+    """
+
+    def __init__(self, history, default=1.0):
+        self.history = history
+        self.default = default
+        self.corrections = {}
+
+    def _base(self, features):
+        exact = [h for f, h, _ in self.history if f == features]
+        if exact:
+            return statistics.mean(exact)
+
+        same_workload = [(f, h, n) for f, h, n in self.history
+                         if f.get("workload") == features.get("workload") and n]
+        if same_workload:
+            def shared(f):
+                return sum(f.get(k) == v for k, v in features.items())
+            best = max(shared(f) for f, _, _ in same_workload)
+            rates = [h / n for f, h, n in same_workload if shared(f) == best]
+            insts = statistics.median(n for _, _, n in same_workload)
+            return statistics.median(rates) * insts
+
+        if self.history:
+            return statistics.median(h for _, h, _ in self.history)
+        return self.default
+
+    def predict(self, features):
+        ratios = self.corrections.get(features.get("workload"))
+        factor = statistics.median(ratios) if ratios else 1.0
+        return self._base(features) * factor
+
+    def expected_insts(self, features):
+        """Instructions a job should commit: identical past runs, else its workload's median; None if unknown."""
+        for match in (lambda f: f == features, lambda f: f.get("workload") == features.get("workload")):
+            insts = [n for f, _, n in self.history if match(f) and n]
+            if insts:
+                return statistics.median(insts)
+        return None
+
+    def observe(self, features, seconds):
+        """Record a measured run; later predictions for its workload are rescaled."""
+        base = self._base(features)
+        if base > 0:
+            self.corrections.setdefault(features.get("workload"), []).append(seconds / base)
+
+
+def projected_makespan(costs, threads):
+    """Makespan of greedy longest-first list scheduling on ``threads`` workers."""
+    finish = [0.0] * max(1, threads)
+    for cost in sorted(costs, reverse=True):
+        heapq.heapreplace(finish, finish[0] + cost)
+    return max(finish)
+
+
+def format_duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
+
+
+def report_plan(costs, threads):
+    """Print the projected makespan, plus a few alternative --threads values."""
+    total = sum(costs)
+    print(f"Projected makespan on {threads} threads: {format_duration(projected_makespan(costs, threads))} "
+          f"({len(costs)} jobs, {format_duration(total)} of work, longest {format_duration(max(costs, default=0))})")
+    options = sorted({t for t in (8, 16, 32, 48, 64, 96, len(costs)) if 0 < t <= len(costs)} - {threads})
+    if options:
+        print("  " + ", ".join(f"{t} threads: {format_duration(projected_makespan(costs, t))}" for t in options))
+
+
+_started = None
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+
+def _timed_call(func, args, i=None):
+    if _started is not None:
+        _started.put((i, os.getpid()))
+    start = time.time()
+    result = func(args)
+    return time.time() - start, result
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def run_longest_first(func, jobs, threads, model, on_result=None, skip=None, dashboard=None):
+    """Run ``func(args)`` for every job, longest predicted first, one per worker.
+
+    ``skip(features, args)`` marks jobs known to be near-free (e.g. already
+    in the result store) so they neither distort the plan nor the model.
+    ``on_result(features, args, result)`` is called as each job finishes.
+    A ``sweeplib.monitor.Dashboard`` is told what runs and refreshed while
+    waiting. Returns results in job order.
+    """
+    free = set(i for i, (features, args) in enumerate(jobs) if skip and skip(features, args))
+    predictions = {i: (0.0 if i in free else model.predict(features)) for i, (features, _) in enumerate(jobs)}
+    report_plan([predictions[i] for i in range(len(jobs)) if i not in free], threads)
+
+    pending = sorted(range(len(jobs)), key=lambda i: predictions[i], reverse=True)
+    results = [None] * len(jobs)
+    done = queue.Queue()
+    # Written synchronously, so a worker killed mid-job holds no lock on it
+    started = multiprocessing.SimpleQueue()
+    in_flight = {}  # job index -> pid of the worker running it (None until it reports)
+    if dashboard:
+        dashboard.queue({i: jobs[i] for i in pending if i not in free})
+
+    with multiprocessing.Pool(threads, initializer=_init_worker, initargs=(started,)) as pool:
+        while pending or in_flight:
+            while pending and len(in_flight) < threads:
+                i = pending.pop(0)
+                pool.apply_async(_timed_call, (func, jobs[i][1], i),
+                                 callback=lambda r, i=i: done.put((i, r, None)),
+                                 error_callback=lambda e, i=i: done.put((i, None, e)))
+                in_flight[i] = None
+                if dashboard and i not in free:
+                    dashboard.started(i)
+
+            try:
+                i, timed, error = done.get(timeout=min(dashboard.period, LIVENESS_PERIOD) if dashboard
+                                           else LIVENESS_PERIOD)
+            except queue.Empty:
+                while not started.empty():
+                    j, pid = started.get()
+                    if j in in_flight:
+                        in_flight[j] = pid
+                # A worker killed mid-job never calls back; the pool just replaces it
+                for j, pid in list(in_flight.items()):
+                    if pid is not None and not _alive(pid):
+                        done.put((j, None, RuntimeError(f"worker process {pid} died (OOM killer or a signal?)")))
+                        in_flight[j] = None
+                if dashboard:
+                    dashboard.refresh()
+                continue
+            if i not in in_flight:
+                continue  # already reported lost
+            del in_flight[i]
+            features, args = jobs[i]
+            if dashboard and i not in free:
+                dashboard.finished(i)
+                dashboard.tick()
+            if error is not None:
+                print(f"Job {features} raised {error!r}")
+                continue
+            elapsed, results[i] = timed
+            if i not in free:
+                model.observe(features, elapsed)
+                # Re-rank what is left with the corrected per-workload estimates
+                pending.sort(key=lambda j: 0.0 if j in free else model.predict(jobs[j][0]), reverse=True)
+            if on_result:
+                on_result(features, args, results[i])
+    if dashboard:
+        dashboard.close()
+    return results
@@ -0,0 +1,346 @@
+"""SimPoint-style sampled simulation of long workloads.
+
+The mergesort runs execute ~1.2 billion instructions each, and most of them
+repeat the same few phases. Sampling simulates a few representative
+intervals in detail and weights them back into a whole-program estimate:
+
+1. Profile once per binary: ``cache_config.py --simpoint_profile N`` runs
+   the program on an atomic CPU with gem5's SimPoint probe, which writes one
+   basic-block vector (BBV) per N-instruction interval to
+   ``simpoint.bb.gz``.
+2. ``pick_simpoints`` clusters the BBVs as SimPoint 3 does (random
+   projection to 15 dimensions, k-means, the smallest k within 90% of the
+   best BIC) and keeps up to ``per_cluster`` intervals nearest each
+   centroid, saved as ``simpoints.json``.
+3. Each configuration runs ``cache_config.py --simpoints simpoints.json``:
+   an atomic CPU fast-forwards through the caches (functional warm-up)
+   between intervals, the timing CPU runs ``warmup`` instructions and then
+   the interval, and stats are dumped once per interval.
+4. ``write_estimate`` turns the interval dumps into one whole-program
+   stats block, so every downstream reader treats it like a full run.
+
+Clusters are strata: each is weighted by its share of the instructions
+and estimated from the mean of its sampled intervals. Counts are scaled
+per instruction to the program length, rates are recomputed from the
+estimated counts, and a 95% confidence half-width is written for simTicks,
+simSeconds, IPC and every miss rate as ``sampled.ci95.<stat>``. A cluster
+that was sampled exhaustively contributes no variance; one sampled once
+out of several intervals has unknown variance, so with ``per_cluster=1``
+no bounds are reported.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.simpoint pick simpoint.bb.gz --interval 10000000 --output simpoints.json
+    python3 -m sweeplib.simpoint validate "part 2/results/stats" "part 2/results/sampled/stats"
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import numpy as np
+
+from .result_store import built_from, stamp_binary
+from .stats_parser import BEGIN_MARK, END_MARK, parse_stats
+from .validation import compare, print_comparison
+
+PROJECTED_DIMS = 15
+BIC_THRESHOLD = 0.9
+Z_95 = 1.96
+
+# Averaged (then recomputed where possible) rather than scaled with program length
+_INTENSIVE = re.compile(r"Rate|Ratio|avg|Avg|ipc|cpi|Freq|Util|occupanc|[Pp]ercent")
+_CONSTANT = {"simFreq"}
+
+
+# ── Profiling output → clusters ───────────────────────────────────────────
+def read_bbv(path):
+    """(intervals x basic blocks) instruction counts from gem5's ``simpoint.bb.gz``."""
+    opener = gzip.open if path.endswith(".gz") else open
+    rows, columns = [], {}
+    with opener(path, "rt") as f:
+        for line in f:
+            if not line.startswith("T"):
+                continue
+            row = {}
+            # "T:12:3400 :57:120 ..." -> basic block id : instructions executed in it
+            for field in line[1:].split():
+                _, block, count = field.split(":")
+                row[columns.setdefault(int(block), len(columns))] = int(count)
+            rows.append(row)
+    bbv = np.zeros((len(rows), len(columns)))
+    for i, row in enumerate(rows):
+        bbv[i, list(row)] = list(row.values())
+    return bbv
+
+
+def project(bbv, dims=PROJECTED_DIMS, seed=0):
+    """Row-normalised BBVs randomly projected to ``dims`` dimensions."""
+    freq = bbv / np.maximum(bbv.sum(axis=1, keepdims=True), 1)
+    if freq.shape[1] <= dims:
+        return freq
+    rng = np.random.default_rng(seed)
+    return freq @ rng.uniform(-1, 1, size=(freq.shape[1], dims))
+
+
+def kmeans(x, k, seed=0, n_init=5, iters=100):
+    """Lloyd's k-means with k-means++ seeding; best of ``n_init`` as (centers, labels, sse)."""
+    rng = np.random.default_rng(seed)
+    best = None
+    for _ in range(n_init):
+        centers = x[[rng.integers(len(x))]]
+        while len(centers) < k:
+            d2 = ((x[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+            p = d2 / d2.sum() if d2.sum() > 0 else None
+            centers = np.vstack((centers, x[rng.choice(len(x), p=p)]))
+        for _ in range(iters):
+            labels = ((x[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+            moved = np.array([x[labels == c].mean(axis=0) if np.any(labels == c) else centers[c] for c in range(k)])
+            if np.allclose(moved, centers):
+                break
+            centers = moved
+        labels = ((x[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        sse = float(((x - centers[labels]) ** 2).sum())
+        if best is None or sse < best[2]:
+            best = (centers, labels, sse)
+    return best
+
+
+def bic(x, labels, sse, k):
+    """Bayesian information criterion of a spherical-Gaussian clustering (X-means form)."""
+    n, dims = x.shape
+    if n <= k:
+        return -np.inf
+    variance = max(sse / (dims * (n - k)), 1e-12)
+    sizes = np.bincount(labels, minlength=k)
+    sizes = sizes[sizes > 0]
+    log_likelihood = np.sum(sizes * np.log(sizes) - sizes * np.log(n)
+                            - sizes * dims / 2 * np.log(2 * np.pi * variance) - (sizes - k) / 2)
+    params = (k - 1) + dims * k + 1
+    return log_likelihood - params / 2 * np.log(n)
+
+
+def pick_simpoints(bbv, max_k=30, per_cluster=2, dims=PROJECTED_DIMS, seed=0):
+    """Cluster the intervals and pick the ones to simulate.
+
+    Returns ``{"clusters": [...], "points": [...]}``: per cluster its size
+    (intervals) and weight (share of instructions); per picked interval its
+    index, cluster and weight (the cluster's weight split over its picks).
+    """
+    x = project(bbv, dims, seed)
+    fits = {}
+    for k in range(1, min(max_k, len(x)) + 1):
+        centers, labels, sse = kmeans(x, k, seed)
+        fits[k] = (centers, labels, bic(x, labels, sse, k))
+    scores = np.array([fit[2] for fit in fits.values()])
+    finite = scores[np.isfinite(scores)]
+    cutoff = finite.min() + BIC_THRESHOLD * (finite.max() - finite.min()) if len(finite) else -np.inf
+    k = min(k for k, fit in fits.items() if fit[2] >= cutoff)
+    centers, labels, _ = fits[k]
+
+    insts = bbv.sum(axis=1)
+    clusters, points = [], []
+    for c in range(k):
+        members = np.flatnonzero(labels == c)
+        if len(members) == 0:
+            continue
+        weight = float(insts[members].sum() / insts.sum())
+        nearest = members[np.argsort(((x[members] - centers[c]) ** 2).sum(axis=1), kind="stable")][:per_cluster]
+        clusters.append({"cluster": c, "size": int(len(members)), "weight": weight})
+        points += [{"index": int(i), "cluster": c, "weight": weight / len(nearest)} for i in nearest]
+    points.sort(key=lambda p: p["index"])
+    return {"clusters": clusters, "points": points}
+
+
+def write_simpoints(path, picked, interval, warmup, total_insts, settings=None):
+    spec = {"interval": interval, "warmup": warmup, "total_insts": int(total_insts), **picked}
+    if settings:
+        spec["settings"] = settings
+    with open(path, "w") as f:
+        json.dump(spec, f, indent=2)
+    return path
+
+
+def load_simpoints(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _is_current(path, binary):
+    return os.path.exists(path) and built_from(os.path.dirname(path), binary)
+
+
+def ensure_simpoints(gem5_bin, cache_conf, binary, root, interval, warmup=0, max_k=30, per_cluster=2,
+                     cwd=None, force=False):
+    """Path of ``binary``'s simpoints.json, profiling and clustering it if needed.
+
+    Like checkpoints, the profile does not depend on the cache geometry, so
+    it is taken once per binary and interval length and reused while the
+    binary is the same build; re-picking with other settings reuses it too.
+    """
+    run_dir = os.path.join(root, os.path.basename(binary), f"interval_{interval}")
+    spec_file = os.path.join(run_dir, "simpoints.json")
+    bbv_file = os.path.join(run_dir, "simpoint.bb.gz")
+    settings = {"warmup": warmup, "max_k": max_k, "per_cluster": per_cluster}
+    if not force and _is_current(spec_file, binary) and load_simpoints(spec_file).get("settings") == settings:
+        return spec_file
+
+    if force or not _is_current(bbv_file, binary):
+        os.makedirs(run_dir, exist_ok=True)
+        if os.path.exists(bbv_file):
+            os.remove(bbv_file)
+        cmd = [gem5_bin, "-d", run_dir, cache_conf, f"--binary={binary}", f"--simpoint_profile={interval}"]
+        print(f"-> Profiling basic blocks of {os.path.basename(binary)} ({interval:,}-instruction intervals)...")
+        with open(os.path.join(run_dir, "sim_out.txt"), "w") as out, \
+             open(os.path.join(run_dir, "sim_err.txt"), "w") as err:
+            subprocess.run(cmd, stdout=out, stderr=err, cwd=cwd)
+        if not os.path.exists(bbv_file):
+            raise RuntimeError(f"No basic-block profile for {binary}; see {run_dir}/sim_err.txt")
+        stamp_binary(run_dir, binary)
+
+    bbv = read_bbv(bbv_file)
+    picked = pick_simpoints(bbv, max_k=max_k, per_cluster=per_cluster)
+    write_simpoints(spec_file, picked, interval, warmup, bbv.sum(), settings)
+    print(f"   {os.path.basename(binary)}: {len(picked['points'])} of {len(bbv)} intervals picked "
+          f"from {len(picked['clusters'])} clusters")
+    return spec_file
+
+
+# ── Interval dumps → whole-program estimate ───────────────────────────────
+def _stratified_var(values, spec):
+    """Variance of the weighted estimate of a per-point quantity (None if a stratum's is unknown)."""
+    sizes = {c["cluster"]: (c["size"], c["weight"]) for c in spec["clusters"]}
+    clusters = np.array([p["cluster"] for p in spec["points"]])
+    var = 0.0
+    for c, (size, weight) in sizes.items():
+        v = values[clusters == c]
+        if len(v) >= size:
+            continue  # every interval of the cluster was simulated
+        if len(v) < 2:
+            return None
+        var += weight ** 2 * (1 - len(v) / size) * v.var(ddof=1) / len(v)
+    return var
+
+
+def estimate(blocks, spec):
+    """Whole-program stats (plus ``sampled.*`` entries) from one dump block per picked interval."""
+    points = spec["points"]
+    if len(blocks) < len(points):
+        raise ValueError(f"{len(blocks)} stats blocks for {len(points)} sampled intervals; the run ended early")
+    blocks = blocks[:len(points)]
+    weights = np.array([p["weight"] for p in points])
+    weights = weights / weights.sum()
+    insts = np.array([float(b.get("simInsts") or 0) for b in blocks])
+    if np.any(insts <= 0):
+        raise ValueError("An interval committed no instructions")
+    total = float(spec["total_insts"])
+
+    names = [n for n in blocks[0] if all(n in b for b in blocks)]
+    values = {n: np.array([float(b[n]) for b in blocks]) for n in names}
+    per_inst = {n: (weights * values[n] / insts).sum() for n in names}
+
+    result = {}
+    for name in names:
+        v = values[name]
+        if name in _CONSTANT:
+            result[name] = blocks[0][name]
+        elif name == "simInsts":
+            result[name] = int(total)
+        elif name == "hostSeconds":
+            result[name] = float(v.sum())  # detailed intervals only
+        elif re.search(r"\.ipc(::|$)", name):
+            result[name] = 1.0 / float((weights / v).sum()) if np.all(v > 0) else float((weights * v).sum())
+        elif _INTENSIVE.search(name):
+            result[name] = float((weights * v).sum())
+        else:
+            scaled = per_inst[name] * total
+            result[name] = int(round(scaled)) if isinstance(blocks[0][name], int) else float(scaled)
+
+    intervals = {}
+    # Rates from the estimated counts rather than averaged per interval
+    for name in names:
+        match = re.match(r"(.*)MissRate(::.*)?$", name)
+        if not match:
+            continue
+        misses = f"{match.group(1)}Misses{match.group(2) or ''}"
+        accesses = f"{match.group(1)}Accesses{match.group(2) or ''}"
+        if misses in values and accesses in values and per_inst[accesses] > 0:
+            rate = per_inst[misses] / per_inst[accesses]
+            result[name] = rate
+            residual = (values[misses] - rate * values[accesses]) / insts / per_inst[accesses]
+            intervals[name] = _stratified_var(residual, spec)
+
+    for name in ("simTicks", "simSeconds"):
+        if name in values:
+            var = _stratified_var(values[name] / insts, spec)
+            intervals[name] = None if var is None else var * total ** 2
+    for name in names:
+        v = values[name]
+        if re.search(r"\.ipc(::|$)", name) and np.all(v > 0):
+            # IPC = 1 / CPI: delta method on the estimated CPI
+            var = _stratified_var(1.0 / v, spec)
+            intervals[name] = None if var is None else var * result[name] ** 4
+
+    for name, var in intervals.items():
+        if var is not None:
+            result[f"sampled.ci95.{name}"] = Z_95 * float(np.sqrt(var))
+    result["sampled.intervals"] = len(points)
+    result["sampled.clusters"] = len(spec["clusters"])
+    result["sampled.detailedFraction"] = float(insts.sum() / total)
+    return result
+
+
+def write_estimate(stats_file, spec_path):
+    """Replace a sampled run's interval dumps by its whole-program estimate.
+
+    gem5's output is kept as ``stats_intervals.txt`` next to ``stats.txt``.
+    """
+    spec = load_simpoints(spec_path)
+    blocks = parse_stats(stats_file)
+    result = estimate(blocks, spec)
+    run_dir = os.path.dirname(stats_file)
+    shutil.move(stats_file, os.path.join(run_dir, "stats_intervals.txt"))
+    tmp = stats_file + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(f"\n{BEGIN_MARK} ----------\n")
+        for name, value in result.items():
+            text = f"{value:.6f}" if isinstance(value, float) else str(value)
+            f.write(f"{name:<60} {text:>20}  # sampled estimate ({len(spec['points'])} intervals)\n")
+        f.write(f"\n{END_MARK}   ----------\n")
+    os.replace(tmp, stats_file)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SimPoint interval picking and validation of sampled runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pick = sub.add_parser("pick", help="Cluster a basic-block profile into simpoints.json")
+    pick.add_argument("bbv", help="simpoint.bb.gz written by cache_config.py --simpoint_profile")
+    pick.add_argument("--interval", type=int, required=True, help="Interval length used for the profile")
+    pick.add_argument("--warmup", type=int, default=0, help="Detailed warm-up instructions before each interval")
+    pick.add_argument("--max_k", type=int, default=30)
+    pick.add_argument("--per_cluster", type=int, default=2, help="Intervals simulated per cluster (2+ for error bounds)")
+    pick.add_argument("--output", default="simpoints.json")
+    validate = sub.add_parser("validate", help="Compare sampled against full results")
+    validate.add_argument("full_dir", help="Directory of full runs (e.g. part 2/results/stats)")
+    validate.add_argument("sampled_dir", help="Directory of sampled runs (e.g. part 2/results/sampled/stats)")
+    validate.add_argument("--output", default=None, help="Also write the comparison to this CSV")
+    args = parser.parse_args()
+
+    if args.command == "pick":
+        bbv = read_bbv(args.bbv)
+        picked = pick_simpoints(bbv, max_k=args.max_k, per_cluster=args.per_cluster)
+        write_simpoints(args.output, picked, args.interval, args.warmup, bbv.sum())
+        print(f"{len(picked['points'])} of {len(bbv)} intervals from {len(picked['clusters'])} clusters "
+              f"saved to {args.output}")
+    else:
+        df = compare(args.full_dir, args.sampled_dir)
+        print_comparison(df)
+        if args.output:
+            df.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
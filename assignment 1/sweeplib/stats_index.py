@@ -0,0 +1,82 @@
+"""Persistent parse cache so extraction only re-reads new or changed runs.
+
+The extractors used to parse every ``stats.txt`` on every invocation, which
+in a watch loop during a long sweep means re-reading hundreds of finished
+runs per tick to pick up two new ones. ``StatsIndex`` remembers, per stats
+file, its size, mtime and SHA-256 next to the parsed final dump block:
+
+* size and mtime unchanged: the cached block is used without opening the file;
+* size or mtime changed but the content hash matches (a result copied back
+  from the store, a ``touch``): the cached block is reused and re-stamped;
+* otherwise the file is parsed again.
+
+Entries for files that were not looked up in a refresh are dropped on save,
+so deleted run directories do not linger.
+"""
+import hashlib
+import json
+import os
+
+from .stats_parser import parse_final
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class StatsIndex:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.seen = set()
+        self.parsed = 0
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                # A corrupt index only costs one full rescan
+                self.entries = {}
+
+    def get(self, stats_file):
+        """Final dump block of ``stats_file`` (None if missing or empty)."""
+        key = os.path.abspath(stats_file)
+        self.seen.add(key)
+        if not os.path.exists(key):
+            return None
+        st = os.stat(key)
+        entry = self.entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+            return entry["stats"]
+
+        digest = _sha256(key)
+        if entry and entry["sha"] == digest:
+            entry["size"], entry["mtime"] = st.st_size, st.st_mtime_ns
+        else:
+            entry = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha": digest,
+                     "stats": parse_final(key)}
+            self.entries[key] = entry
+            self.parsed += 1
+        self.dirty = True
+        return entry["stats"]
+
+    def save(self):
+        """Write the index (atomically); True if any parsed result changed."""
+        stale = set(self.entries) - self.seen
+        for key in stale:
+            del self.entries[key]
+        changed = self.parsed > 0 or bool(stale)
+        if changed or self.dirty:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        self.seen = set()
+        self.parsed = 0
+        self.dirty = False
+        return changed
@@ -0,0 +1,154 @@
+"""Single-pass parser for gem5 ``stats.txt`` and a columnar results store.
+
+Every extractor used to read the whole file into a string and run one
+``re.search`` per metric, each with its own regex. ``parse_stats`` instead
+walks the file once, line by line, and returns every statistic of every
+dump block as a typed dict. ``lookup`` resolves the handful of metrics the
+scripts report, accepting both cache naming schemes
+(``system.cpu.dcache``/``system.l1d``, ``system.l2cache``/``system.l2``).
+
+Parsed runs are saved as one table (one row per sweep point, one column per
+statistic) so analysis code can load just the columns it needs.
+"""
+import os
+import sys
+
+import pandas as pd
+
+BEGIN_MARK = "---------- Begin Simulation Statistics"
+END_MARK = "---------- End Simulation Statistics"
+
+ALIASES = {
+    'simSeconds': ['simSeconds'],
+    'simTicks': ['simTicks'],
+    'simInsts': ['simInsts'],
+    'hostSeconds': ['hostSeconds'],
+    # --roi runs measure on the switched-in timing CPU
+    'IPC': ['system.switch_cpu.ipc', 'system.cpu.ipc'],
+    'L1_MissRate': ['system.cpu.dcache.overallMissRate::total', 'system.l1d.overallMissRate::total'],
+    'L2_MissRate': ['system.l2cache.overallMissRate::total', 'system.l2.overallMissRate::total'],
+    'L1_Hits': ['system.cpu.dcache.overallHits::total', 'system.l1d.overallHits::total'],
+    'L1_Misses': ['system.cpu.dcache.overallMisses::total', 'system.l1d.overallMisses::total'],
+    'L1_Accesses': ['system.cpu.dcache.overallAccesses::total', 'system.l1d.overallAccesses::total'],
+    'L1_WriteReqs': ['system.cpu.dcache.WriteReq.accesses::total', 'system.l1d.WriteReq.accesses::total'],
+    'L1_Writebacks': ['system.cpu.dcache.writebacks::total', 'system.l1d.writebacks::total'],
+    'L1I_Accesses': ['system.cpu.icache.overallAccesses::total', 'system.l1i.overallAccesses::total'],
+    'L1I_Misses': ['system.cpu.icache.overallMisses::total', 'system.l1i.overallMisses::total'],
+    'L2_Accesses': ['system.l2cache.overallAccesses::total', 'system.l2.overallAccesses::total'],
+    'L2_Misses': ['system.l2cache.overallMisses::total', 'system.l2.overallMisses::total'],
+    'L2_WritebacksIn': ['system.l2cache.WritebackDirty.accesses::total', 'system.l2.WritebackDirty.accesses::total'],
+    'L2_Writebacks': ['system.l2cache.writebacks::total', 'system.l2.writebacks::total'],
+    'Cycles': ['system.switch_cpu.numCycles', 'system.cpu.numCycles'],
+    'MemBytesRead': ['system.mem_ctrl.dram.bytesRead::total', 'system.mem_ctrl.bytesReadSys'],
+    'MemBytesWritten': ['system.mem_ctrl.dram.bytesWritten::total', 'system.mem_ctrl.bytesWrittenSys'],
+}
+
+
+def _to_number(token):
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def iter_blocks(lines, names=None):
+    """Yield one ``{stat name: value}`` dict per dump block (only ``names``, if given)."""
+    block = None
+    for line in lines:
+        if line.startswith(BEGIN_MARK):
+            block = {}
+            continue
+        if line.startswith(END_MARK):
+            if block is not None:
+                yield block
+            block = None
+            continue
+        if block is None:
+            continue
+        fields = line.split(None, 2)
+        if len(fields) < 2 or (names is not None and fields[0] not in names):
+            continue
+        value = _to_number(fields[1])
+        if value is not None:
+            block[fields[0]] = value
+    # A run killed mid-dump still has a usable (partial) last block
+    if block:
+        yield block
+
+
+def parse_stats(stats_file, names=None):
+    """All dump blocks of ``stats_file`` in order (empty list if missing)."""
+    if not os.path.exists(stats_file):
+        return []
+    with open(stats_file, "r") as f:
+        return list(iter_blocks(f, names))
+
+
+def parse_final(stats_file):
+    """The last dump block of ``stats_file``, or None."""
+    blocks = parse_stats(stats_file)
+    return blocks[-1] if blocks else None
+
+
+def lookup(stats, metric, default=None):
+    """Value of a reported metric (see ``ALIASES``) or of a raw stat name."""
+    for name in ALIASES.get(metric, [metric]):
+        if name in stats:
+            return stats[name]
+    return default
+
+
+def format_stat(value):
+    """Text form for CSV output, with the 6 decimals gem5 prints for floats."""
+    return f"{value:.6f}" if isinstance(value, float) else str(value)
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def store_path(path):
+    """Parquet when pyarrow is installed, otherwise CSV (still columnar for ``load_table``)."""
+    base, _ = os.path.splitext(path)
+    return base + (".parquet" if _parquet_available() else ".csv")
+
+
+def save_table(df, path):
+    """Write a results table; returns the path written, which says which format was used."""
+    path = store_path(path)
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        print(f"pyarrow is not installed: writing {os.path.basename(path)} instead of Parquet", file=sys.stderr)
+        df.to_csv(path, index=False)
+    return path
+
+
+def load_table(path, columns=None):
+    """Load a results table, reading only ``columns`` (those that exist)."""
+    base, _ = os.path.splitext(path)
+    if os.path.exists(base + ".parquet") and _parquet_available():
+        if columns is not None:
+            import pyarrow.parquet as pq
+            available = set(pq.read_schema(base + ".parquet").names)
+            columns = [c for c in columns if c in available]
+        return pd.read_parquet(base + ".parquet", columns=columns)
+    if columns is None:
+        return pd.read_csv(base + ".csv")
+    available = set(pd.read_csv(base + ".csv", nrows=0).columns)
+    columns = [c for c in columns if c in available]
+    return pd.read_csv(base + ".csv", usecols=columns)[columns]
+
+
+def build_table(runs):
+    """DataFrame from ``(config dict, stats dict)`` pairs, config columns first."""
+    records = [{**config, **stats} for config, stats in runs]
+    return pd.DataFrame.from_records(records)
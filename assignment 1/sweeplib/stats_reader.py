@@ -0,0 +1,145 @@
+"""Load a run's stats as arrays, from ``stats.h5`` or a (filtered) ``stats.txt``.
+
+``cache_config.py --stats_profile`` shrinks what gem5 writes per run:
+``compact`` drops the descriptions and column alignment, ``whitelist``
+keeps only the root stats plus the groups the sweep extractors read
+(``--stats_groups``), and ``hdf5`` writes every stat to ``stats.h5`` next to
+a whitelisted ``stats.txt``. With periodic dumps the savings multiply by the
+number of intervals. gem5 fixes the format of ``stats.txt`` from its own
+``--stats-file`` option, before the config script runs, so drivers put
+``gem5_stats_options(profile)`` between the gem5 binary and the script.
+
+``load_stats(run_dir, names)`` returns the dump blocks of a run like
+``stats_parser.parse_stats``, parsing only the requested statistics: from
+``stats.h5`` when there is one and h5py is installed (each statistic is one
+dataset, one row per dump), otherwise from ``stats.txt``. ``load_arrays``
+turns that into ``{name: array over dumps}``. Names may be raw stat names
+or the sweep metrics of ``stats_parser.ALIASES``.
+
+gem5's HDF5 output stores vectors without their ``::total`` entry; it is
+rebuilt here as the sum of the elements, except for miss rates (misses over
+accesses) and other ratios, which have no meaningful sum and are left out.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.stats_reader "part 2/results/stats/Chunked_L1_64kB_L2_512kB_A1_8_A2_16" L1_MissRate IPC
+"""
+import argparse
+import os
+import re
+
+import numpy as np
+
+from .stats_parser import ALIASES, lookup, parse_stats
+
+COMPACT_STATS_FILE = "text://stats.txt?desc=False&spaces=False"
+
+HDF5_FILE = "stats.h5"
+# Vector stats whose elements do not add up to a total
+_RATIO = re.compile(r"(Rate|Latency|Ratio|ipc|cpi|avg\w*|Bandwidth|[Pp]erSec)$")
+
+
+def _h5py():
+    try:
+        import h5py
+        return h5py
+    except ImportError:
+        return None
+
+
+def _raw_names(names):
+    """Raw stat names behind ``names`` (sweep metrics expand to every alias)."""
+    return {raw for name in names for raw in ALIASES.get(name, [name])}
+
+
+def _int_or_float(name, value):
+    value = float(value)
+    if value.is_integer() and not _RATIO.search(name.split("::")[0]):
+        return int(value)
+    return value
+
+
+def _read_dataset(dataset, name):
+    """``{stat name: column over dumps}`` of one HDF5 dataset, text-style names."""
+    data = dataset[()]
+    if data.ndim == 1:
+        return {name: data}
+    subnames = [s.decode() if isinstance(s, bytes) else str(s) for s in dataset.attrs.get("subnames", [])]
+    if data.shape[1] == 1 and not subnames:
+        return {name: data[:, 0]}
+    columns = {f"{name}::{subnames[i] if i < len(subnames) and subnames[i] else i}": data[:, i]
+               for i in range(data.shape[1])}
+    if not _RATIO.search(name):
+        columns[f"{name}::total"] = data.sum(axis=1)
+    return columns
+
+
+def _dataset_path(name):
+    return "/" + name.split("::")[0].replace(".", "/")
+
+
+def _load_hdf5(path, names):
+    h5py = _h5py()
+    raw = _raw_names(names)
+    columns = {}
+    with h5py.File(path, "r") as f:
+        def read(name):
+            base = name.split("::")[0]
+            if base not in columns and _dataset_path(name) in f:
+                columns[base] = _read_dataset(f[_dataset_path(name)], base)
+            return columns.get(base, {})
+
+        values = {}
+        for name in raw:
+            match = re.match(r"(.*)MissRate::total$", name)
+            if match:
+                misses = read(f"{match.group(1)}Misses").get(f"{match.group(1)}Misses::total")
+                accesses = read(f"{match.group(1)}Accesses").get(f"{match.group(1)}Accesses::total")
+                if misses is not None and accesses is not None:
+                    values[name] = misses / np.where(accesses > 0, accesses, np.nan)
+                continue
+            column = read(name).get(name)
+            if column is not None:
+                values[name] = column
+    dumps = max((len(v) for v in values.values()), default=0)
+    return [{name: _int_or_float(name, column[i]) for name, column in values.items()
+             if i < len(column) and not np.isnan(column[i])} for i in range(dumps)]
+
+
+def gem5_stats_options(profile):
+    """gem5 options (before the config script) for a ``cache_config.py --stats_profile``."""
+    return [] if profile == "full" else [f"--stats-file={COMPACT_STATS_FILE}"]
+
+def load_stats(run_dir, names=None):
+    """Dump blocks of a run, restricted to ``names`` (raw stats or sweep metrics) if given.
+
+    Reads ``stats.h5`` when present and h5py is installed, otherwise
+    ``stats.txt``. ``names`` is required for HDF5, which has no cheap way
+    to list every statistic in text form.
+    """
+    h5_path = os.path.join(run_dir, HDF5_FILE)
+    if names is not None and os.path.exists(h5_path) and _h5py():
+        return _load_hdf5(h5_path, names)
+    return parse_stats(os.path.join(run_dir, "stats.txt"), None if names is None else _raw_names(names))
+
+
+def load_arrays(run_dir, names):
+    """``{name: float array with one value per dump}``; NaN where a dump lacks the stat."""
+    blocks = load_stats(run_dir, names)
+    return {name: np.array([lookup(block, name, np.nan) for block in blocks], dtype=float) for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print stats of a run (stats.h5 or stats.txt), one value per dump")
+    parser.add_argument("run_dir", help="gem5 output directory")
+    parser.add_argument("names", nargs="+", help="Stat names or sweep metrics (e.g. L1_MissRate, IPC)")
+    args = parser.parse_args()
+
+    source = HDF5_FILE if os.path.exists(os.path.join(args.run_dir, HDF5_FILE)) and _h5py() else "stats.txt"
+    arrays = load_arrays(args.run_dir, args.names)
+    print(f"{args.run_dir} ({source}, {max((len(v) for v in arrays.values()), default=0)} dumps)")
+    for name, values in arrays.items():
+        print(f"  {name}: " + " ".join(f"{v:g}" for v in values))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Declarative sweep specs: benchmarks x sizes x cache axes as one job set.
+
+``full_sweep.py`` runs one matrix size per invocation and ``run_sweep.py``
+only mergesort, so a study over several workloads ran as separate,
+underfilled passes. A spec names everything at once:
+
+    {
+      "name": "cache_study",
+      "benchmarks": [
+        {"type": "MatMul", "sizes": [64, 128, 256]},
+        {"type": "Simple"},
+        {"type": "Chunked", "axes": {"l1_size": ["32kB", "64kB"]}}
+      ],
+      "axes": {"l1_size": ["16kB", "32kB", "64kB"], "l2_size": ["256kB", "512kB"],
+               "l1_assoc": [2, 4, 8], "l2_assoc": [8, 16]},
+      "options": {"stats_profile": "whitelist"}
+    }
+
+``axes`` apply to every benchmark unless it overrides some of them.
+``options`` (see ``OPTIONS``) apply to every job. ``expand`` turns a spec
+into one point per benchmark, size and cache configuration. ``key_params``
+keys a point exactly as ``full_sweep.py`` (MatMul) or ``run_sweep.py``
+(mergesort) would, so the study and the per-part drivers share results
+through the result store. ``scripts/run_study.py`` runs the points in a
+single pool.
+"""
+import itertools
+import json
+
+from .build import MATRIX_SIZES, matrix_multiply_name
+
+BENCHMARKS = ("MatMul", "Simple", "Chunked")
+AXES = ("l1_size", "l2_size", "l1_assoc", "l2_assoc")
+STATS_PROFILES = ("full", "compact", "whitelist", "hdf5")
+OPTIONS = {
+    "checkpoint": False,          # restore a post-initialization checkpoint per binary
+    "roi": False,                 # stats cover ROI_BEGIN()..ROI_END() only
+    "max_insts": None,            # budget-limited exploration runs
+    "dump_period": None,          # periodic stat dumps every N instructions
+    "stats_profile": "full",      # cache_config.py --stats_profile
+    "cacti_latency_table": None,  # CACTI-derived cache latencies...
+    "tech_node": None,            # ...at this node (nm)
+}
+
+
+def load_spec(path):
+    """Read and check a spec file; returns it with defaults filled in. ValueError on a bad spec."""
+    with open(path) as f:
+        spec = json.load(f)
+    unknown = set(spec) - {"name", "benchmarks", "axes", "options"}
+    if unknown:
+        raise ValueError(f"Unknown spec entries: {', '.join(sorted(unknown))}")
+    if not spec.get("name") or not spec.get("benchmarks"):
+        raise ValueError("A spec needs a name and at least one benchmark")
+
+    options = dict(OPTIONS)
+    for key, value in spec.get("options", {}).items():
+        if key not in OPTIONS:
+            raise ValueError(f"Unknown option {key!r}; expected one of {', '.join(OPTIONS)}")
+        options[key] = value
+    if options["stats_profile"] not in STATS_PROFILES:
+        raise ValueError(f"stats_profile must be one of {', '.join(STATS_PROFILES)}")
+    if options["cacti_latency_table"] and options["tech_node"] is None:
+        raise ValueError("cacti_latency_table needs tech_node")
+
+    benchmarks = []
+    for bench in spec["benchmarks"]:
+        if bench.get("type") not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark type {bench.get('type')!r}; expected one of {', '.join(BENCHMARKS)}")
+        axes = {**spec.get("axes", {}), **bench.get("axes", {})}
+        missing = [axis for axis in AXES if not axes.get(axis)]
+        if missing or set(axes) - set(AXES):
+            raise ValueError(f"{bench['type']}: axes must be exactly {', '.join(AXES)} "
+                             f"(missing: {', '.join(missing) or 'none'})")
+        sizes = bench.get("sizes", [128] if bench["type"] == "MatMul" else [None])
+        if bench["type"] == "MatMul" and not set(sizes) <= set(MATRIX_SIZES):
+            raise ValueError(f"MatMul sizes must be among {MATRIX_SIZES}")
+        if bench["type"] != "MatMul" and sizes != [None]:
+            raise ValueError(f"{bench['type']} has no sizes")
+        benchmarks.append({"type": bench["type"], "sizes": sizes,
+                           "axes": {axis: [str(v) for v in axes[axis]] for axis in AXES}})
+    return {"name": spec["name"], "benchmarks": benchmarks, "options": options}
+
+
+def expand(spec):
+    """One point per benchmark, size and cache configuration of a loaded spec."""
+    points = []
+    for bench in spec["benchmarks"]:
+        for size in bench["sizes"]:
+            for values in itertools.product(*(bench["axes"][axis] for axis in AXES)):
+                points.append({"type": bench["type"], "size": size, **dict(zip(AXES, values))})
+    return points
+
+
+def workload(point):
+    """Cost-model workload of a point: ``MatMul_<size>`` or the mergesort variant."""
+    return f"MatMul_{point['size']}" if point["type"] == "MatMul" else point["type"]
+
+
+def config_id(point):
+    return f"L1_{point['l1_size']}_L2_{point['l2_size']}_A1_{point['l1_assoc']}_A2_{point['l2_assoc']}"
+
+
+def binary_name(point):
+    """``sweeplib.build`` variant a point runs."""
+    if point["type"] == "MatMul":
+        return matrix_multiply_name(point["size"])
+    return "mergesort_s" if point["type"] == "Simple" else "mergesort_c"
+
+
+def features(point):
+    return {"workload": workload(point), "l1_size": point["l1_size"], "l2_size": point["l2_size"],
+            "l1_assoc": point["l1_assoc"], "l2_assoc": point["l2_assoc"]}
+
+
+def key_params(point, options):
+    """Result store parameters of a point, as ``full_sweep.config_key``/``run_sweep.job_key`` build them."""
+    params = [point["l1_size"], point["l2_size"], point["l1_assoc"], point["l2_assoc"]]
+    if point["type"] != "MatMul":
+        params.append(point["type"])
+    params.append(bool(options["checkpoint"]))
+    if options["max_insts"]:
+        params.append(options["max_insts"])
+    if options["cacti_latency_table"]:
+        params.append(f"cacti_{options['tech_node']}nm")
+    if options["roi"]:
+        params.append("roi")
+    if options["dump_period"]:
+        params.append(f"dump_{options['dump_period']}")
+    if options["stats_profile"] != "full":
+        params.append(f"stats_{options['stats_profile']}")
+    return params
@@ -0,0 +1,335 @@
+"""Gaussian-process surrogate for cache configurations that were not simulated.
+
+Fits one GP per target (``simTicks`` on a log scale, both miss rates, IPC)
+on every finished point of the part 1 and part 2 sweeps, predicts unseen
+configurations with a standard deviation, and proposes the next batch of
+gem5 runs with the largest joint information gain.
+
+Features are log2 of L1/L2 size and associativity, log2 of the matrix size
+(0 for mergesort) and a one-hot workload type, standardised. The kernel is a
+squared exponential with one length scale per feature, tuned per target by
+log marginal likelihood; with a few hundred points a fit takes seconds.
+Only numpy is needed. A target is only predicted for workload types that
+have observations of it (IPC, for one, is only recorded by the part 2
+sweeps); elsewhere the prediction is NaN rather than an extrapolation
+across the one-hot type feature.
+
+Batch selection is greedy: the candidate with the highest summed
+``0.5 * log(1 + var / noise)`` over the targets it has predictions for is picked, every target's
+posterior is conditioned on it (the variance does not depend on the
+unknown result), and the next pick uses the reduced variances. This keeps
+a batch from clustering in one unexplored corner. Candidates come from the
+drivers' own grids (``tracesim.GRIDS``, both by default, or ``--axes``), so
+every suggestion lies inside the range that was simulated, and
+configurations with an L1 at least as large as the L2 are left out.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.surrogate --suggest 24 --output suggestions.csv
+    python3 scripts/run_sweep.py --config_list ../suggestions.csv      # from part 2/
+    python3 scripts/full_sweep.py --size 256 --config_list ../suggestions.csv  # from part 1/
+"""
+import argparse
+import csv
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from .tracesim import GRIDS, size_to_bytes
+
+ASSIGNMENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# (csv path, Type, MatrixSize) of every finished sweep
+SOURCES = [
+    (os.path.join(ASSIGNMENT_DIR, "part 1/results/full_sweep_64/enhanced_results_64.csv"), "MatMul", 64),
+    (os.path.join(ASSIGNMENT_DIR, "part 1/results/full_sweep/enhanced_results.csv"), "MatMul", 128),
+    (os.path.join(ASSIGNMENT_DIR, "part 1/results/full_sweep_256/enhanced_results_256.csv"), "MatMul", 256),
+    (os.path.join(ASSIGNMENT_DIR, "part 2/results/results.csv"), None, None),
+]
+
+TYPES = ["MatMul", "Simple", "Chunked"]
+TARGETS = ["simTicks", "L1_MissRate", "L2_MissRate", "IPC"]
+LOG_TARGETS = {"simTicks"}
+
+
+
+def candidate_axes(grids=tuple(GRIDS)):
+    """Union of the named driver grids (``tracesim.GRIDS``) as candidate axes."""
+    axes = {}
+    for column, key in (('L1_Size', 'l1_sizes'), ('L2_Size', 'l2_sizes'),
+                        ('L1_Assoc', 'l1_assocs'), ('L2_Assoc', 'l2_assocs')):
+        values = {value for grid in grids for value in GRIDS[grid][key]}
+        axes[column] = sorted(values, key=size_to_bytes if column.endswith('Size') else int)
+    return axes
+
+
+# Candidate axes for suggestions: the union of both assignments' grids
+CANDIDATE_AXES = candidate_axes()
+WORKLOADS = [("MatMul", 64), ("MatMul", 128), ("MatMul", 256), ("Simple", None), ("Chunked", None)]
+
+CONFIG_COLUMNS = ["Type", "MatrixSize", "L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc"]
+
+
+def _kb(size):
+    return float(str(size).lower().replace("kb", ""))
+
+
+def load_observations(sources=SOURCES):
+    """All finished sweep points as one DataFrame (NaN where a metric was not recorded)."""
+    frames = []
+    for path, run_type, matrix_size in sources:
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path)
+        if run_type is None:
+            # results.csv: Cycles is simTicks, Type is the algorithm
+            df = df.rename(columns={"Cycles": "simTicks"})
+            df["MatrixSize"] = np.nan
+        else:
+            df["Type"] = run_type
+            df["MatrixSize"] = matrix_size
+        for target in TARGETS:
+            if target not in df.columns:
+                df[target] = np.nan
+        frames.append(df[CONFIG_COLUMNS + TARGETS])
+    if not frames:
+        return pd.DataFrame(columns=CONFIG_COLUMNS + TARGETS)
+    data = pd.concat(frames, ignore_index=True)
+    for target in TARGETS:
+        data[target] = pd.to_numeric(data[target], errors="coerce")
+    return data
+
+
+def encode(df):
+    """Feature matrix for a DataFrame with ``CONFIG_COLUMNS``."""
+    matrix = pd.to_numeric(df["MatrixSize"], errors="coerce").fillna(1).astype(float)
+    columns = [
+        np.log2(df["L1_Size"].map(_kb).astype(float)),
+        np.log2(df["L2_Size"].map(_kb).astype(float)),
+        np.log2(df["L1_Assoc"].astype(float)),
+        np.log2(df["L2_Assoc"].astype(float)),
+        np.log2(matrix),
+    ]
+    columns += [(df["Type"] == t).astype(float) for t in TYPES]
+    return np.column_stack(columns)
+
+
+def _sq_dists(a, b):
+    return np.maximum((a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2 * a @ b.T, 0.0)
+
+
+class GaussianProcess:
+    """Zero-mean GP with an ARD RBF kernel on standardised inputs and targets.
+
+    One length scale per feature lets the model ignore axes a target does not
+    depend on (L2 associativity for the L1 miss rate, say); they and the noise
+    level are tuned by coordinate search on the log marginal likelihood.
+    """
+
+    LENGTH_SCALES = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+    NOISES = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1)
+    PASSES = 2
+
+    def _evidence(self, sq_diffs, z, length, noise):
+        K = np.exp(-0.5 * (sq_diffs / length ** 2).sum(-1)) + noise * np.eye(len(z))
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return -np.inf, None, None
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, z))
+        return -0.5 * z @ alpha - np.log(np.diag(L)).sum(), L, alpha
+
+    def fit(self, X, y):
+        self.x_mean, self.x_std = X.mean(0), X.std(0)
+        self.x_std[self.x_std == 0] = 1.0
+        self.y_mean, self.y_std = y.mean(), y.std() or 1.0
+        self.X = (X - self.x_mean) / self.x_std
+        z = (y - self.y_mean) / self.y_std
+        sq_diffs = (self.X[:, None, :] - self.X[None, :, :]) ** 2
+
+        length, noise = np.full(X.shape[1], 1.0), 1e-2
+        best = self._evidence(sq_diffs, z, length, noise)[0]
+        for _ in range(self.PASSES):
+            for dim in range(X.shape[1] + 1):
+                for value in (self.LENGTH_SCALES if dim < X.shape[1] else self.NOISES):
+                    trial_length, trial_noise = length.copy(), noise
+                    if dim < X.shape[1]:
+                        trial_length[dim] = value
+                    else:
+                        trial_noise = value
+                    evidence = self._evidence(sq_diffs, z, trial_length, trial_noise)[0]
+                    if evidence > best:
+                        best, length, noise = evidence, trial_length, trial_noise
+        self.length, self.noise = length, noise
+        _, self.L, self.alpha = self._evidence(sq_diffs, z, length, noise)
+        return self
+
+    def _kernel(self, A, B):
+        return np.exp(-0.5 * _sq_dists(A / self.length, B / self.length))
+
+    def _scale(self, X):
+        return (X - self.x_mean) / self.x_std
+
+    def predict(self, X):
+        """Posterior mean and standard deviation in target units."""
+        Ks = self._kernel(self._scale(X), self.X)
+        mean = Ks @ self.alpha
+        v = np.linalg.solve(self.L, Ks.T)
+        var = np.maximum(1.0 - (v * v).sum(0), 1e-12)
+        return mean * self.y_std + self.y_mean, np.sqrt(var) * self.y_std
+
+    def loo_rmse(self):
+        """Leave-one-out RMSE in target units (closed form, no refits)."""
+        K_inv = np.linalg.solve(self.L.T, np.linalg.solve(self.L, np.eye(len(self.alpha))))
+        residuals = self.alpha / np.diag(K_inv)
+        return float(np.sqrt(np.mean(residuals ** 2)) * self.y_std)
+
+    def projections(self, X):
+        """Scaled inputs and ``L^-1 k(train, X)``, reused across batch picks."""
+        Xs = self._scale(X)
+        return Xs, np.linalg.solve(self.L, self._kernel(self.X, Xs))
+
+    def posterior_cov(self, Xs, V, j):
+        """Standardised posterior covariance of every candidate with candidate ``j``."""
+        return self._kernel(Xs, Xs[j:j + 1])[:, 0] - V.T @ V[:, j]
+
+
+class Surrogate:
+    def fit(self, data):
+        self.models = {}
+        self.types = {}
+        for target in TARGETS:
+            known = data[data[target].notna()]
+            if len(known) < 5:
+                continue
+            y = known[target].to_numpy(dtype=float)
+            if target in LOG_TARGETS:
+                y = np.log(y)
+            self.models[target] = GaussianProcess().fit(encode(known), y)
+            self.types[target] = sorted(set(known["Type"]))
+        return self
+
+    def _covered(self, configs, target):
+        """Rows of ``configs`` whose workload type has observations of ``target``."""
+        return configs["Type"].isin(self.types[target]).to_numpy()
+
+    def predict(self, configs):
+        """``configs`` with ``<target>`` and ``<target>_std`` columns added (NaN for unobserved types)."""
+        out = configs.copy()
+        X = encode(configs)
+        for target, gp in self.models.items():
+            mean, std = gp.predict(X)
+            covered = self._covered(configs, target)
+            mean, std = np.where(covered, mean, np.nan), np.where(covered, std, np.nan)
+            if target in LOG_TARGETS:
+                # Lognormal mean/std of the prediction
+                out[target] = np.exp(mean + std ** 2 / 2)
+                out[target + "_std"] = out[target] * np.sqrt(np.expm1(std ** 2))
+            else:
+                out[target] = mean
+                out[target + "_std"] = std
+        return out
+
+    def suggest(self, candidates, count):
+        """Greedy maximum-information batch of ``count`` rows from ``candidates``."""
+        X = encode(candidates)
+        covered = {t: self._covered(candidates, t) for t in self.models}
+        projections = {t: gp.projections(X) for t, gp in self.models.items()}
+        variances = {t: np.maximum(1.0 - (V * V).sum(0), 1e-12) for t, (_, V) in projections.items()}
+        chosen_vectors = {t: [] for t in self.models}
+        picks, gains = [], []
+        for _ in range(min(count, len(candidates))):
+            # A target says nothing about workload types it was never observed for
+            gain = sum(np.where(covered[t], 0.5 * np.log1p(variances[t] / self.models[t].noise), 0.0)
+                       for t in self.models)
+            gain[picks] = -np.inf
+            j = int(np.argmax(gain))
+            picks.append(j)
+            gains.append(float(gain[j]))
+            # Condition every target on the pick (rank-one update of the candidates' variances)
+            for t, gp in self.models.items():
+                cov = gp.posterior_cov(*projections[t], j)
+                for u in chosen_vectors[t]:
+                    cov = cov - u * u[j]
+                u = cov / np.sqrt(cov[j] + gp.noise)
+                chosen_vectors[t].append(u)
+                variances[t] = np.maximum(variances[t] - u * u, 1e-12)
+        batch = candidates.iloc[picks].copy()
+        batch["InfoGain"] = gains
+        return batch
+
+
+def candidate_grid(observed, workloads=WORKLOADS, axes=CANDIDATE_AXES):
+    """Every candidate configuration that has not been simulated yet (L1 smaller than L2)."""
+    rows = [
+        {"Type": t, "MatrixSize": m, "L1_Size": l1, "L2_Size": l2, "L1_Assoc": a1, "L2_Assoc": a2}
+        for (t, m), l1, l2, a1, a2 in itertools.product(
+            workloads, axes['L1_Size'], axes['L2_Size'], axes['L1_Assoc'], axes['L2_Assoc'])
+        if size_to_bytes(l1) < size_to_bytes(l2)
+    ]
+    grid = pd.DataFrame(rows, columns=CONFIG_COLUMNS)
+    grid["MatrixSize"] = grid["MatrixSize"].astype("Int64")
+    seen = {_config_id(r) for r in observed[CONFIG_COLUMNS].itertuples(index=False)}
+    return grid[[_config_id(r) not in seen for r in grid.itertuples(index=False)]].reset_index(drop=True)
+
+
+def _config_id(row):
+    matrix = "" if pd.isna(row.MatrixSize) or row.MatrixSize == "" else str(int(row.MatrixSize))
+    return (row.Type, matrix, row.L1_Size, row.L2_Size, int(row.L1_Assoc), int(row.L2_Assoc))
+
+
+def load_config_list(path, types=None, matrix_size=None):
+    """``(L1_Size, L2_Size, L1_Assoc, L2_Assoc, Type)`` tuples from a suggestions CSV.
+
+    Rows are filtered to ``types`` and, if given, ``matrix_size``; associativities
+    come back as strings, as the drivers' own grids use them.
+    """
+    configs = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if types and row["Type"] not in types:
+                continue
+            if matrix_size is not None and row.get("MatrixSize") and int(float(row["MatrixSize"])) != matrix_size:
+                continue
+            configs.append((row["L1_Size"], row["L2_Size"], str(int(float(row["L1_Assoc"]))),
+                            str(int(float(row["L2_Assoc"]))), row["Type"]))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict unsimulated cache configurations and suggest the next gem5 batch")
+    parser.add_argument("--suggest", type=int, default=24, help="Size of the suggested batch")
+    parser.add_argument("--types", default=",".join(TYPES), help="Workload types to suggest for (comma-separated)")
+    parser.add_argument("--axes", default=",".join(GRIDS),
+                        help=f"Driver grids whose axes candidates are drawn from (comma-separated, of "
+                             f"{', '.join(GRIDS)}; default: their union)")
+    parser.add_argument("--output", default="suggestions.csv", help="Suggested batch, with predictions")
+    parser.add_argument("--predictions", default=None, help="Also write predictions for every candidate to this CSV")
+    args = parser.parse_args()
+    grids = args.axes.split(",")
+    unknown = [grid for grid in grids if grid not in GRIDS]
+    if unknown:
+        parser.error(f"--axes: unknown grid {unknown[0]!r} (choose from {', '.join(GRIDS)})")
+
+    observed = load_observations()
+    print(f"Fitting surrogate on {len(observed)} simulated configurations...")
+    model = Surrogate().fit(observed)
+    for target, gp in model.models.items():
+        scale = "log " if target in LOG_TARGETS else ""
+        print(f"  {target:12s} noise={gp.noise:<7g} LOO RMSE ({scale}units): {gp.loo_rmse():.4g}  "
+              f"[{', '.join(model.types[target])}]")
+
+    types = args.types.split(",")
+    candidates = candidate_grid(observed, [w for w in WORKLOADS if w[0] in types], candidate_axes(grids))
+    if args.predictions:
+        model.predict(candidates).to_csv(args.predictions, index=False)
+        print(f"Predictions for {len(candidates)} candidates saved to {args.predictions}")
+
+    batch = model.predict(model.suggest(candidates, args.suggest))
+    batch.to_csv(args.output, index=False)
+    print(f"{len(batch)} suggested configurations saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
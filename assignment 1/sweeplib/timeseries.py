@@ -0,0 +1,153 @@
+"""Per-interval time series from gem5 runs with periodic stat dumps.
+
+``cache_config.py --dump_period_insts N`` (or ``--dump_period_ticks N``)
+dumps the stats every N instructions (ticks) without resetting them, so the
+last block still covers the whole run and every reader of final stats is
+unaffected. ``interval_series`` differences consecutive blocks into one row
+per interval and recomputes the rates from that interval's counts: L1D/L2
+miss rate and MPKI, IPC and DRAM bandwidth. A block whose ``simTicks``
+went down follows a stats reset (``--roi``) and is taken as is, so files
+written with dump-and-reset periods parse the same way.
+
+``detect_phases`` splits a series where its metrics move away from the
+current phase's running mean by more than ``threshold`` (relative) for at
+least ``min_len`` intervals. ``phase_summary`` gives each phase's share of
+the instructions and how far its metrics are from the whole run's, which
+says whether a ROI or a sampled interval from that phase stands for the run.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.timeseries "part 2/results/stats/Chunked_L1_64kB_L2_512kB_A1_8_A2_16/stats.txt"
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .stats_parser import lookup
+from .stats_reader import load_stats
+
+# Cumulative counters differenced per interval (sweep names, see stats_parser.ALIASES)
+COUNTERS = ["simTicks", "simInsts", "Cycles", "L1_Accesses", "L1_Misses", "L2_Accesses", "L2_Misses",
+            "MemBytesRead", "MemBytesWritten"]
+SERIES_METRICS = ["L1_MissRate", "L2_MissRate", "L1_MPKI", "L2_MPKI", "IPC", "MemBandwidth"]
+PHASE_METRICS = ("L1_MissRate", "L2_MissRate", "IPC")
+
+
+def _ratio(num, den):
+    return num / den if den else np.nan
+
+
+def _rates(counts, freq):
+    """Series metrics of one interval (or phase) from its counter deltas."""
+    seconds = counts["simTicks"] / freq
+    return {
+        "L1_MissRate": _ratio(counts["L1_Misses"], counts["L1_Accesses"]),
+        "L2_MissRate": _ratio(counts["L2_Misses"], counts["L2_Accesses"]),
+        "L1_MPKI": _ratio(1000 * counts["L1_Misses"], counts["simInsts"]),
+        "L2_MPKI": _ratio(1000 * counts["L2_Misses"], counts["simInsts"]),
+        "IPC": _ratio(counts["simInsts"], counts["Cycles"]),
+        "MemBandwidth": _ratio(counts["MemBytesRead"] + counts["MemBytesWritten"], seconds),
+    }
+
+
+def interval_series(blocks):
+    """One row per dump interval: counter deltas, rates and the interval's tick/instruction span."""
+    rows = []
+    previous = None
+    insts_done = 0
+    for block in blocks:
+        current = {name: lookup(block, name) or 0 for name in COUNTERS}
+        if previous is None or current["simTicks"] < previous["simTicks"]:
+            previous = dict.fromkeys(COUNTERS, 0)
+        counts = {name: current[name] - previous[name] for name in COUNTERS}
+        previous = current
+        if counts["simTicks"] <= 0:
+            continue  # e.g. gem5's exit dump right after a periodic one
+        end_tick = block.get("finalTick", current["simTicks"])
+        rows.append({
+            "interval": len(rows), "start_tick": end_tick - counts["simTicks"], "end_tick": end_tick,
+            "start_inst": insts_done, **counts, **_rates(counts, block.get("simFreq", 1e12)),
+        })
+        insts_done += counts["simInsts"]
+    return pd.DataFrame(rows)
+
+
+def series_of(blocks):
+    """``interval_series`` of a run's dump blocks; empty for a run with one dump."""
+    return interval_series(blocks) if len(blocks) > 1 else pd.DataFrame()
+
+
+def load_series(stats_file):
+    """``series_of`` a run, reading only the counters (from ``stats.h5`` if the run has one)."""
+    return series_of(load_stats(os.path.dirname(stats_file) or ".", COUNTERS + ["finalTick", "simFreq"]))
+
+
+def detect_phases(series, metrics=PHASE_METRICS, threshold=0.25, min_len=3):
+    """Phase number per interval.
+
+    A new phase starts at the first of ``min_len`` consecutive intervals
+    whose metrics all stay more than ``threshold`` (relative, largest over
+    ``metrics``) away from the current phase's mean.
+    """
+    values = series[[m for m in metrics if m in series]].to_numpy(dtype=float)
+    phases = np.zeros(len(values), dtype=int)
+    start, phase, i = 0, 0, 1
+    while i < len(values):
+        mean = np.nanmean(values[start:i], axis=0)
+        scale = np.where(np.abs(mean) > 1e-12, np.abs(mean), 1.0)
+        window = values[i:i + min_len]
+        deviation = np.nanmax(np.abs(window - mean) / scale, axis=1, initial=0)
+        if len(window) == min_len and np.all(deviation > threshold):
+            phase += 1
+            start = i
+        phases[i] = phase
+        i += 1
+    return phases
+
+
+def phase_summary(series, phases, freq=1e12):
+    """Per phase: span, instruction share, metrics and largest deviation (%) from the whole run."""
+    whole = _rates(series[COUNTERS].sum(), freq)
+    rows = []
+    for phase, group in series.groupby(phases):
+        rates = _rates(group[COUNTERS].sum(), freq)
+        deviations = [abs(rates[m] - whole[m]) / abs(whole[m]) for m in PHASE_METRICS
+                      if whole[m] and not np.isnan(rates[m])]
+        rows.append({
+            "phase": phase, "first_interval": group["interval"].iloc[0], "intervals": len(group),
+            "start_tick": group["start_tick"].iloc[0], "end_tick": group["end_tick"].iloc[-1],
+            "inst_share": group["simInsts"].sum() / series["simInsts"].sum(), **rates,
+            "max_dev_pct": 100 * max(deviations) if deviations else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+def build_series_table(runs):
+    """Long table from ``(config dict, series DataFrame)`` pairs, config columns first."""
+    frames = [series.assign(**config)[list(config) + list(series.columns)] for config, series in runs if len(series)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-interval series and phases of a run with periodic stat dumps")
+    parser.add_argument("stats_file", help="stats.txt written with --dump_period_insts/--dump_period_ticks")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative change that starts a phase. Default: 0.25")
+    parser.add_argument("--min_len", type=int, default=3, help="Intervals a change must last. Default: 3")
+    parser.add_argument("--output", default=None, help="Also write the series (with a phase column) to this CSV")
+    args = parser.parse_args()
+
+    series = load_series(args.stats_file)
+    if series.empty:
+        print(f"{args.stats_file} has a single dump; re-run with --dump_period_insts or --dump_period_ticks")
+        return
+    series["phase"] = detect_phases(series, threshold=args.threshold, min_len=args.min_len)
+    print(f"{len(series)} intervals, {series['phase'].nunique()} phases")
+    print(phase_summary(series, series["phase"]).to_string(index=False, float_format=lambda v: f"{v:.6g}"))
+    if args.output:
+        series.to_csv(args.output, index=False)
+        print(f"Series saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
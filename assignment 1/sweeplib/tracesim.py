@@ -0,0 +1,221 @@
+"""Trace-driven L1D/L2 miss-rate pre-screen for the gem5 sweep grids.
+
+Replays one captured data-address trace through every (size, assoc) pair of
+a sweep grid and reports miss rates in the ``results.csv`` layout written by
+``part 2/scripts/extract_results.py``. Time/Cycles/IPC need a timing model,
+so they are left as ``N/A``; use the output to pick which points deserve a
+full gem5 run.
+
+Model: write-allocate LRU caches (gem5's default ``LRURP``), L2 sees the
+L1D demand-miss stream. Instruction fetches and dirty writebacks are not in
+the trace, so absolute L2 numbers run lower than gem5's; rankings hold.
+
+Instead of stepping a cache per configuration, hits are derived from LRU
+stack distances: an access hits an A-way set iff fewer than A distinct lines
+touched that set since its previous use. Distances are computed once per
+distinct set count with sorts and ``searchsorted`` (O(n log^2 n), no Python
+loop over accesses), and every associativity with that set count is then
+read off with one comparison.
+
+Usage (from ``assignment 1/``):
+    python3 -m sweeplib.tracesim --trace mergesort_s.npy --type Simple \\
+        --grid part2 --output "part 2/results/prescreen.csv"
+"""
+import argparse
+import csv
+import itertools
+import os
+
+import numpy as np
+
+LINE_SIZE = 64
+
+GRIDS = {
+    'part1': {
+        'l1_sizes': ["16kB", "32kB", "64kB"],
+        'l2_sizes': ["128kB", "256kB", "512kB"],
+        'l1_assocs': [2, 4, 8],
+        'l2_assocs': [4, 8, 16],
+    },
+    'part2': {
+        'l1_sizes': ["32kB", "64kB", "128kB"],
+        'l2_sizes': ["256kB", "512kB", "1024kB"],
+        'l1_assocs': [4, 8, 16],
+        'l2_assocs': [4, 8, 16],
+    },
+}
+
+HEADERS = ["L1_Size", "L2_Size", "L1_Assoc", "L2_Assoc", "Type", "Time", "Cycles", "L1_MissRate", "L2_MissRate", "IPC"]
+
+
+def size_to_bytes(size_str):
+    units = {'kB': 1024, 'KiB': 1024, 'MB': 1024 ** 2, 'MiB': 1024 ** 2, 'B': 1}
+    for unit, scale in units.items():
+        if size_str.endswith(unit):
+            return int(size_str[:-len(unit)]) * scale
+    return int(size_str)
+
+
+def num_sets(size_str, assoc, line_size=LINE_SIZE):
+    sets = size_to_bytes(size_str) // (line_size * int(assoc))
+    if sets < 1 or sets & (sets - 1):
+        raise ValueError(f"Invalid geometry: {size_str} / {assoc}-way / {line_size}B lines")
+    return sets
+
+
+def load_trace(path, limit=None):
+    """Return byte addresses from a ``.npy`` array or a text trace.
+
+    Text traces have one access per line: an address in hex (``0x...``) or
+    decimal, optionally preceded by an op such as ``R``/``W``. Blank lines
+    and ``#`` comments are skipped.
+    """
+    if path.endswith('.npy'):
+        addrs = np.load(path, mmap_mode='r')
+        return np.asarray(addrs[:limit], dtype=np.int64)
+
+    addrs = []
+    with open(path, 'r') as f:
+        for line in f:
+            tokens = line.split('#', 1)[0].replace(',', ' ').split()
+            if not tokens:
+                continue
+            addrs.append(int(tokens[-1], 0))
+            if limit and len(addrs) >= limit:
+                break
+    return np.asarray(addrs, dtype=np.int64)
+
+
+def _prev_occurrence(seq):
+    """Index of the previous equal element of ``seq`` (-1 if none)."""
+    n = len(seq)
+    by_value = np.lexsort((np.arange(n), seq))
+    prev = np.full(n, -1, dtype=np.int64)
+    same = seq[by_value[1:]] == seq[by_value[:-1]]
+    prev[by_value[1:][same]] = by_value[:-1][same]
+    return prev
+
+
+def _count_prefix_below(values, thresholds, mask):
+    """For each i in ``mask``: #{j < i : values[j] < thresholds[i]}.
+
+    The prefix [0, i) is split into the dyadic blocks given by the set bits
+    of i; each level counts one block per query with a single sorted
+    ``searchsorted`` over (block, value) keys.
+    """
+    n = len(values)
+    idx = np.nonzero(mask)[0]
+    counts = np.zeros(len(idx), dtype=np.int64)
+    span = np.int64(n + 1)
+    positions = np.arange(n, dtype=np.int64)
+    level = 0
+    while (1 << level) <= n:
+        keys = np.sort((positions >> level) * span + values)
+        has_block = ((idx >> level) & 1).astype(bool)
+        q = idx[has_block]
+        block_base = ((q >> level) - 1) * span
+        counts[has_block] += (np.searchsorted(keys, block_base + thresholds[q], 'left')
+                              - np.searchsorted(keys, block_base, 'left'))
+        level += 1
+    return counts
+
+
+def stack_distances(lines, sets):
+    """LRU stack distance of every access within its set (-1 for cold misses)."""
+    n = len(lines)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    # Group accesses by set, keeping program order within each set; reuse
+    # windows then never cross a set boundary.
+    order = np.argsort(lines & (sets - 1), kind='stable')
+    seq = lines[order]
+    prev = _prev_occurrence(seq)
+
+    # Distinct lines in (p, i) == #{j in (p, i) : prev[j] < p}
+    #                          == #{j < i : prev[j] < p} - (p + 1)
+    reused = prev >= 0
+    below = _count_prefix_below(prev + 1, prev + 1, reused)
+    grouped = np.full(n, -1, dtype=np.int64)
+    grouped[reused] = below - (prev[reused] + 1)
+
+    distances = np.empty(n, dtype=np.int64)
+    distances[order] = grouped
+    return distances
+
+
+def _misses(distances, assoc):
+    return (distances < 0) | (distances >= int(assoc))
+
+
+def simulate_grid(addrs, l1_sizes, l1_assocs, l2_sizes, l2_assocs, line_size=LINE_SIZE):
+    """Miss rates for every (L1 size, L2 size, L1 assoc, L2 assoc) point.
+
+    Returns ``{(l1_sz, l2_sz, l1_assoc, l2_assoc): (l1_miss_rate, l2_miss_rate)}``.
+    """
+    lines = np.asarray(addrs, dtype=np.int64) // line_size
+    total = len(lines)
+    if total == 0:
+        raise ValueError("Empty trace")
+
+    l1_distances = {}
+    l2_miss_streams = {}
+    l1_rates = {}
+    for l1_sz, l1_assoc in itertools.product(l1_sizes, l1_assocs):
+        sets = num_sets(l1_sz, l1_assoc, line_size)
+        if sets not in l1_distances:
+            l1_distances[sets] = stack_distances(lines, sets)
+        missed = _misses(l1_distances[sets], l1_assoc)
+        l1_rates[(l1_sz, l1_assoc)] = missed.sum() / total
+        l2_miss_streams[(l1_sz, l1_assoc)] = lines[missed]
+
+    results = {}
+    for (l1_sz, l1_assoc), stream in l2_miss_streams.items():
+        l2_distances = {}
+        for l2_sz, l2_assoc in itertools.product(l2_sizes, l2_assocs):
+            sets = num_sets(l2_sz, l2_assoc, line_size)
+            if sets not in l2_distances:
+                l2_distances[sets] = stack_distances(stream, sets)
+            l2_rate = _misses(l2_distances[sets], l2_assoc).sum() / len(stream) if len(stream) else 0.0
+            results[(l1_sz, l2_sz, int(l1_assoc), int(l2_assoc))] = (float(l1_rates[(l1_sz, l1_assoc)]), float(l2_rate))
+    return results
+
+
+def _grid_order(item):
+    (l1_sz, l2_sz, l1_assoc, l2_assoc), _ = item
+    return size_to_bytes(l1_sz), size_to_bytes(l2_sz), l1_assoc, l2_assoc
+
+
+def write_results(results, output_csv, algo_type):
+    """Write ``simulate_grid`` results in the ``results.csv`` layout, smallest caches first."""
+    rows = []
+    for (l1_sz, l2_sz, l1_assoc, l2_assoc), (l1_rate, l2_rate) in sorted(results.items(), key=_grid_order):
+        rows.append([l1_sz, l2_sz, l1_assoc, l2_assoc, algo_type, "N/A", "N/A",
+                     f"{l1_rate:.6f}", f"{l2_rate:.6f}", "N/A"])
+    with open(output_csv, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-screen a cache sweep grid from one memory-address trace")
+    parser.add_argument("--trace", required=True, help="Address trace (.npy of byte addresses or text, one per line)")
+    parser.add_argument("--type", default="Trace", help="Value for the Type column (e.g. Simple, Chunked, 128)")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="part2", help="Sweep grid to evaluate")
+    parser.add_argument("--limit", type=int, default=None, help="Only replay the first N accesses")
+    parser.add_argument("--line_size", type=int, default=LINE_SIZE)
+    parser.add_argument("--output", default="prescreen.csv")
+    args = parser.parse_args()
+
+    grid = GRIDS[args.grid]
+    addrs = load_trace(args.trace, args.limit)
+    print(f"Replaying {len(addrs)} accesses from {os.path.basename(args.trace)} over the {args.grid} grid...")
+
+    results = simulate_grid(addrs, grid['l1_sizes'], grid['l1_assocs'], grid['l2_sizes'], grid['l2_assocs'], args.line_size)
+    rows = write_results(results, args.output, args.type)
+    print(f"{len(rows)} configurations saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
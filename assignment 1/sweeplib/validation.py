@@ -0,0 +1,63 @@
+"""Compare approximate runs (sampled, trace replay) against full gem5 runs.
+
+Each approximation writes an ordinary ``stats.txt`` per configuration, so
+the comparison reads the same metrics the sweeps report from both sides
+and gives the relative error per metric. Confidence half-widths written by
+``sweeplib.simpoint`` as ``sampled.ci95.<stat>`` are checked for coverage.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .stats_parser import ALIASES, parse_final
+
+# Metrics compared, by sweep column name
+METRICS = ["simSeconds", "L1_MissRate", "L2_MissRate", "IPC"]
+CI_PREFIX = "sampled.ci95."
+
+
+def resolve(stats, metric):
+    """(stat name, value) of a reported metric, or (None, None)."""
+    for name in ALIASES.get(metric, [metric]):
+        if name in stats:
+            return name, stats[name]
+    return None, None
+
+
+def compare_stats(full, approx, config):
+    """One row per metric present in both stats dicts."""
+    rows = []
+    for metric in METRICS:
+        _, exact = resolve(full, metric)
+        name, value = resolve(approx, metric)
+        if exact is None or value is None:
+            continue
+        ci = approx.get(CI_PREFIX + name)
+        rows.append({
+            "config": config, "metric": metric, "full": exact, "approx": value,
+            "error_pct": 100.0 * (value - exact) / exact if exact else np.nan,
+            "ci95": ci, "within_ci": abs(value - exact) <= ci if ci is not None else None,
+            "speedup": (full.get("hostSeconds") or np.nan) / (approx.get("hostSeconds") or np.nan),
+        })
+    return rows
+
+
+def compare(full_dir, approx_dir, configs=None):
+    """Full vs approximate results of every configuration present in both directories."""
+    rows = []
+    for config in configs or sorted(os.listdir(approx_dir)):
+        full = parse_final(os.path.join(full_dir, config, "stats.txt"))
+        approx = parse_final(os.path.join(approx_dir, config, "stats.txt"))
+        if full and approx:
+            rows += compare_stats(full, approx, config)
+    return pd.DataFrame(rows)
+
+
+def print_comparison(df):
+    if df.empty:
+        print("No configuration has both a full and an approximate result.")
+        return
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.6g}"))
+    print("\nMean |error| per metric (%):")
+    print(df.groupby("metric")["error_pct"].apply(lambda e: e.abs().mean()).to_string(float_format=lambda v: f"{v:.3f}"))
@@ -0,0 +1,356 @@
+"""SQLite-backed sweep job queue with leased, heartbeating pull workers.
+
+``run_longest_first`` keeps a sweep on one machine's ``multiprocessing.Pool``.
+With ``--enqueue QUEUE`` the drivers instead put their jobs into a SQLite
+file (``run_queued``) and wait for them; any number of workers, on this
+host or on any host that mounts the same tree, pull jobs from it:
+
+    python3 -m sweeplib.workqueue worker QUEUE --processes 16
+
+A worker claims the highest-priority pending job (its predicted host
+seconds, so the longest still go first), holding a lease of ``--lease``
+seconds that a background thread renews while gem5 runs. When it finishes,
+the job's return value (e.g. a ``full_sweep.py`` CSV row) is written back.
+A worker that dies or loses its host stops renewing, so its lease runs out
+and the next claim puts the job back to pending; a job whose lease has
+expired ``max_attempts`` times is marked failed rather than retried forever.
+
+Jobs name the driver script and function to call, plus the function's
+arguments as JSON. The worker imports the script by path, so every host
+must see the repository, the benchmarks and the results tree at the same
+path. The gem5 binary is looked up on the worker's side (``GEM5_HOME``),
+and the result store digest still covers its contents. SQLite relies on the
+file system's locks: a local disk or an NFS mount with working ``fcntl``
+locks.
+
+Usage (from ``assignment 1/``):
+    python3 "part 2/scripts/run_sweep.py" --enqueue /shared/sweep.db      # waits for the jobs
+    python3 -m sweeplib.workqueue worker /shared/sweep.db --processes 48  # on each host
+    python3 -m sweeplib.workqueue status /shared/sweep.db
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    script TEXT NOT NULL,
+    function TEXT NOT NULL,
+    args TEXT NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    started REAL,
+    finished REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority);
+"""
+STATUSES = ("pending", "running", "done", "failed")
+
+
+def _last_line(text):
+    lines = (text or "").strip().splitlines()
+    return lines[-1] if lines else ""
+
+
+def job_key(script, function, args):
+    """Identity of a job: the same call enqueued twice is one job."""
+    payload = json.dumps([os.path.abspath(script), function, args], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class WorkQueue:
+    """The queue file. Every method opens its own short transaction, so one
+    instance can be shared by threads and many processes can use the file."""
+
+    def __init__(self, path, lease=300.0, max_attempts=3):
+        self.path = os.path.abspath(path)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=60)
+        db.executescript(SCHEMA)
+        db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Transaction(db)
+
+    def enqueue(self, jobs):
+        """Add ``(script, function, args, priority)`` jobs; returns their ids in order.
+
+        A job already in the queue keeps its id. If it finished (done or
+        failed) it is reset to pending, so re-running a driver re-runs its
+        jobs (cheap when the result store has them); a pending or running
+        one is left alone, so a driver restarted mid-sweep attaches to it.
+        """
+        ids = []
+        with self._connect() as db:
+            for script, function, args, priority in jobs:
+                key = job_key(script, function, args)
+                db.execute("INSERT OR IGNORE INTO jobs (key, script, function, args, priority) VALUES (?, ?, ?, ?, ?)",
+                           (key, os.path.abspath(script), function, json.dumps(args), priority))
+                db.execute("UPDATE jobs SET status = 'pending', attempts = 0, priority = ?, worker = NULL, "
+                           "lease_until = NULL, result = NULL, error = NULL "
+                           "WHERE key = ? AND status IN ('done', 'failed')", (priority, key))
+                ids.append(db.execute("SELECT id FROM jobs WHERE key = ?", (key,)).fetchone()["id"])
+        return ids
+
+    def _reclaim(self, db, now):
+        # Leases that ran out: the worker died, hung or lost its host
+        db.execute("UPDATE jobs SET status = 'failed', worker = NULL, finished = ?, "
+                   "error = 'lease expired ' || attempts || ' times' "
+                   "WHERE status = 'running' AND lease_until < ? AND attempts >= ?", (now, now, self.max_attempts))
+        return db.execute("UPDATE jobs SET status = 'pending', worker = NULL "
+                          "WHERE status = 'running' AND lease_until < ?", (now,)).rowcount
+
+    def reclaim(self):
+        """Put jobs with expired leases back to pending; returns how many."""
+        with self._connect() as db:
+            return self._reclaim(db, time.time())
+
+    def claim(self, worker):
+        """Lease the highest-priority pending job: ``(id, script, function, args)`` or None."""
+        now = time.time()
+        with self._connect() as db:
+            self._reclaim(db, now)
+            row = db.execute("SELECT id, script, function, args FROM jobs WHERE status = 'pending' "
+                             "ORDER BY priority DESC, id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, started = ?, "
+                       "attempts = attempts + 1 WHERE id = ?", (worker, now + self.lease, now, row["id"]))
+        return row["id"], row["script"], row["function"], json.loads(row["args"])
+
+    def heartbeat(self, job_id, worker):
+        """Renew a lease; False if the job is no longer this worker's."""
+        with self._connect() as db:
+            return db.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                              (time.time() + self.lease, job_id, worker)).rowcount == 1
+
+    def complete(self, job_id, worker, result=None, error=None):
+        """Record a finished job; ignored if its lease was lost to another worker."""
+        with self._connect() as db:
+            return db.execute("UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, lease_until = NULL "
+                              "WHERE id = ? AND worker = ? AND status = 'running'",
+                              ("failed" if error else "done", json.dumps(result), error, time.time(),
+                               job_id, worker)).rowcount == 1
+
+    def jobs(self, ids=None):
+        """``{id: row dict}`` of the given jobs (all jobs by default)."""
+        with self._connect() as db:
+            rows = db.execute("SELECT id, status, attempts, worker, lease_until, started, finished, result, error "
+                              "FROM jobs").fetchall()
+        wanted = set(ids) if ids is not None else None
+        return {row["id"]: dict(row) for row in rows if wanted is None or row["id"] in wanted}
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def requeue_failed(self):
+        with self._connect() as db:
+            return db.execute("UPDATE jobs SET status = 'pending', attempts = 0, error = NULL "
+                              "WHERE status = 'failed'").rowcount
+
+
+class _Transaction:
+    """``with`` block holding one write transaction (BEGIN IMMEDIATE, so claims never race)."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        self.db.close()
+
+
+def _callable_of(func):
+    """(script path, function name) a worker can import ``func`` from."""
+    return os.path.abspath(sys.modules[func.__module__].__file__), func.__name__
+
+
+def run_queued(queue_path, func, jobs, model, on_result=None, skip=None, dashboard=None, poll=10.0):
+    """``run_longest_first`` through a queue: enqueue every job and wait for workers to run them.
+
+    Same arguments and result as ``run_longest_first``. Jobs that ``skip``
+    marks near-free run here directly instead of waiting for a worker.
+    Priorities are the model's predictions, so workers take the longest
+    jobs first. Interrupting the wait leaves the jobs queued; running the
+    driver again attaches to them.
+    """
+    queue = WorkQueue(queue_path)
+    script, function = _callable_of(func)
+    results = [None] * len(jobs)
+    queued = {}
+    for i, (features, args) in enumerate(jobs):
+        if skip and skip(features, args):
+            results[i] = func(args)
+            if on_result:
+                on_result(features, args, results[i])
+        else:
+            queued[i] = (features, args)
+    # JSON round trip: workers see lists where the driver had tuples
+    ids = queue.enqueue([(script, function, json.loads(json.dumps(args)), model.predict(features))
+                         for features, args in queued.values()])
+    index_of = dict(zip(ids, queued))
+    print(f"Enqueued {len(ids)} jobs in {queue.path} ({len(jobs) - len(ids)} taken from the result store); "
+          f"start workers with: python3 -m sweeplib.workqueue worker {queue.path}")
+    if dashboard:
+        dashboard.queue(queued)
+
+    running, last_report = set(), None
+    while index_of:
+        states = queue.jobs(index_of)
+        for job_id, state in states.items():
+            i = index_of[job_id]
+            if state["status"] == "running" and job_id not in running:
+                running.add(job_id)
+                if dashboard:
+                    dashboard.started(i)
+            elif state["status"] in ("done", "failed"):
+                features, args = jobs[i]
+                if dashboard:
+                    if job_id not in running:
+                        dashboard.started(i)
+                    dashboard.finished(i)
+                running.discard(job_id)
+                del index_of[job_id]
+                if state["status"] == "failed":
+                    print(f"Job {features} failed: {_last_line(state['error'])}")
+                    continue
+                results[i] = json.loads(state["result"])
+                if on_result:
+                    on_result(features, args, results[i])
+        if not index_of:
+            break
+        report = (len(index_of), len(running))
+        if dashboard:
+            dashboard.tick()
+        elif report != last_report:
+            print(f"[{time.strftime('%H:%M:%S')}] {report[0] - report[1]} queued, {report[1]} running")
+        last_report = report
+        time.sleep(poll)
+    if dashboard:
+        dashboard.close()
+    return results
+
+
+_modules = {}
+
+
+def _load(script, function):
+    """``function`` of a driver script, imported (once) by path without running its main block."""
+    if script not in _modules:
+        # Drivers import their neighbours (e.g. run_sweep.py -> extract_results.py)
+        sys.path.insert(0, os.path.dirname(script))
+        name = "sweepjob_" + hashlib.sha1(script.encode()).hexdigest()[:12]
+        spec = importlib.util.spec_from_file_location(name, script)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _modules[script] = module
+    return getattr(_modules[script], function)
+
+
+def _keep_alive(queue, job_id, worker, stop):
+    while not stop.wait(queue.lease / 3):
+        if not queue.heartbeat(job_id, worker):
+            print(f"{worker}: lost the lease on job {job_id}; its result will be discarded", flush=True)
+            return
+
+
+def work(queue_path, lease=300.0, idle=300.0, poll=5.0):
+    """Claim and run jobs until the queue has had nothing pending for ``idle`` seconds (0: forever)."""
+    queue = WorkQueue(queue_path, lease=lease)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    idle_since = time.time()
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            if idle and time.time() - idle_since > idle:
+                return
+            time.sleep(poll)
+            continue
+        job_id, script, function, args = job
+        stop = threading.Event()
+        heart = threading.Thread(target=_keep_alive, args=(queue, job_id, worker, stop), daemon=True)
+        heart.start()
+        print(f"{worker}: job {job_id} ({function})", flush=True)
+        try:
+            result, error = _load(script, function)(args), None
+        except Exception:
+            result, error = None, traceback.format_exc()
+        stop.set()
+        heart.join()
+        queue.complete(job_id, worker, result=result, error=error)
+        idle_since = time.time()
+
+
+def _work_slot(options):
+    work(*options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep job queue: run workers or inspect a queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Pull and run jobs")
+    worker.add_argument("queue", help="Queue file given to the driver's --enqueue")
+    worker.add_argument("--processes", type=int, default=1, help="Jobs to run at once on this host. Default: 1")
+    worker.add_argument("--lease", type=float, default=300, help="Seconds a claim lasts without a heartbeat. Default: 300")
+    worker.add_argument("--idle", type=float, default=300,
+                        help="Exit after this many seconds without a pending job (0: never). Default: 300")
+    status = sub.add_parser("status", help="Job counts and running jobs")
+    status.add_argument("queue")
+    requeue = sub.add_parser("requeue", help="Put failed jobs back to pending")
+    requeue.add_argument("queue")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        options = [(args.queue, args.lease, args.idle)] * args.processes
+        if args.processes == 1:
+            _work_slot(options[0])
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                pool.map(_work_slot, options, chunksize=1)
+    elif args.command == "status":
+        queue = WorkQueue(args.queue)
+        reclaimed = queue.reclaim()
+        print(", ".join(f"{n} {status}" for status, n in queue.counts().items())
+              + (f" ({reclaimed} expired leases reclaimed)" if reclaimed else ""))
+        now = time.time()
+        for job_id, job in sorted(queue.jobs().items()):
+            if job["status"] == "running":
+                print(f"  job {job_id} on {job['worker']}: {now - job['started']:.0f}s, "
+                      f"lease {job['lease_until'] - now:.0f}s left, attempt {job['attempts']}")
+            elif job["status"] == "failed":
+                print(f"  job {job_id} failed: {_last_line(job['error'])}")
+    else:
+        print(f"{WorkQueue(args.queue).requeue_failed()} failed jobs back to pending")
+
+
+if __name__ == "__main__":
+    main()
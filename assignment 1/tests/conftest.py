@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests import sweeplib the way the drivers do, from assignment 1/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,39 @@
+import csv
+
+from sweeplib.journal import Journal
+
+
+def test_torn_last_line_is_skipped_and_not_glued_to_the_next(tmp_path):
+    journal = Journal(str(tmp_path / "sweep_journal.jsonl"))
+    journal.append("a", ["a", 1])
+    journal.append("b", ["b", 2])
+    # A crash in the middle of the third write
+    with open(journal.path, "a") as f:
+        f.write('{"key": "c", "ro')
+    assert list(journal.rows()) == ["a", "b"]
+    journal.append("d", ["d", 4])
+    assert journal.rows() == {"a": ["a", 1], "b": ["b", 2], "d": ["d", 4]}
+
+
+def test_resume_keeps_rows_and_latest_row_wins(tmp_path):
+    path = str(tmp_path / "sweep_journal.jsonl")
+    Journal(path).append("a", ["a", "FAILED"])
+    Journal(path).append("b", ["b", 2])
+    # A resumed sweep opens the same journal and re-runs the failed key
+    resumed = Journal(path)
+    assert set(resumed.rows()) == {"a", "b"}
+    resumed.append("a", ["a", 1])
+    assert resumed.rows() == {"a": ["a", 1], "b": ["b", 2]}
+
+    out = str(tmp_path / "results.csv")
+    assert resumed.materialize(out, ["key", "value"]) == 2
+    with open(out, newline="") as f:
+        assert list(csv.reader(f)) == [["key", "value"], ["a", "1"], ["b", "2"]]
+
+
+def test_reset_starts_a_new_sweep(tmp_path):
+    journal = Journal(str(tmp_path / "sweep_journal.jsonl"))
+    journal.append("a", ["a", 1])
+    journal.reset()
+    assert journal.rows() == {}
+    journal.reset()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from sweeplib.pareto import pareto_mask
+
+
+def brute_force_mask(costs):
+    """First occurrence of each point that no other point weakly dominates."""
+    mask = np.zeros(len(costs), dtype=bool)
+    for i, c in enumerate(costs):
+        dominated = np.all(costs <= c, axis=1) & np.any(costs < c, axis=1)
+        earlier_copy = np.all(costs[:i] == c, axis=1).any()
+        mask[i] = not dominated.any() and not earlier_copy
+    return mask
+
+
+@pytest.mark.parametrize("n, k", [(50, 1), (300, 2), (600, 3), (1500, 3), (800, 4)])
+def test_matches_brute_force_with_duplicates(n, k):
+    rng = np.random.default_rng(n + k)
+    # Few distinct values, so ties and exact duplicates are common
+    costs = rng.integers(0, 12, size=(n, k)).astype(float)
+    costs[n // 2:n // 2 + 20] = costs[:20]
+    assert np.array_equal(pareto_mask(costs), brute_force_mask(costs))
+
+
+def test_anticorrelated_front_matches_brute_force():
+    rng = np.random.default_rng(0)
+    x = rng.random(1000)
+    costs = np.column_stack((x, 1 - x + rng.normal(0, 0.01, 1000), rng.random(1000)))
+    costs = np.concatenate((costs, costs[:100]))
+    assert np.array_equal(pareto_mask(costs), brute_force_mask(costs))
+
+
+def test_edge_cases():
+    assert pareto_mask(np.zeros((0, 2))).tolist() == []
+    assert pareto_mask([[1.0, 2.0], [1.0, 2.0]]).tolist() == [True, False]
+    with pytest.raises(ValueError):
+        pareto_mask([1.0, 2.0])
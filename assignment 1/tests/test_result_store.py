@@ -0,0 +1,59 @@
+import os
+
+from sweeplib.result_store import ResultStore, is_complete, result_key
+from sweeplib.stats_parser import BEGIN_MARK, END_MARK
+
+STATS = f"\n{BEGIN_MARK} ----------\nsimSeconds 0.5 # s\n\n{END_MARK}   ----------\n"
+
+
+def _run(path, text=STATS):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "stats.txt"), "w") as f:
+        f.write(text)
+    with open(os.path.join(path, "config.ini"), "w") as f:
+        f.write("[root]\n")
+    return str(path)
+
+
+def test_is_complete(tmp_path):
+    assert not is_complete(str(tmp_path / "missing"))
+    assert not is_complete(_run(tmp_path / "empty", ""))
+    assert not is_complete(_run(tmp_path / "killed", STATS.split(END_MARK)[0]))
+    assert is_complete(_run(tmp_path / "done"))
+    # The end marker is found near the end of a long file
+    assert is_complete(_run(tmp_path / "long", "x" * 100000 + STATS))
+
+
+def test_put_then_fetch(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    key = result_key("digest", ["64kB", 8])
+    assert not store.has(key)
+    assert not store.fetch(key, str(tmp_path / "dest"))
+    assert store.put(key, _run(tmp_path / "run"), meta={"config": "c"})
+    assert store.has(key)
+    assert store.fetch(key, str(tmp_path / "dest"))
+    with open(tmp_path / "dest" / "stats.txt") as f:
+        assert f.read() == STATS
+    assert os.path.exists(tmp_path / "dest" / "config.ini")
+
+
+def test_put_never_stores_an_incomplete_run(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    assert not store.put("ab" * 32, _run(tmp_path / "run", STATS.split(END_MARK)[0]))
+    assert not os.path.exists(store.path("ab" * 32))
+
+
+def test_put_leaves_no_staging_directory_and_first_writer_wins(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    key = "cd" * 32
+    assert store.put(key, _run(tmp_path / "first"))
+    assert store.put(key, _run(tmp_path / "second", STATS.replace("0.5", "0.7")))
+    assert os.listdir(os.path.dirname(store.path(key))) == [key]
+    with open(os.path.join(store.path(key), "stats.txt")) as f:
+        assert "0.5" in f.read()
+
+
+def test_result_key_covers_inputs_and_params():
+    assert result_key("d", ["64kB", 8]) == result_key("d", ["64kB", "8"])
+    assert result_key("d", ["64kB", 8]) != result_key("d", ["64kB", 16])
+    assert result_key("d", ["64kB", 8]) != result_key("e", ["64kB", 8])
@@ -0,0 +1,33 @@
+import os
+import signal
+import time
+
+import sweeplib.scheduler as scheduler
+
+
+class FixedModel:
+    def predict(self, features):
+        return features["cost"]
+
+    def observe(self, features, elapsed):
+        pass
+
+
+def _job(arg):
+    if arg == "kill":
+        os.kill(os.getpid(), signal.SIGKILL)
+    if arg == "raise":
+        raise ValueError(arg)
+    time.sleep(0.05)
+    return arg
+
+
+def test_killed_worker_does_not_hang_the_sweep(monkeypatch):
+    monkeypatch.setattr(scheduler, "LIVENESS_PERIOD", 0.2)
+    args = ["a", "kill", "b", "raise", "c", "d"]
+    jobs = [({"cost": float(i)}, arg) for i, arg in enumerate(args)]
+    finished = []
+    results = scheduler.run_longest_first(_job, jobs, 2, FixedModel(),
+                                          on_result=lambda features, arg, result: finished.append(result))
+    assert results == ["a", None, "b", None, "c", "d"]
+    assert sorted(finished) == ["a", "b", "c", "d"]
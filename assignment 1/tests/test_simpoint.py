@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from sweeplib.simpoint import Z_95, estimate
+
+SPEC = {
+    "total_insts": 600,
+    "clusters": [{"cluster": 0, "size": 4, "weight": 0.5}, {"cluster": 1, "size": 2, "weight": 0.5}],
+    "points": [{"index": 0, "cluster": 0, "weight": 0.25}, {"index": 1, "cluster": 0, "weight": 0.25},
+               {"index": 4, "cluster": 1, "weight": 0.25}, {"index": 5, "cluster": 1, "weight": 0.25}],
+}
+
+
+def _block(cycles, misses, accesses):
+    return {"simFreq": 1000000000000, "simInsts": 100, "simTicks": cycles * 1000,
+            "system.cpu.numCycles": cycles, "system.cpu.ipc": 100 / cycles,
+            "system.cpu.dcache.overallMisses::total": misses,
+            "system.cpu.dcache.overallAccesses::total": accesses,
+            "system.cpu.dcache.overallMissRate::total": misses / accesses}
+
+
+BLOCKS = [_block(200, 10, 40), _block(300, 20, 40), _block(400, 5, 50), _block(400, 15, 50)]
+
+
+def test_weighted_whole_program_estimate():
+    result = estimate(BLOCKS, SPEC)
+    weights = np.full(4, 0.25)
+    cycles = np.array([200, 300, 400, 400])
+    assert result["simInsts"] == 600
+    assert result["simFreq"] == 1000000000000
+    assert result["system.cpu.numCycles"] == int(round((weights * cycles / 100).sum() * 600))
+    # Rates come from the estimated counts, IPC from the estimated CPI
+    assert result["system.cpu.dcache.overallMissRate::total"] == pytest.approx(50 / 180)
+    assert result["system.cpu.ipc"] == pytest.approx(1 / (weights * cycles / 100).sum())
+    assert result["sampled.intervals"] == 4 and result["sampled.clusters"] == 2
+    assert result["sampled.detailedFraction"] == pytest.approx(400 / 600)
+
+
+def test_confidence_interval_from_the_sampled_cluster_only():
+    result = estimate(BLOCKS, SPEC)
+    # Cluster 1 was simulated exhaustively, so only cluster 0's spread counts
+    per_inst = np.array([200, 300]) * 1000 / 100
+    var = 0.5 ** 2 * (1 - 2 / 4) * per_inst.var(ddof=1) / 2 * 600 ** 2
+    assert result["sampled.ci95.simTicks"] == pytest.approx(Z_95 * np.sqrt(var))
+    assert "sampled.ci95.system.cpu.ipc" in result
+
+
+def test_one_pick_per_cluster_reports_no_bounds():
+    spec = dict(SPEC, points=[{"index": 0, "cluster": 0, "weight": 0.5}, {"index": 4, "cluster": 1, "weight": 0.5}])
+    result = estimate([BLOCKS[0], BLOCKS[2]], spec)
+    assert not any(name.startswith("sampled.ci95.") for name in result)
+
+
+def test_run_that_ended_early():
+    with pytest.raises(ValueError):
+        estimate(BLOCKS[:3], SPEC)
+    with pytest.raises(ValueError):
+        estimate([dict(b, simInsts=0) for b in BLOCKS], SPEC)
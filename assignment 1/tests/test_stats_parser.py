@@ -0,0 +1,41 @@
+from sweeplib.stats_parser import BEGIN_MARK, END_MARK, iter_blocks, lookup
+
+
+def _block(*lines):
+    return [f"{BEGIN_MARK} ----------\n", *lines, "\n", f"{END_MARK}   ----------\n"]
+
+
+def test_blocks_in_order_with_ints_floats_and_nan():
+    lines = (["header noise 12\n"]
+             + _block("simSeconds                0.001000   # Number of seconds simulated (Second)\n",
+                      "system.cpu.numCycles      1000       # Number of cpu cycles simulated (Cycle)\n",
+                      "system.l2.overallMissRate::total  nan  # miss rate\n",
+                      "system.cpu.op_class::IntAlu  5  50.00%  50.00%  # Class of executed instruction\n",
+                      "system.cpu.ipc            text\n")
+             + _block("simSeconds 0.002000\n"))
+    blocks = list(iter_blocks(lines))
+    assert len(blocks) == 2
+    first = blocks[0]
+    assert first["simSeconds"] == 0.001 and isinstance(first["system.cpu.numCycles"], int)
+    assert first["system.l2.overallMissRate::total"] != first["system.l2.overallMissRate::total"]
+    assert first["system.cpu.op_class::IntAlu"] == 5
+    assert "system.cpu.ipc" not in first
+    assert blocks[1] == {"simSeconds": 0.002}
+
+
+def test_names_filter():
+    lines = _block("simSeconds 0.5\n", "system.cpu.numCycles 10\n")
+    assert list(iter_blocks(lines, names={"system.cpu.numCycles"})) == [{"system.cpu.numCycles": 10}]
+
+
+def test_partial_last_block_of_a_killed_run():
+    lines = _block("simSeconds 0.5\n") + [f"{BEGIN_MARK} ----------\n", "simSeconds 0.7\n"]
+    assert [b["simSeconds"] for b in iter_blocks(lines)] == [0.5, 0.7]
+    # An empty unterminated block yields nothing
+    assert len(list(iter_blocks(_block("simSeconds 0.5\n") + [f"{BEGIN_MARK} ----------\n"]))) == 1
+
+
+def test_lookup_resolves_aliases():
+    stats = {"system.cpu.dcache.overallMissRate::total": 0.25}
+    assert lookup(stats, "L1_MissRate") == 0.25
+    assert lookup(stats, "IPC", default="N/A") == "N/A"
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from sweeplib.tracesim import LINE_SIZE, num_sets, simulate_grid, stack_distances, write_results
+
+
+def lru_misses(lines, sets, assoc):
+    """Per-access miss flags of a set-associative LRU cache, one access at a time."""
+    cache = [OrderedDict() for _ in range(sets)]
+    missed = []
+    for line in lines:
+        s = cache[line % sets]
+        if line in s:
+            s.move_to_end(line)
+            missed.append(False)
+        else:
+            if len(s) == assoc:
+                s.popitem(last=False)
+            s[line] = True
+            missed.append(True)
+    return np.array(missed)
+
+
+def _trace(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    # A hot region plus streaming and random accesses, so every assoc hits and misses
+    hot = rng.integers(0, 64, n) * LINE_SIZE
+    far = rng.integers(0, 4096, n) * LINE_SIZE
+    return np.where(rng.random(n) < 0.7, hot, far) + rng.integers(0, LINE_SIZE, n)
+
+
+@pytest.mark.parametrize("sets", [1, 4, 16])
+def test_stack_distances_match_lru(sets):
+    lines = _trace(sets) // LINE_SIZE
+    distances = stack_distances(lines, sets)
+    for assoc in (1, 2, 4, 8):
+        expected = lru_misses(lines, sets, assoc)
+        assert np.array_equal((distances < 0) | (distances >= assoc), expected)
+
+
+def test_simulate_grid_matches_two_level_lru():
+    addrs = _trace(7)
+    lines = addrs // LINE_SIZE
+    results = simulate_grid(addrs, ["1kB", "2kB"], [1, 4], ["8kB"], [2, 8])
+    for (l1_sz, l2_sz, l1_assoc, l2_assoc), (l1_rate, l2_rate) in results.items():
+        l1_missed = lru_misses(lines, num_sets(l1_sz, l1_assoc), l1_assoc)
+        l2_missed = lru_misses(lines[l1_missed], num_sets(l2_sz, l2_assoc), l2_assoc)
+        assert l1_rate == pytest.approx(l1_missed.mean())
+        assert l2_rate == pytest.approx(l2_missed.mean())
+
+
+def test_invalid_geometry():
+    with pytest.raises(ValueError):
+        num_sets("3kB", 2)
+
+
+def test_results_are_written_in_size_order(tmp_path):
+    results = {(l1, l2, 4, 8): (0.1, 0.2) for l1 in ("128kB", "32kB", "64kB") for l2 in ("1024kB", "256kB")}
+    rows = write_results(results, str(tmp_path / "prescreen.csv"), "Simple")
+    assert [(row[0], row[1]) for row in rows] == [
+        ("32kB", "256kB"), ("32kB", "1024kB"), ("64kB", "256kB"), ("64kB", "1024kB"),
+        ("128kB", "256kB"), ("128kB", "1024kB")]
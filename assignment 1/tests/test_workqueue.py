@@ -0,0 +1,89 @@
+import multiprocessing
+import time
+
+from sweeplib.workqueue import WorkQueue
+
+
+def _enqueue(queue, n):
+    return queue.enqueue([("driver.py", "run", [i], float(i)) for i in range(n)])
+
+
+def test_claim_takes_highest_priority_first(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    ids = _enqueue(queue, 3)
+    assert queue.claim("w")[0] == ids[2]
+    assert queue.claim("w")[0] == ids[1]
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"), lease=0.05)
+    (job_id,) = _enqueue(queue, 1)
+    assert queue.claim("dead")[0] == job_id
+    assert queue.claim("other") is None  # still leased
+    time.sleep(0.1)
+    assert queue.claim("other")[0] == job_id
+    job = queue.jobs([job_id])[job_id]
+    assert job["worker"] == "other" and job["attempts"] == 2
+    # The first worker lost its lease: its late result is ignored
+    assert not queue.heartbeat(job_id, "dead")
+    assert not queue.complete(job_id, "dead", result="stale")
+    assert queue.complete(job_id, "other", result="row")
+    assert queue.jobs([job_id])[job_id]["status"] == "done"
+
+
+def test_job_fails_after_max_attempts(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"), lease=0.05, max_attempts=2)
+    (job_id,) = _enqueue(queue, 1)
+    for _ in range(2):
+        assert queue.claim("w")[0] == job_id
+        time.sleep(0.1)
+    assert queue.claim("w") is None
+    job = queue.jobs([job_id])[job_id]
+    assert job["status"] == "failed"
+    assert "lease expired 2 times" in job["error"]
+    assert queue.requeue_failed() == 1
+    assert queue.claim("w")[0] == job_id
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"), lease=0.2)
+    (job_id,) = _enqueue(queue, 1)
+    queue.claim("w")
+    for _ in range(4):
+        time.sleep(0.1)
+        assert queue.heartbeat(job_id, "w")
+    assert queue.claim("other") is None
+
+
+def _claim_all(path, worker, out):
+    queue = WorkQueue(path)
+    claimed = []
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            break
+        claimed.append(job[0])
+        queue.complete(job[0], worker, result=worker)
+    out.put(claimed)
+
+
+def test_workers_never_claim_the_same_job(tmp_path):
+    path = str(tmp_path / "q.db")
+    ids = _enqueue(WorkQueue(path), 200)
+    out = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_claim_all, args=(path, f"w{i}", out)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    claimed = [job_id for _ in workers for job_id in out.get(timeout=60)]
+    for worker in workers:
+        worker.join()
+    assert sorted(claimed) == sorted(ids)
+    assert WorkQueue(path).counts()["done"] == 200
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    ids = _enqueue(queue, 3)
+    queue.claim("w")
+    assert _enqueue(queue, 3) == ids
+    assert queue.counts()["running"] == 1
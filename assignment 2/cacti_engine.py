@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# cacti_engine.py — Shared, parallel, memoized CACTI runner for prob_3.py / prob_4.py
+#
+# Every configuration is rendered from the base cache.cfg by overriding
+# directives (size, associativity, ...), hashed, and looked up in a cache
+# directory before CACTI is run. A miss runs CACTI in a process pool and keeps
+# <hash>.cfg, <hash>.cfg.out (the full CSV CACTI writes next to its input),
+# <hash>.log (stdout/stderr) and <hash>.json (the overrides). Any figure can
+# then be drawn from the cached table without re-invoking CACTI.
+#
+# Like the problem scripts, run from inside the cacti-master directory.
+
+import csv, hashlib, json, os, re, subprocess, sys
+from multiprocessing import Pool
+
+CACTI      = "./cacti"
+BASE_CFG   = "./cache.cfg"
+CACHE_DIR  = "./cacti_cache"
+TABLE_FILE = "./cacti_results.csv"
+TIMEOUT    = 120
+
+# Short name -> directive prefix as written in cache.cfg (quoted values marked)
+DIRECTIVES = {
+    "size":          ("-size (bytes)", False),
+    "associativity": ("-associativity", False),
+    "block_size":    ("-block size (bytes)", False),
+    "technology":    ("-technology (u)", False),
+    "banks":         ("-UCA bank count", False),
+    "access_mode":   ("-access mode (normal, sequential, fast) -", True),
+    "optimize":      ("-Optimize ED or ED^2 (ED, ED^2, NONE):", True),
+}
+
+# Shorter names for the .cfg.out columns used by the figures
+COLUMN_ALIASES = {
+    "Tech node (nm)":                 "tech_node_nm",
+    "Capacity (bytes)":               "capacity_bytes",
+    "Number of banks":                "banks_out",
+    "Associativity":                  "assoc_out",
+    "Output width (bits)":            "output_width_bits",
+    "Access time (ns)":               "access_time_ns",
+    "Random cycle time (ns)":         "cycle_time_ns",
+    "Dynamic search energy (nJ)":     "search_energy_nj",
+    "Dynamic read energy (nJ)":       "read_energy_nj",
+    "Dynamic write energy (nJ)":      "write_energy_nj",
+    "Standby leakage per bank(mW)":   "leakage_per_bank_mw",
+    "Area (mm2)":                     "area_mm2",
+}
+
+
+def render_config(base_text, overrides):
+    """Base cfg text with each overridden directive commented out and re-set at the top."""
+    cfg = base_text
+    header = ""
+    for name, value in overrides.items():
+        prefix, quoted = DIRECTIVES[name]
+        cfg = re.sub(r'^(' + re.escape(prefix) + ')', r'//\1', cfg, flags=re.MULTILINE)
+        header += f'{prefix} "{value}"\n' if quoted else f"{prefix} {value}\n"
+    return header + cfg
+
+
+def config_key(cfg_text):
+    return hashlib.sha256(cfg_text.encode()).hexdigest()[:20]
+
+
+def _number(text):
+    text = text.strip()
+    try:
+        return float(text) if any(c in text for c in ".eE") else int(text)
+    except ValueError:
+        return None if text in ("", "N/A") else text
+
+
+def parse_cfg_out(path):
+    """Last result row of a CACTI .cfg.out CSV as {column: value}, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        rows = [r for r in csv.reader(f) if any(c.strip() for c in r)]
+    if len(rows) < 2:
+        return None
+    header = [h.strip() for h in rows[0]]
+    values = rows[-1]
+    parsed = {}
+    for name, value in zip(header, values):
+        if name:
+            parsed[COLUMN_ALIASES.get(name, name)] = _number(value)
+    return parsed
+
+
+def _run_one(job):
+    """Run CACTI for one rendered cfg inside the cache dir; returns (key, ok)."""
+    cacti, cache_dir, key, cfg_text, timeout = job
+    tmp_cfg = os.path.join(cache_dir, f".{key}.{os.getpid()}.cfg")
+    with open(tmp_cfg, "w") as f:
+        f.write(cfg_text)
+    try:
+        r = subprocess.run([cacti, "-infile", tmp_cfg], capture_output=True, text=True, timeout=timeout)
+        output = r.stdout + r.stderr
+    except subprocess.TimeoutExpired:
+        output = f"TIMEOUT after {timeout} s"
+    with open(os.path.join(cache_dir, f"{key}.log"), "w") as f:
+        f.write(output)
+
+    ok = parse_cfg_out(tmp_cfg + ".out") is not None
+    # Publish the result only once CACTI has written it completely
+    if ok:
+        os.replace(tmp_cfg + ".out", os.path.join(cache_dir, f"{key}.cfg.out"))
+    os.replace(tmp_cfg, os.path.join(cache_dir, f"{key}.cfg"))
+    if os.path.exists(tmp_cfg + ".out"):
+        os.remove(tmp_cfg + ".out")
+    return key, ok
+
+
+class CactiEngine:
+    def __init__(self, cacti=CACTI, base_cfg=BASE_CFG, cache_dir=CACHE_DIR, workers=None, timeout=TIMEOUT):
+        self.cacti = cacti
+        self.base_cfg = base_cfg
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count()
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(base_cfg) as f:
+            self.base_text = f.read()
+
+    def path(self, key, ext=".cfg"):
+        return os.path.join(self.cache_dir, key + ext)
+
+    def lookup(self, key):
+        return parse_cfg_out(self.path(key, ".cfg.out"))
+
+    def adopt(self, cfg_dir):
+        """Seed the cache from an old per-script config dir (name.cfg + name.cfg.out pairs)."""
+        if not os.path.isdir(cfg_dir):
+            return 0
+        adopted = 0
+        for name in os.listdir(cfg_dir):
+            if not name.endswith(".cfg") or not os.path.exists(os.path.join(cfg_dir, name + ".out")):
+                continue
+            with open(os.path.join(cfg_dir, name)) as f:
+                key = config_key(f.read())
+            if self.lookup(key) is None and parse_cfg_out(os.path.join(cfg_dir, name + ".out")):
+                with open(os.path.join(cfg_dir, name)) as src, open(self.path(key), "w") as dst:
+                    dst.write(src.read())
+                with open(os.path.join(cfg_dir, name + ".out")) as src, open(self.path(key, ".cfg.out"), "w") as dst:
+                    dst.write(src.read())
+                adopted += 1
+        return adopted
+
+    def run(self, points):
+        """Results for a list of override dicts, in order; CACTI only runs on cache misses.
+
+        Each result is the overrides plus every .cfg.out column, with ``key``
+        and ``ok`` added. Failed runs keep ``ok=False`` and their log.
+        """
+        rendered = []
+        for overrides in points:
+            text = render_config(self.base_text, overrides)
+            rendered.append((overrides, config_key(text), text))
+
+        misses = {}
+        for overrides, key, text in rendered:
+            with open(self.path(key, ".json"), "w") as f:
+                json.dump(overrides, f)
+            if self.lookup(key) is None:
+                misses[key] = (self.cacti, self.cache_dir, key, text, self.timeout)
+
+        if misses:
+            print(f"CACTI: {len(misses)} of {len(rendered)} configurations not cached, "
+                  f"running on {min(self.workers, len(misses))} workers...", file=sys.stderr)
+            with Pool(min(self.workers, len(misses))) as pool:
+                for key, ok in pool.imap_unordered(_run_one, misses.values()):
+                    if not ok:
+                        print(f"CACTI: no result for {self.path(key)}; see {self.path(key, '.log')}", file=sys.stderr)
+
+        results = []
+        for overrides, key, _ in rendered:
+            parsed = self.lookup(key)
+            results.append({**overrides, **(parsed or {}), "key": key, "ok": parsed is not None})
+        return results
+
+    def table(self):
+        """Every cached result (overrides + columns), e.g. for figures that need no new runs."""
+        results = []
+        for name in sorted(os.listdir(self.cache_dir)):
+            if not name.endswith(".cfg.out"):
+                continue
+            key = name[:-len(".cfg.out")]
+            overrides = {}
+            if os.path.exists(self.path(key, ".json")):
+                with open(self.path(key, ".json")) as f:
+                    overrides = json.load(f)
+            results.append({**overrides, **self.lookup(key), "key": key, "ok": True})
+        return results
+
+
+def write_table(results, path=TABLE_FILE):
+    """Results as one CSV; columns are the union over all rows, overrides first."""
+    columns = []
+    for row in results:
+        for name in row:
+            if name not in columns:
+                columns.append(name)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({k: ("N/A" if v is None else v) for k, v in row.items()})
+    return path
+
+
+# Columns of the table read by assignment 1's configs/cache_config.py (--cacti_latency_table)
+LATENCY_COLUMNS = ["size_bytes", "assoc", "block_size", "tech_nm", "access_time_ns", "cycle_time_ns",
+                   "read_energy_nj", "write_energy_nj", "leakage_mw", "area_mm2"]
+
+
+def write_latency_table(results, path, default_block_size=64):
+    """Per (size, assoc, block size, tech node) timing/energy table for the gem5 configs.
+
+    Plain CSV so gem5's embedded Python can read it with the csv module.
+    Directives not swept (block size, technology) take the values the
+    .cfg.out reports or the base cache.cfg default.
+    """
+    rows = {}
+    for r in results:
+        if not r.get("ok") or r.get("access_time_ns") is None:
+            continue
+        size  = int(r.get("size") or r["capacity_bytes"])
+        assoc = int(r.get("associativity") or r["assoc_out"])
+        block = int(r.get("block_size") or default_block_size)
+        tech  = int(r.get("tech_node_nm") or round(float(r["technology"]) * 1000))
+        banks = r.get("banks_out") or 1
+        rows[(size, assoc, block, tech)] = [
+            size, assoc, block, tech, r["access_time_ns"], r.get("cycle_time_ns"),
+            r.get("read_energy_nj"), r.get("write_energy_nj"),
+            (r.get("leakage_per_bank_mw") or 0) * banks, r.get("area_mm2"),
+        ]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LATENCY_COLUMNS)
+        for key in sorted(rows):
+            # None or NaN (pandas records) -> N/A
+            writer.writerow(["N/A" if v is None or v != v else v for v in rows[key]])
+    return len(rows)
+
+
+if __name__ == "__main__":
+    # Rebuild the shared table from everything cached so far
+    results = CactiEngine().table()
+    print(f"Table with {len(results)} configurations saved : {write_table(results)}")
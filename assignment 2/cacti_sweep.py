@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# cacti_sweep.py — Declarative CACTI design-space sweeps on top of cacti_engine.py
+# Run from inside the cacti-master directory:
+#   python3 cacti_sweep.py cacti_sweep_spec.json
+#   python3 cacti_sweep.py cacti_sweep_spec.json --target_ghz 2 --cycles 2
+#   python3 cacti_sweep.py gem5_latency_spec.json --latency_table cacti_latency.csv
+#
+# The spec lists values for any directive known to cacti_engine.DIRECTIVES
+# (size, associativity, block_size, technology, banks, access_mode, optimize):
+#   {
+#     "axes":   {"size": [16384, 32768], "technology": [0.032, 0.090], ...},
+#     "fixed":  {"block_size": 64},
+#     "sample": 200,            # optional: random subset of the product
+#     "seed":   0,
+#     "output": "cacti_sweep"   # table (.parquet, or .csv without pyarrow) and plot prefix
+#   }
+# Every point runs through the engine's cache, so re-running a spec with one
+# more axis value only invokes CACTI for the new points.
+
+import argparse, itertools, json, os, random, sys
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cacti_engine import DIRECTIVES, CactiEngine, write_latency_table
+
+# ── Spec → points ──────────────────────────────────────────────────────────
+def load_spec(path):
+    with open(path) as f:
+        spec = json.load(f)
+    unknown = set(spec.get("axes", {})) | set(spec.get("fixed", {}))
+    unknown -= set(DIRECTIVES)
+    if unknown:
+        raise ValueError(f"Unknown directives in {path}: {sorted(unknown)} (known: {sorted(DIRECTIVES)})")
+    return spec
+
+def expand(spec):
+    """Override dicts for the product of the spec's axes (or a random sample of it)."""
+    axes  = spec.get("axes", {})
+    names = list(axes)
+    combos = list(itertools.product(*(axes[n] for n in names)))
+    if spec.get("sample") and spec["sample"] < len(combos):
+        combos = random.Random(spec.get("seed", 0)).sample(combos, spec["sample"])
+    return [{**spec.get("fixed", {}), **dict(zip(names, c))} for c in combos]
+
+# ── Columnar table ─────────────────────────────────────────────────────────
+def save_table(df, prefix):
+    try:
+        import pyarrow  # noqa: F401
+        path = prefix + ".parquet"
+        df.to_parquet(path, index=False)
+    except ImportError:
+        path = prefix + ".csv"
+        df.to_csv(path, index=False)
+    return path
+
+def to_frame(results):
+    df = pd.DataFrame(results)
+    if "technology" in df:
+        df["tech_nm"] = (df["technology"].astype(float) * 1000).round().astype(int)
+    # Total leakage and per-size KB for plotting
+    if {"leakage_per_bank_mw", "banks_out"} <= set(df.columns):
+        df["leakage_mw"] = df["leakage_per_bank_mw"] * df["banks_out"]
+    if "size" in df:
+        df["size_kb"] = df["size"] // 1024
+    return df
+
+# ── Vectorized analysis ────────────────────────────────────────────────────
+def pareto_2d(df, x, y):
+    """Rows of df not dominated in (x, y), both minimised: sort on x, keep running minima of y."""
+    d = df.dropna(subset=[x, y]).sort_values([x, y])
+    best = np.minimum.accumulate(np.concatenate(([np.inf], d[y].to_numpy()[:-1])))
+    return d[d[y].to_numpy() < best]
+
+def feasible(df, target_ghz, cycles):
+    """Configurations whose access time fits in `cycles` at `target_ghz`, cheapest read energy per size."""
+    if "access_time_ns" not in df:
+        return df.iloc[0:0]
+    ok = df[df["ok"] & (df["access_time_ns"] <= cycles / target_ghz)]
+    idx = ok.groupby("size")["read_energy_nj"].idxmin()
+    return ok.loc[idx].sort_values("size")
+
+def plot_tradeoffs(df, prefix):
+    ok     = df[df["ok"]]
+    group  = "tech_nm" if "tech_nm" in ok and ok["tech_nm"].nunique() > 1 else None
+    groups = sorted(ok[group].unique()) if group else [None]
+    colors = plt.cm.viridis(np.linspace(0, 0.9, len(groups)))
+    files  = []
+
+    # Best achievable access time / area vs capacity, per technology node
+    for metric, label, suffix in (("access_time_ns", "Access time (ns)", "latency"),
+                                  ("area_mm2", "Area (mm²)", "area")):
+        if metric not in ok or "size_kb" not in ok:
+            continue
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for g, c in zip(groups, colors):
+            sub  = ok if g is None else ok[ok[group] == g]
+            best = sub.groupby("size_kb")[metric].min()
+            ax.plot(best.index, best.values, 'o-', color=c, linewidth=2, label=f"{g} nm" if g else None)
+        ax.set_xscale('log', base=2)
+        ax.set_xlabel("Cache size (KB)", fontsize=12)
+        ax.set_ylabel(label, fontsize=12)
+        ax.set_title(f"Best {label.split(' (')[0].lower()} vs capacity", fontsize=12)
+        ax.grid(linestyle='--', alpha=0.4)
+        if group:
+            ax.legend(title="Technology")
+        files.append(f"{prefix}_{suffix}.png")
+        fig.tight_layout()
+        fig.savefig(files[-1], dpi=150)
+        plt.close(fig)
+
+    # Latency/energy trade-off with each node's Pareto front
+    if {"access_time_ns", "read_energy_nj"} <= set(ok.columns):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for g, c in zip(groups, colors):
+            sub   = ok if g is None else ok[ok[group] == g]
+            front = pareto_2d(sub, "access_time_ns", "read_energy_nj")
+            ax.scatter(sub["access_time_ns"], sub["read_energy_nj"], color=c, alpha=0.25, s=15)
+            ax.plot(front["access_time_ns"], front["read_energy_nj"], 'o-', color=c, linewidth=2,
+                    label=f"{g} nm front" if g else "Pareto front")
+        ax.set_xlabel("Access time (ns)", fontsize=12)
+        ax.set_ylabel("Read energy per access (nJ)", fontsize=12)
+        ax.set_yscale('log')
+        ax.set_title("Latency / energy trade-off", fontsize=12)
+        ax.grid(linestyle='--', alpha=0.4)
+        ax.legend()
+        files.append(f"{prefix}_latency_energy.png")
+        fig.tight_layout()
+        fig.savefig(files[-1], dpi=150)
+        plt.close(fig)
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a declarative CACTI sweep and plot its trade-offs")
+    parser.add_argument("spec", help="JSON sweep spec")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel CACTI processes (default: all cores)")
+    parser.add_argument("--target_ghz", type=float, default=None, help="Report organizations that meet this clock...")
+    parser.add_argument("--cycles", type=int, default=1, help="...within this many cycles (default 1)")
+    parser.add_argument("--latency_table", default=None,
+                        help="Also write the per (size, assoc, block, tech) table read by cache_config.py --cacti_latency_table")
+    args = parser.parse_args()
+
+    spec   = load_spec(args.spec)
+    points = expand(spec)
+    prefix = spec.get("output", os.path.splitext(os.path.basename(args.spec))[0])
+    print(f"Sweep: {len(points)} configurations over {', '.join(spec.get('axes', {}))}")
+
+    engine = CactiEngine(workers=args.workers)
+    df     = to_frame(engine.run(points))
+    print(f"{int(df['ok'].sum())} of {len(df)} configurations have a CACTI solution")
+    print(f"Table saved : {save_table(df, prefix)}")
+    for f in plot_tradeoffs(df, prefix):
+        print(f"Plot saved  : {f}")
+    if args.latency_table:
+        n = write_latency_table(df.to_dict("records"), args.latency_table)
+        print(f"Latency table ({n} rows) saved : {args.latency_table}")
+
+    if args.target_ghz:
+        cols = [c for c in ("size_kb", "associativity", "block_size", "tech_nm", "banks", "access_mode", "optimize",
+                            "access_time_ns", "read_energy_nj", "area_mm2") if c in df]
+        best = feasible(df, args.target_ghz, args.cycles)
+        print(f"\nLowest read energy per size within {args.cycles} cycle(s) at {args.target_ghz} GHz "
+              f"(access time <= {args.cycles / args.target_ghz:.3f} ns):")
+        print(best[cols].to_string(index=False) if len(best) else "  none")
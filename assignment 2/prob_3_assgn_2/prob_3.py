@@ -2,12 +2,16 @@
 # prob_3.py — Run from inside /home/shivam/Projects/cacti-master/
 # Usage: python3 prob_3.py > prob_3.log
 
-import subprocess, os, re, sys
+import os, sys
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Shared CACTI runner lives in assignment 2/ (or copy it next to this script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cacti_engine import CactiEngine, write_table
+
 CACTI      = "./cacti"
 BASE_CFG   = "./cache.cfg"
 CFG_DIR    = "./prob3_configs"
@@ -17,53 +21,37 @@ SIZES      = [16*1024, 32*1024, 64*1024, 128*1024, 256*1024]
 LABELS     = ["16 KB", "32 KB", "64 KB", "128 KB", "256 KB"]
 ASSOCS     = [1, 2, 4, 8]
 
-os.makedirs(CFG_DIR, exist_ok=True)
-
-def make_config(size, assoc, path):
-    with open(BASE_CFG) as f:
-        cfg = f.read()
-    # Disable all existing size/associativity lines
-    cfg = re.sub(r'^(-size)',       r'//\1', cfg, flags=re.MULTILINE)
-    cfg = re.sub(r'^(-associativity)', r'//\1', cfg, flags=re.MULTILINE)
-    # Inject our values at the top
-    cfg = f"-size (bytes) {size}\n-associativity {assoc}\n" + cfg
-    with open(path, 'w') as f:
-        f.write(cfg)
-
-def run_cacti(path):
-    r = subprocess.run([CACTI, "-infile", path],
-                       capture_output=True, text=True, timeout=120)
-    return r.stdout + r.stderr
-
-def parse_time(output):
-    m = re.search(r'Access time \(ns\):\s*([\d.]+)', output)
-    return float(m.group(1)) if m else None
-
 # ── Run all 20 configurations ──────────────────────────────────────────────
 print("=" * 65)
 print("Problem 3: CACTI — Cache Access Time vs Size (Fig 2.8)")
 print("=" * 65)
 print()
 
+# One engine for Fig 2.8 and 2.9: a configuration already run by either
+# script is read from the cache, the rest run in parallel
+engine = CactiEngine(CACTI, BASE_CFG)
+engine.adopt(CFG_DIR)  # results left by the earlier, sequential version of this script
+points = [{"size": size, "associativity": assoc} for assoc in ASSOCS for size in SIZES]
+cacti  = {(r["size"], r["associativity"]): r for r in engine.run(points)}
+write_table(engine.table())
+
 results = {a: [None]*len(SIZES) for a in ASSOCS}
 
 for assoc in ASSOCS:
     for i, size in enumerate(SIZES):
         size_kb  = size // 1024
-        cfg_path = f"{CFG_DIR}/cache_{size_kb}KB_{assoc}way.cfg"
+        r        = cacti[(size, assoc)]
 
         print(f"--- {size_kb} KB, {assoc}-way ---")
-        print(f"    Config : {cfg_path}")
+        print(f"    Config : {engine.path(r['key'])}")
 
-        make_config(size, assoc, cfg_path)
-        output = run_cacti(cfg_path)
-        t = parse_time(output)
+        t = r.get("access_time_ns")
 
         if t:
             results[assoc][i] = t
             print(f"    Access time : {t:.5f} ns")
         else:
-            print(f"    WARNING: Could not parse. Raw:\n{output[:400]}")
+            print(f"    WARNING: Could not parse. See {engine.path(r['key'], '.log')}")
             results[assoc][i] = 0.0
         print()
 